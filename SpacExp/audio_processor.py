@@ -3,7 +3,8 @@ import time
 import os
 from mutagen import File as MutagenFile 
 from .base_processor import FileProcessor
-from .logging_config import setup_logging
+from .metadata_store import META_KEY, metadata_value
+from .logging_config import setup_logging, file_logger
 
 # Настраиваем логгирование
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -15,13 +16,6 @@ class BaseAudioProcessor(FileProcessor):
 
     Наследует класс FileProcessor и реализует метод process для обработки аудиофайлов.
     """
-    def __init__(self):
-        """
-        Инициализация экземпляра AudioProcessor и создание множества для отслеживания уникальных ключей тегов.
-        """
-        # множество для отслеживания всех уникальных ключей тегов
-        self.all_tag_keys = set()
-
     def process_audio_file(self, filepath, is_web=False):
         """
         Обрабатывает указанный аудиофайл, извлекая метаданные: продолжительность, теги, битрейт и частоту дискретизации.
@@ -32,9 +26,10 @@ class BaseAudioProcessor(FileProcessor):
         Возвращает:
             dict: Словарь, содержащий метаданные аудиофайла, включая:
                   - 'audio_duration': Продолжительность аудиофайла.
-                  - 'audio_tags': Словарь с тегами аудиофайла.
                   - 'audio_bitrate': Битрейт аудиофайла.
                   - 'audio_sample_rate': Частота дискретизации аудиофайла.
+                  - '_meta': {"tags": {ключ: значение}} — теги файла для таблицы метаданных (не для веб-версии).
+                  - 'audio_tags': Словарь тегов (только для веб-версии).
                   - Другие общие данные о файле, полученные из родительского класса.
 
                   Если возникает ошибка, возвращается словарь с сообщением об ошибке.
@@ -42,6 +37,7 @@ class BaseAudioProcessor(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
             # Mutagen для получения информации об аудио
             audio = MutagenFile(filepath)
@@ -51,34 +47,28 @@ class BaseAudioProcessor(FileProcessor):
             audio_sample_rate = audio.info.sample_rate if hasattr(audio.info, 'sample_rate') else "N/A"
 
             # сериализуем теги
-            tags_serializable = {key: str(value) for key, value in tags.items()} if is_web else tags
+            tags_serializable = {str(key): metadata_value(value) for key, value in tags.items()}
 
             file_info.update({
                 "audio_duration": duration,
-                "audio_tags": tags_serializable,
                 "audio_bitrate": audio_bitrate,
                 "audio_sample_rate": audio_sample_rate,
             })
 
-            # адпейтим множество всех ключей тегов
-            self.all_tag_keys.update(tags.keys())
-
-            # добавляем каждый ключ-значение тега в file_info с префиксом "tags_"
-            for key, value in tags_serializable.items():
-                file_info[f"tags_{key}"] = value
-
             # уникальные поля для веб-версии
             if is_web:
+                file_info["audio_tags"] = tags_serializable
                 file_info["type"] = "audio"
+            # в индексе теги уходят в таблицу метаданных, а не в отдельные колонки tags_*
+            elif tags_serializable:
+                file_info[META_KEY] = {"tags": tags_serializable}
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Audio processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Audio processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
-            error_info = {"error": str(e)}
-            if is_web:
-                error_info["type"] = "audio"
+            error_info = self.error_info(e, type="audio") if is_web else self.error_info(e)
             error_logger.error(f"Error processing audio {filepath}: {e}")
             return error_info
 
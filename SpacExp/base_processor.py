@@ -1,13 +1,88 @@
 import os
 from datetime import datetime
+from .records import CompactStat
+from . import metrics
 from .logging_config import setup_logging
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 process_logger, error_logger = setup_logging(project_root)
 
+
+class FileEntry:
+    """
+    Файл, найденный при обходе директории, вместе с результатом stat.
+
+    Обход получает stat один раз (через os.scandir), после чего запись передаётся
+    обработчикам и get_generic_info, которые не обращаются к файловой системе повторно.
+    Поддерживает os.fspath, поэтому может использоваться везде, где ожидается путь.
+    Хранит только путь и CompactStat, чтобы списки записей больших деревьев
+    занимали минимум памяти; имя файла вычисляется из пути.
+
+    Аргументы:
+        path (str): Путь к файлу.
+        stat (os.stat_result | CompactStat, optional): Результат stat; если не указан, будет получен при первом обращении.
+    """
+    __slots__ = ("path", "stat")
+
+    def __init__(self, path, stat=None):
+        self.path = path
+        self.stat = CompactStat.from_stat(stat)
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @classmethod
+    def from_dir_entry(cls, dir_entry):
+        """
+        Создаёт запись из os.DirEntry, выполняя единственный вызов stat для файла.
+
+        Если stat завершился ошибкой (например, битая ссылка), stat остаётся пустым,
+        и ошибка проявится при обработке файла.
+        """
+        try:
+            stats = dir_entry.stat()
+        except OSError:
+            stats = None
+        return cls(dir_entry.path, stats)
+
+    def get_stat(self):
+        """Возвращает результат stat, выполняя os.stat только если он ещё не получен."""
+        if self.stat is None:
+            self.stat = CompactStat.from_stat(os.stat(self.path))
+        return self.stat
+
+    def __fspath__(self):
+        return self.path
+
+    def __str__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"FileEntry({self.path!r})"
+
+
+def as_file_entry(filepath):
+    """
+    Приводит путь или FileEntry к FileEntry.
+
+    Аргументы:
+        filepath (str | FileEntry): Путь к файлу или готовая запись.
+
+    Возвращает:
+        FileEntry: Запись о файле.
+    """
+    if isinstance(filepath, FileEntry):
+        return filepath
+    return FileEntry(os.fspath(filepath))
+
+
 class FileProcessor:
     """
     Класс для обработки файлов. Предоставляет базовые методы для получения информации о файле.
 
+    Метод process каждого подкласса автоматически записывает метрики (длительность, размер файла,
+    класс исключения при ошибке) в metrics.REGISTRY.
+
     Аргументы:
         default_author (str): Имя автора по умолчанию. Используется для тегирования файлов, если автор не указан.
     """
@@ -20,12 +95,59 @@ class FileProcessor:
         """
         self.default_author = default_author
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "process" in cls.__dict__:
+            cls.process = metrics.instrument(cls.process)
+
+    def error_info(self, error, **fields):
+        """
+        Строка результата для перехваченной ошибки обработки; класс исключения учитывается в метриках.
+
+        Аргументы:
+            error (Exception): Перехваченное исключение.
+            **fields: Дополнительные поля строки (например, type для веб-версии).
+
+        Возвращает:
+            dict: Поля fields и ключ "error" с текстом ошибки.
+        """
+        metrics.note_error(error)
+        return {**fields, "error": str(error)}
+
+    def prepare(self, filepaths):
+        """
+        Готовит обработчик к пакету файлов его типа перед их обработкой по одному
+        (например, чтобы выполнить дорогую операцию сразу для всего пакета).
+
+        Аргументы:
+            filepaths (list): Пути к файлам или FileEntry пакета.
+        """
+        pass
+
+    def get_state(self):
+        """
+        Возвращает накопленное при обработке состояние, которое нужно слить между процессами пула.
+
+        Возвращает:
+            object: Состояние обработчика или None, если обработчик не хранит состояния.
+        """
+        return None
+
+    def merge_state(self, state):
+        """
+        Сливает состояние, полученное от такого же обработчика в другом процессе.
+
+        Аргументы:
+            state (object): Результат get_state другого экземпляра.
+        """
+        pass
+
     def get_generic_info(self, filepath):
         """
         Извлекает общую информацию о файле: размер, время создания, время последней модификации и расширение.
 
         Аргументы:
-            filepath (str): Путь к файлу, для которого требуется получить информацию.
+            filepath (str | FileEntry): Путь к файлу или запись обхода с готовым результатом stat.
 
         Возвращает:
             dict: Словарь с информацией о файле, включая:
@@ -38,14 +160,15 @@ class FileProcessor:
                   
             Если возникает ошибка при доступе к файлу, возвращается None, и ошибка записывается в лог.
         """
-        stats = os.stat(filepath)
+        entry = as_file_entry(filepath)
+        stats = entry.get_stat()
         creation_time = datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
         modification_time = datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-        extension = os.path.splitext(filepath)[1][1:]
+        extension = os.path.splitext(entry.name)[1][1:]
         try:
             return {
-            "file_path": filepath,
-            "file_name": os.path.basename(filepath),
+            "file_path": entry.path,
+            "file_name": entry.name,
             "file_size": stats.st_size,
             "creation_time": creation_time,
             "modification_time": modification_time,
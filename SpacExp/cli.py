@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import argparse
+
+from . import metrics
+from .logging_config import setup_logging, set_file_log_sampling, flush_logging, FILE_LOG_SAMPLE_EVERY
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MB = 1024 * 1024
+
+
+class ProgressReporter:
+    """
+    Вывод прогресса индексации: число файлов, файлов в секунду и МБ в секунду.
+
+    В терминале строка обновляется на месте не чаще, чем раз в interval секунд;
+    при выводе в файл или журнал cron каждая строка пишется отдельно.
+
+    Аргументы:
+        stream: Поток вывода (по умолчанию sys.stderr).
+        interval (float): Минимальный интервал между обновлениями, секунды.
+        counter (FileCounter, optional): Фоновый подсчёт файлов для вывода доли выполненного.
+    """
+    def __init__(self, stream=None, interval=1.0, counter=None):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.counter = counter
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._last = self.started
+
+    def update(self, row):
+        """Учитывает сохранённую строку результата."""
+        self.files += 1
+        size = row.get("file_size")
+        if isinstance(size, int):
+            self.bytes += size
+        if row.get("error"):
+            self.errors += 1
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._print(self.status(now))
+
+    def status(self, now=None):
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        files = f"{self.files} files"
+        if self.counter is not None and self.counter.total:
+            files = f"{self.files}/{self.counter.total} files ({min(self.files / self.counter.total, 1):.0%})"
+        return (f"{files}, {self.bytes / MB:.1f} MB, {self.errors} errors | "
+                f"{self.files / elapsed:.1f} files/s, {self.bytes / MB / elapsed:.2f} MB/s")
+
+    def _print(self, line):
+        if self.interactive:
+            self.stream.write("\r\033[K" + line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        """Выводит итоговую строку прогресса."""
+        self._print(self.status())
+        if self.interactive:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def summary_table(snapshot, elapsed):
+    """
+    Итог по обработчикам из снимка metrics.REGISTRY.
+
+    Аргументы:
+        snapshot (dict): Результат MetricsRegistry.snapshot().
+        elapsed (float): Длительность прохода, секунды.
+
+    Возвращает:
+        str: Таблица: обработчик, файлы, ошибки, МБ, время обработки, средняя длительность, доля времени.
+    """
+    header = ("processor", "files", "errors", "MB", "busy s", "avg ms", "files/s")
+    rows = []
+    for processor, values in sorted(snapshot.items(), key=lambda item: -item[1]["seconds"]):
+        total = values["total"]
+        rows.append((
+            processor,
+            str(total),
+            str(sum(values["errors"].values())),
+            f"{values['bytes'] / MB:.1f}",
+            f"{values['seconds']:.2f}",
+            f"{values['seconds'] / total * 1000:.1f}" if total else "-",
+            f"{total / max(elapsed, 1e-9):.1f}",
+        ))
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    lines = ["  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+             for row in [header] + rows]
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m SpacExp",
+        description="Index one or more directory trees into a CSV or Parquet file.",
+    )
+    parser.add_argument("roots", nargs="+", help="directories to index")
+    parser.add_argument("-o", "--output", default="output_analysis.csv", help="index file (default: %(default)s)")
+    parser.add_argument("-f", "--format", choices=("csv", "parquet"), help="index format (default: by extension)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="files per worker task (default: %(default)s)")
+    parser.add_argument("--walk-threads", type=int, default=None, help="directory listing threads")
+    parser.add_argument("--incremental", action="store_true", help="reuse results of unchanged files")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its journal")
+    parser.add_argument("--no-journal", action="store_true", help="do not keep a resume journal")
+    parser.add_argument("--include", action="append", metavar="PATTERN",
+                        help="only index files matching the pattern (name or relative path; repeatable)")
+    parser.add_argument("--exclude", action="append", metavar="PATTERN",
+                        help="skip files matching the pattern (name or relative path; repeatable)")
+    parser.add_argument("--timeout", type=float, help="per-file time budget in seconds (runs files in a sandbox)")
+    parser.add_argument("--memory-limit", type=int, metavar="BYTES", help="per-worker memory limit")
+    parser.add_argument("--duplicates", action="store_true", help="write a duplicate files report")
+    parser.add_argument("--metrics-file", help="write Prometheus metrics to this file during the run")
+    parser.add_argument("--profile-dir", help="profile processors and write the report to this directory")
+    parser.add_argument("--log-every", type=int, default=FILE_LOG_SAMPLE_EVERY,
+                        help="log one of every N per-file messages (default: %(default)s)")
+    parser.add_argument("--progress-interval", type=float, default=1.0,
+                        help="seconds between progress lines (default: %(default)s)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output and summary")
+    return parser
+
+
+def main(argv=None):
+    """
+    Командная строка индексации для серверов и cron:
+
+        python -m SpacExp /data /mnt/archive -o index.parquet -w 8 --incremental --exclude "*.tmp"
+
+    Во время прохода выводит файлы в секунду и МБ в секунду, в конце — итог по обработчикам.
+
+    Возвращает:
+        int: Код выхода: 0 — успех, 1 — ошибка, 130 — прерван (продолжить можно с --resume).
+    """
+    from .file_manager import FileManager
+    from .tree_walker import DEFAULT_WALK_THREADS
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    missing = [root for root in args.roots if not os.path.isdir(root)]
+    if missing:
+        parser.error(f"not a directory: {', '.join(missing)}")
+    set_file_log_sampling(args.log_every)
+
+    roots = [os.path.abspath(root) for root in args.roots]
+    manager = FileManager(
+        roots if len(roots) > 1 else roots[0],
+        os.path.abspath(args.output),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        incremental=args.incremental,
+        output_format=args.format,
+        resume=args.resume,
+        journal=not args.no_journal,
+        timeout=args.timeout,
+        memory_limit=args.memory_limit,
+        duplicates=args.duplicates,
+        walk_threads=args.walk_threads or DEFAULT_WALK_THREADS,
+        metrics_file=args.metrics_file,
+        profile_dir=args.profile_dir,
+        include=args.include,
+        exclude=args.exclude,
+    )
+    counter = None if args.quiet else manager.start_count()
+    reporter = None if args.quiet else ProgressReporter(interval=args.progress_interval, counter=counter)
+    metrics.REGISTRY.reset()
+    started = time.monotonic()
+    try:
+        manager.run(on_result=reporter.update if reporter else None)
+    except KeyboardInterrupt:
+        flush_logging()
+        sys.stderr.write("\nInterrupted; run again with --resume to continue.\n")
+        return 130
+    except Exception as e:
+        flush_logging()
+        sys.stderr.write(f"Indexing failed: {e}\n")
+        return 1
+    finally:
+        if counter is not None:
+            counter.stop()
+    flush_logging()
+    if reporter:
+        reporter.finish()
+        elapsed = time.monotonic() - started
+        sys.stderr.write(summary_table(metrics.REGISTRY.snapshot(), elapsed) + "\n")
+        sys.stderr.write(f"Index written to {manager.output_file} in {elapsed:.1f} s\n")
+    return 0
@@ -0,0 +1,151 @@
+import os
+import csv
+import hashlib
+from collections import defaultdict
+
+from .index_reader import load_index
+from .result_writer import CSVResultSink
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# сколько байт с начала и с конца файла входит в частичный хеш
+PARTIAL_BYTES = 64 * 1024
+# размер блока при чтении файла для полного хеша
+BLOCK_SIZE = 1024 * 1024
+# колонки таблицы дубликатов
+REPORT_COLUMNS = ["group_id", "content_hash", "file_path", "file_size", "group_size", "reclaimable_bytes"]
+
+
+class DuplicateFinder:
+    """
+    Поиск файлов с одинаковым содержимым с поэтапным хешированием.
+
+    Файлы сначала группируются по размеру; для групп из нескольких файлов
+    считается частичный хеш (начало и конец файла), и только файлы, совпавшие
+    и по нему, хешируются целиком. Файлы, не имеющие пары по размеру, не читаются вовсе.
+
+    Аргументы:
+        partial_bytes (int): Размер начального и конечного фрагмента для частичного хеша.
+        block_size (int): Размер блока чтения при полном хешировании.
+    """
+    def __init__(self, partial_bytes=PARTIAL_BYTES, block_size=BLOCK_SIZE):
+        self.partial_bytes = partial_bytes
+        self.block_size = block_size
+        self.bytes_read = 0
+
+    def find(self, files):
+        """
+        Находит группы дубликатов.
+
+        Аргументы:
+            files (iterable): Пары (путь к файлу, размер в байтах).
+
+        Возвращает:
+            list: Кортежи (хеш содержимого, размер, список путей), отсортированные
+                  по убыванию освобождаемого объёма.
+        """
+        by_size = defaultdict(list)
+        for filepath, size in files:
+            # пустые файлы не занимают места, их совпадение неинтересно
+            if size:
+                by_size[int(size)].append(filepath)
+
+        groups = []
+        for size, paths in by_size.items():
+            if len(paths) < 2:
+                continue
+            if size <= 2 * self.partial_bytes:
+                # частичный хеш покрыл бы файл целиком — сразу считаем полный
+                candidates = [paths]
+            else:
+                candidates = self._bucket(paths, lambda path: self.partial_hash(path, size))
+            for candidate in candidates:
+                for digest, same in self._bucket(candidate, self.full_hash, keyed=True):
+                    groups.append((digest, size, same))
+
+        groups.sort(key=lambda group: group[1] * (len(group[2]) - 1), reverse=True)
+        return groups
+
+    def _bucket(self, paths, hash_function, keyed=False):
+        """Разбивает пути по значению хеша и оставляет только группы из нескольких файлов."""
+        buckets = defaultdict(list)
+        for path in paths:
+            try:
+                buckets[hash_function(path)].append(path)
+            except OSError as e:
+                error_logger.error(f"Failed to hash {path}: {e}")
+        if keyed:
+            return [(digest, same) for digest, same in buckets.items() if len(same) > 1]
+        return [same for same in buckets.values() if len(same) > 1]
+
+    def partial_hash(self, filepath, size):
+        """Хеш начального и конечного фрагментов файла."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, "rb") as file:
+            head = file.read(self.partial_bytes)
+            file.seek(max(0, size - self.partial_bytes))
+            tail = file.read(self.partial_bytes)
+        self.bytes_read += len(head) + len(tail)
+        digest.update(head)
+        digest.update(tail)
+        return digest.digest()
+
+    def full_hash(self, filepath):
+        """Хеш всего содержимого файла (BLAKE2b)."""
+        digest = hashlib.blake2b()
+        buffer = bytearray(self.block_size)
+        view = memoryview(buffer)
+        with open(filepath, "rb", buffering=0) as file:
+            while True:
+                read = file.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                self.bytes_read += read
+        return digest.hexdigest()
+
+
+def duplicates_path(index_file):
+    """Путь к таблице дубликатов рядом с файлом индекса."""
+    return f"{index_file}.duplicates.csv"
+
+
+def find_duplicates(index_file, output_file=None, finder=None):
+    """
+    Строит таблицу дубликатов по файлу индекса.
+
+    Таблица содержит по строке на файл: номер группы, хеш содержимого, путь,
+    размер, количество файлов в группе и объём, освобождаемый при удалении
+    всех копий кроме одной (reclaimable_bytes, одинаков для всей группы).
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса (CSV или Parquet).
+        output_file (str, optional): Путь к таблице; по умолчанию <index>.duplicates.csv.
+        finder (DuplicateFinder, optional): Настроенный поисковик дубликатов.
+
+    Возвращает:
+        dict: Сводка: количество групп, файлов-дубликатов и освобождаемых байт.
+    """
+    output_file = output_file or duplicates_path(index_file)
+    finder = finder or DuplicateFinder()
+    index = load_index(index_file, columns=["file_path", "file_size"])
+    index = index.dropna(subset=["file_path", "file_size"])
+    groups = finder.find(zip(index["file_path"], index["file_size"]))
+
+    summary = {"groups": len(groups), "duplicate_files": 0, "reclaimable_bytes": 0}
+    with CSVResultSink(output_file) as sink:
+        for group_id, (digest, size, paths) in enumerate(groups, start=1):
+            reclaimable = size * (len(paths) - 1)
+            summary["duplicate_files"] += len(paths) - 1
+            summary["reclaimable_bytes"] += reclaimable
+            for path in paths:
+                sink.write(dict(zip(REPORT_COLUMNS, [group_id, digest, path, size, len(paths), reclaimable])))
+    if not groups:
+        # пустая таблица с заголовком заменяет отчёт предыдущего прохода
+        with open(output_file, "w", newline="", encoding="utf-8") as report:
+            csv.writer(report).writerow(REPORT_COLUMNS)
+    process_logger.info(
+        f"Duplicates: {summary['groups']} groups, {summary['duplicate_files']} redundant files, "
+        f"{summary['reclaimable_bytes']} bytes reclaimable ({finder.bytes_read} bytes read)"
+    )
+    return summary
@@ -0,0 +1,256 @@
+# doc_converter.py
+import hashlib
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+from itertools import islice
+
+# блокировка профиля офиса доступна только на POSIX-системах
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .logging_config import setup_logging, file_logger
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# сколько файлов конвертируется одним запуском офиса
+DEFAULT_BATCH_SIZE = 32
+# бюджет времени на один запуск офиса (секунды)
+DEFAULT_TIMEOUT = 600
+# сколько процессов могут одновременно конвертировать, каждый со своим профилем
+MAX_PROFILES = 64
+# размер блока чтения при вычислении хеша содержимого
+HASH_BLOCK = 1024 * 1024
+# сколько последних результатов конвертер помнит без повторного хеширования файлов
+RECENT_LIMIT = 4096
+
+
+def default_cache_dir():
+    """
+    Каталог кэша конвертированных файлов: $SPACEXP_DOC_CACHE или ~/.cache/spacexp/doc.
+
+    Кэш лежит вне индексируемых директорий, поэтому конвертированные файлы не попадают в индекс.
+    """
+    configured = os.environ.get("SPACEXP_DOC_CACHE")
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "spacexp", "doc")
+
+
+def find_office():
+    """Возвращает исполняемый файл LibreOffice (soffice или libreoffice) или None."""
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def content_hash(filepath):
+    """Хеш содержимого файла (BLAKE2b, 128 бит) — ключ кэша конвертаций."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocConverter:
+    """
+    Конвертация документов старых форматов (.doc) в .docx через LibreOffice с кэшем.
+
+    Результаты хранятся в кэше по хешу содержимого исходного файла и переиспользуются
+    между запусками, в том числе для копий одного документа в разных местах.
+    Файлы, которых нет в кэше, конвертируются пакетами по batch_size одним запуском
+    офиса, так что время запуска делится на весь пакет. Офис работает с постоянным
+    профилем в кэше: профиль не создаётся заново при каждом запуске и не конфликтует
+    с офисом пользователя. Параллельные процессы пула получают разные профили.
+
+    Аргументы:
+        cache_dir (str, optional): Каталог кэша (по умолчанию default_cache_dir()).
+        office (str, optional): Исполняемый файл офиса (по умолчанию find_office()).
+        batch_size (int): Максимальное число файлов в одном запуске офиса.
+        timeout (float): Бюджет времени на один запуск офиса, секунды.
+    """
+    def __init__(self, cache_dir=None, office=None, batch_size=DEFAULT_BATCH_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.office = office
+        self.batch_size = max(1, int(batch_size))
+        self.timeout = timeout
+        self._profile = None
+        self._profile_lock = None
+        self._profile_owner = None
+        # последние результаты: обработчик сначала готовит пакет, а затем запрашивает файлы по одному
+        self._recent = {}
+
+    def __getstate__(self):
+        # блокировка профиля принадлежит процессу и не передаётся в процессы пула
+        state = self.__dict__.copy()
+        state.update(_profile=None, _profile_lock=None, _profile_owner=None, _recent={})
+        return state
+
+    def cache_path(self, digest):
+        """Путь к конвертированному файлу в кэше по хешу исходного."""
+        return os.path.join(self.cache_dir, digest[:2], digest + ".docx")
+
+    def convert(self, filepath):
+        """
+        Возвращает путь к .docx-версии файла, конвертируя его при отсутствии в кэше.
+
+        Аргументы:
+            filepath (str): Путь к исходному файлу.
+
+        Возвращает:
+            str: Путь к файлу в кэше или None, если конвертация не удалась.
+        """
+        return self.convert_many([filepath]).get(os.fspath(filepath))
+
+    def convert_many(self, filepaths):
+        """
+        Конвертирует файлы, которых нет в кэше, пакетами по batch_size.
+
+        Аргументы:
+            filepaths (iterable): Пути к исходным файлам.
+
+        Возвращает:
+            dict: Путь к исходному файлу → путь к .docx в кэше или None при ошибке.
+        """
+        results = {}
+        missing = {}
+        for filepath in map(os.fspath, filepaths):
+            key = self._signature(filepath)
+            if key is not None and key in self._recent:
+                results[filepath] = self._recent[key]
+                continue
+            try:
+                digest = content_hash(filepath)
+            except OSError as e:
+                error_logger.error(f"Failed to read {filepath} for conversion: {e}")
+                results[filepath] = None
+                continue
+            target = self.cache_path(digest)
+            if os.path.exists(target):
+                results[filepath] = target
+            else:
+                missing.setdefault(digest, []).append(filepath)
+
+        if missing:
+            office = self.office or find_office()
+            if office is None:
+                error_logger.error("LibreOffice is not installed; .doc files cannot be converted")
+            items = list(missing.items())
+            for start in range(0, len(items), self.batch_size) if office else ():
+                batch = items[start:start + self.batch_size]
+                converted = self._convert_batch(office, batch)
+                if len(batch) > 1 and len(converted) < len(batch):
+                    # пакет мог прерваться по таймауту из-за одного файла: остальные конвертируются по одному
+                    for item in batch:
+                        if item[0] not in converted:
+                            converted.update(self._convert_batch(office, [item]))
+                for digest, paths in batch:
+                    for filepath in paths:
+                        results[filepath] = converted.get(digest)
+            for paths in missing.values():
+                for filepath in paths:
+                    results.setdefault(filepath, None)
+
+        for filepath, target in results.items():
+            key = self._signature(filepath)
+            if key is not None:
+                self._recent.pop(key, None)
+                self._recent[key] = target
+        # запросы по одному не вытесняют подготовленный пакет: забываются самые старые результаты
+        for key in list(islice(self._recent, max(0, len(self._recent) - RECENT_LIMIT))):
+            del self._recent[key]
+        return results
+
+    def _signature(self, filepath):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return filepath, stat.st_size, stat.st_mtime_ns
+
+    def _convert_batch(self, office, items):
+        """
+        Конвертирует пакет одним запуском офиса.
+
+        Аргументы:
+            office (str): Исполняемый файл офиса.
+            items (list): Пары (хеш содержимого, список путей с этим содержимым).
+
+        Возвращает:
+            dict: Хеш → путь к .docx в кэше для успешно конвертированных файлов.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        profile = self._acquire_profile()
+        converted = {}
+        with tempfile.TemporaryDirectory(prefix="convert-", dir=self.cache_dir) as work:
+            inputs = []
+            for digest, paths in items:
+                # офис называет результат по имени исходного файла; хеш в имени исключает совпадения
+                source = os.path.join(work, digest + os.path.splitext(paths[0])[1].lower())
+                try:
+                    try:
+                        os.link(paths[0], source)
+                    except OSError:
+                        shutil.copyfile(paths[0], source)
+                except OSError as e:
+                    error_logger.error(f"Failed to stage {paths[0]} for conversion: {e}")
+                    continue
+                inputs.append(source)
+            if not inputs:
+                return converted
+            output = os.path.join(work, "out")
+            command = [office, f"-env:UserInstallation={pathlib.Path(profile).as_uri()}", "--headless",
+                       "--norestore", "--nologo", "--convert-to", "docx", "--outdir", output, *inputs]
+            try:
+                completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                           timeout=self.timeout)
+                if completed.returncode != 0:
+                    error_logger.error(f"LibreOffice exited with code {completed.returncode}: "
+                                       f"{completed.stderr.decode(errors='replace').strip()}")
+            except subprocess.TimeoutExpired:
+                error_logger.error(f"LibreOffice conversion of {len(inputs)} files timed out after {self.timeout} seconds")
+            except OSError as e:
+                error_logger.error(f"Failed to start LibreOffice: {e}")
+                return converted
+            for digest, paths in items:
+                produced = os.path.join(output, digest + ".docx")
+                if not os.path.exists(produced):
+                    continue
+                target = self.cache_path(digest)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(produced, target)
+                converted[digest] = target
+        file_logger.info("Converted %s of %s files with LibreOffice", len(converted), len(items))
+        return converted
+
+    def _acquire_profile(self):
+        """
+        Возвращает каталог профиля офиса, которым в данный момент не пользуется другой процесс.
+
+        Профили profile-0, profile-1, ... сохраняются в кэше между запусками; процесс занимает
+        первый свободный (flock) и держит его до завершения.
+        """
+        if self._profile is not None and self._profile_owner == os.getpid():
+            return self._profile
+        # профиль, полученный при fork, принадлежит родительскому процессу
+        self._profile = self._profile_lock = None
+        profiles = os.path.join(self.cache_dir, "profiles")
+        os.makedirs(profiles, exist_ok=True)
+        for i in range(MAX_PROFILES if fcntl is not None else 0):
+            lock = open(os.path.join(profiles, f"profile-{i}.lock"), "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                continue
+            self._profile_lock = lock
+            self._profile = os.path.join(profiles, f"profile-{i}")
+            break
+        if self._profile is None:
+            # без блокировок (или когда все профили заняты) — отдельный профиль процесса
+            self._profile = os.path.join(profiles, f"profile-pid-{os.getpid()}")
+        self._profile_owner = os.getpid()
+        return self._profile
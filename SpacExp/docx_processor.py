@@ -1,9 +1,12 @@
 import platform
-import subprocess
 from .base_processor import FileProcessor
 import os
 import time
+import zipfile
+from xml.etree import ElementTree
 from docx import Document  # обработка docx без Word
+from .ooxml_reader import read_properties
+from .doc_converter import DocConverter
 
 # условный импорт для Windows
 if platform.system() == "Windows":
@@ -16,9 +19,12 @@ if platform.system() == "Windows":
 else:
     WIN32_AVAILABLE = False
 
-from .logging_config import setup_logging
+from .logging_config import setup_logging, file_logger
 process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# символов на страницу для оценки, когда приложение не записало число страниц
+CHARS_PER_PAGE = 1300
+
 class BaseDOCXProcessor(FileProcessor):
     """
     Класс для обработки файлов формата DOC и DOCX, извлекающий метаданные: автор, заголовок и количество страниц.
@@ -33,6 +39,37 @@ class BaseDOCXProcessor(FileProcessor):
             default_author (str): Имя автора, используемое по умолчанию, если не указано иное.
         """
         super().__init__(default_author=default_author)
+        # конвертация .doc в .docx на Linux (кэш вне индексируемых директорий)
+        self.converter = DocConverter()
+
+    def prepare(self, filepaths):
+        """
+        Конвертирует .doc-файлы пакета одним запуском LibreOffice, чтобы при обработке
+        каждого файла конвертированная версия уже была в кэше.
+        """
+        if platform.system() != "Linux":
+            return
+        documents = [filepath for filepath in filepaths if os.fspath(filepath).lower().endswith(".doc")]
+        if documents:
+            self.converter.convert_many(documents)
+
+    def convert_doc_to_docx(self, doc_filepath):
+        """
+        Конвертирует DOC файл в DOCX с помощью LibreOffice.
+
+        Результат хранится в кэше конвертаций по хешу содержимого, а не рядом с исходным файлом,
+        и переиспользуется при следующих запусках.
+
+        Аргументы:
+            doc_filepath (str): Путь к DOC файлу.
+
+        Возвращает:
+            str: Путь к DOCX файлу в кэше или None, если конвертация не удалась.
+        """
+        docx_filepath = self.converter.convert(doc_filepath)
+        if docx_filepath is None:
+            error_logger.error(f"Failed to convert {doc_filepath} to DOCX")
+        return docx_filepath
 
     def is_word_installed(self):
         """
@@ -53,12 +90,16 @@ class BaseDOCXProcessor(FileProcessor):
                 pythoncom.CoUninitialize()
         return False
 
-    def count_word_pages(self, filepath):
+    def count_word_pages(self, filepath, properties=None):
         """
         Подсчитывает количество страниц в файле DOC или DOCX в зависимости от системы и наличия Word.
 
+        Для DOCX сначала используется число страниц из docProps/app.xml (properties),
+        Word и python-docx — только если его там нет.
+
         Аргументы:
             file_path (str): Путь к файлу DOC или DOCX.
+            properties (dict, optional): Свойства документа из ooxml_reader.read_properties.
 
         Возвращает:
             int: Количество страниц в документе или None, если подсчет невозможен.
@@ -68,20 +109,25 @@ class BaseDOCXProcessor(FileProcessor):
             error_logger.error(f"File not found: {filepath}")
             return None
 
+        if (properties or {}).get("pages"):
+            file_logger.info("Page count for %s from docProps/app.xml: %s", filepath, properties["pages"])
+            return properties["pages"]
+
         system = platform.system()
 
         if system == "Windows" and WIN32_AVAILABLE:
             if self.is_word_installed():
                 return self._count_pages_with_word(filepath)
             else:
-                return self._count_pages_with_docx(filepath)
+                return self._count_pages_with_docx(filepath, properties)
         elif system == "Linux":
-            if filepath.endswith('.doc'):
+            if filepath.lower().endswith('.doc'):
                 docx_filepath = self.convert_doc_to_docx(filepath)
-                print(docx_filepath)
-                return self._count_pages_with_docx(docx_filepath)
+                if docx_filepath is None:
+                    return None
+                return self._count_pages_with_docx(docx_filepath, properties)
             else:
-                return self._count_pages_with_docx(filepath)
+                return self._count_pages_with_docx(filepath, properties)
         else:
             error_logger.error(f"Unsupported system for page count: {system}")
             return None
@@ -106,7 +152,7 @@ class BaseDOCXProcessor(FileProcessor):
             word = Dispatch("Word.Application")
             doc = word.Documents.Open(filepath, ReadOnly=True)
             page_count = doc.ComputeStatistics(2)  # wdStatisticPages
-            process_logger.info(f"Calculated page count for {filepath}: {page_count}")
+            file_logger.info("Calculated page count for %s: %s", filepath, page_count)
             doc.Close(False)
             return page_count
         except Exception as e:
@@ -117,16 +163,25 @@ class BaseDOCXProcessor(FileProcessor):
                 word.Quit()
             pythoncom.CoUninitialize()
 
-    def _count_pages_with_docx(self, filepath):
+    def _count_pages_with_docx(self, filepath, properties=None):
         """
-        Подсчет страниц с использованием библиотеки python-docx.
+        Оценка количества страниц по числу символов.
+
+        Число символов берётся из docProps/app.xml, а если его там нет — из текста
+        документа, прочитанного библиотекой python-docx.
 
         Аргументы:
             filepath (str): Путь к файлу.
+            properties (dict, optional): Свойства документа из ooxml_reader.read_properties.
 
         Возвращает:
             int: Оценочное количество страниц или None при ошибке.
         """
+        characters = (properties or {}).get("characters")
+        if characters:
+            estimated_pages = max(1, characters // CHARS_PER_PAGE)
+            file_logger.info("Estimated page count for %s from docProps/app.xml: %s", filepath, estimated_pages)
+            return estimated_pages
         try:
             doc = Document(filepath)
             #paragraphs = len(doc.paragraphs)
@@ -134,44 +189,88 @@ class BaseDOCXProcessor(FileProcessor):
             total_chars = sum(len(paragraph.text) for paragraph in doc.paragraphs)
             # примерная оценка, которая может сильно отклоняться
             #estimated_pages = max(1, paragraphs // 7)  # пусть 7 параграфов на страницу
-            estimated_pages = max(1, total_chars // 1300)  # пусть 1.3k символов на страницу
-            process_logger.info(f"Estimated page count for {filepath} using python-docx: {estimated_pages}")
+            estimated_pages = max(1, total_chars // CHARS_PER_PAGE)  # пусть 1.3k символов на страницу
+            file_logger.info("Estimated page count for %s using python-docx: %s", filepath, estimated_pages)
             return estimated_pages
         except Exception as e:
             error_logger.error(f"Failed to estimate pages for {filepath} with python-docx: {e}")
             return None
 
-    def get_generic_doc_info(self, filepath, default_author=None):
+    def document_format(self, filepath):
+        """
+        Определяет формат документа: "doc", "docx" или None.
+
+        Обработчик получает файл, тип которого реестр уже определил как документ, в том числе
+        по сигнатуре, поэтому файл без расширения .docx, являющийся zip-пакетом с частями word/,
+        разбирается как DOCX.
+
+        Аргументы:
+            filepath (str): Путь к файлу.
+
+        Возвращает:
+            str: "doc", "docx" или None, если формат не поддерживается.
+        """
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension in (".doc", ".docx"):
+            return extension[1:]
+        try:
+            with zipfile.ZipFile(filepath) as archive:
+                if any(name.startswith("word/") for name in archive.namelist()):
+                    return "docx"
+        except (zipfile.BadZipFile, OSError):
+            pass
+        return None
+
+    def get_generic_doc_info(self, filepath, default_author=None, document_format=None):
         """
         Основной метод для извлечения общей информации о документе.
 
+        Автор, заголовок, даты и счётчики читаются из docProps (core.xml и app.xml) DOCX-файла;
+        для DOC на Linux — из его конвертированной версии.
+
         Аргументы:
             filepath (str): Путь к файлу.
+            document_format (str, optional): Формат из document_format(); по умолчанию определяется по файлу.
 
         Возвращает:
             dict: Словарь с общей информацией о файле и метаданными документа.
         """
-        page_count = self.count_word_pages(filepath)
+        properties = {}
+        document_format = document_format or self.document_format(filepath)
+        source = filepath if document_format == "docx" else None
+        if document_format == "doc" and platform.system() == "Linux":
+            source = self.convert_doc_to_docx(filepath)
+        if source is not None:
+            try:
+                properties = read_properties(source)
+            except (zipfile.BadZipFile, ElementTree.ParseError, OSError) as e:
+                error_logger.error(f"Failed to read document properties of {filepath}: {e}")
+        page_count = self.count_word_pages(filepath, properties)
         return {
-            "author": default_author or self.default_author,
+            "author": properties.get("creator") or default_author or self.default_author,
             "page_count": page_count,
+            "doc_title": properties.get("title"),
+            "doc_creation_date": properties.get("created"),
+            "doc_modification_date": properties.get("modified"),
+            "doc_words": properties.get("words"),
+            "doc_characters": properties.get("characters"),
         }
 
     def process_document(self, filepath):
         """Основной метод для обработки DOCX и DOC файлов."""
         file_info = self.get_generic_info(filepath)
+        filepath = os.fspath(filepath)
         if not file_info:
             return None
 
-        extension = file_info.get("extension")
-        if extension in {"docx", "doc"}:
-            doc_info = self.get_generic_doc_info(filepath)
-            file_info.update(doc_info)
-        else:
+        document_format = self.document_format(filepath)
+        if document_format is None:
+            # файл остаётся в индексе с общей информацией
             error_logger.error(f"Unsupported file type: {filepath}")
-            return None
+            return file_info
+        file_info.update(self.get_generic_doc_info(filepath, document_format=document_format))
 
-        process_logger.info(f"Successfully processed: {filepath}")
+        file_logger.info("Successfully processed: %s", filepath)
         return file_info
 
 
@@ -202,25 +301,8 @@ class DOCXProcessorWeb(BaseDOCXProcessor):
             start_time = time.time()
             file_info = self.process_document(filepath)
             elapsed_time = time.time() - start_time
-            process_logger.info(f"DOCX processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("DOCX processed: %s in %.2f seconds", filepath, elapsed_time)
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing DOCX {filepath}: {e}")
-            return {"type": "document", "error": str(e)}
-
-
-    def convert_doc_to_docx(self, doc_filepath):
-        """
-        Конвертирует DOC файл в DOCX с помощью LibreOffice на Linux.
-        """
-        try:
-            # Определим путь для выходного файла
-            docx_filepath = os.path.splitext(doc_filepath)[0] + '.docx'
-            
-            # Выполним команду для конвертации через LibreOffice
-            subprocess.run(['libreoffice', '--headless', '--convert-to', 'docx', '--outdir', os.path.dirname(doc_filepath), doc_filepath], check=True)            
-            process_logger.info(f"Converted {doc_filepath} to {docx_filepath}")
-            return docx_filepath
-        except subprocess.CalledProcessError as e:
-            error_logger.error(f"Failed to convert {doc_filepath} to DOCX: {e}")
-            return None
+            return self.error_info(e, type="document")
@@ -2,13 +2,57 @@ import openpyxl
 from .base_processor import FileProcessor
 import os
 import time
+import zipfile
+from xml.etree import ElementTree
 import xlrd
-from .logging_config import setup_logging
+from .ooxml_reader import workbook_sheets
+from .metadata_store import META_KEY
+from .logging_config import setup_logging, file_logger
 
 # логгирование
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 process_logger, error_logger = setup_logging(project_root)
 
+
+def read_sheets(filepath):
+    """
+    Возвращает листы книги Excel с их размерами, не загружая ячейки книги.
+
+    Книги .xlsx читаются потоково: имена листов — из xl/workbook.xml, размеры — из элемента
+    <dimension> в начале каждого листа. Если структура пакета нестандартная, используется
+    openpyxl в режиме read_only. Книги .xls открываются xlrd с on_demand=True: листы
+    загружаются по одному и сразу выгружаются.
+
+    Args:
+        filepath (str): Путь к Excel файлу.
+
+    Returns:
+        list: Словари {"name", "rows", "columns"}; rows и columns равны None, если размер листа неизвестен.
+    """
+    if zipfile.is_zipfile(filepath):
+        try:
+            return workbook_sheets(filepath)
+        except (KeyError, ElementTree.ParseError) as e:
+            process_logger.debug(f"Falling back to openpyxl for {filepath}: {e}")
+        workbook = openpyxl.load_workbook(filepath, read_only=True)
+        try:
+            return [{"name": sheet.title, "rows": getattr(sheet, "max_row", None),
+                     "columns": getattr(sheet, "max_column", None)} for sheet in workbook.worksheets]
+        finally:
+            workbook.close()
+
+    workbook = xlrd.open_workbook(filepath, on_demand=True)
+    try:
+        sheets = []
+        for index, name in enumerate(workbook.sheet_names()):
+            sheet = workbook.sheet_by_index(index)
+            sheets.append({"name": name, "rows": sheet.nrows, "columns": sheet.ncols})
+            workbook.unload_sheet(index)
+        return sheets
+    finally:
+        workbook.release_resources()
+
+
 class ExcelProcessor(FileProcessor):
     """
     Класс для обработки Excel файлов формата .xlsx.
@@ -21,7 +65,7 @@ class ExcelProcessor(FileProcessor):
     """
     def process(self, filepath):
         """
-        Обрабатывает Excel файл (.xlsx) и извлекает количество листов.
+        Обрабатывает Excel файл (.xlsx) и извлекает количество листов и их размеры.
 
         Args:
             filepath (str): Путь к Excel файлу.
@@ -29,23 +73,38 @@ class ExcelProcessor(FileProcessor):
         Returns:
             dict: Словарь с информацией о файле, включая:
                 - num_sheets (int): Количество листов в книге.
+                - excel_rows (int): Сумма строк используемых диапазонов листов.
+                - excel_columns (int): Наибольшее число столбцов среди листов.
+                - _meta (dict): {"sheet_rows": {лист: строки}, "sheet_columns": {лист: столбцы}} —
+                  размеры отдельных листов для таблицы метаданных.
 
             В случае ошибки возвращает словарь с ключом "error" и описанием ошибки.
         """
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
-            workbook = openpyxl.load_workbook(filepath)
-            file_info.update({"num_sheets": len(workbook.sheetnames)})
+            sheets = read_sheets(filepath)
+            sized = [sheet for sheet in sheets if sheet["rows"] is not None]
+            file_info.update({
+                "num_sheets": len(sheets),
+                "excel_rows": sum(sheet["rows"] for sheet in sized) if sized else None,
+                "excel_columns": max(sheet["columns"] for sheet in sized) if sized else None,
+            })
+            if sized:
+                file_info[META_KEY] = {
+                    "sheet_rows": {sheet["name"]: sheet["rows"] for sheet in sized},
+                    "sheet_columns": {sheet["name"]: sheet["columns"] for sheet in sized},
+                }
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Excel processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Excel processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing Excel {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
 
 class ExcelProcessorWeb(FileProcessor):
     """
@@ -68,34 +127,30 @@ class ExcelProcessorWeb(FileProcessor):
             dict: Словарь с информацией о файле, включая:
                 - num_sheets (int): Количество листов в книге.
                 - sheet_names (list): Список названий листов.
+                - sheet_dimensions (list): Словари {"name", "rows", "columns"} для каждого листа.
 
             В случае ошибки возвращает словарь с ключом "error" и описанием ошибки.
         """
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
             extension = filepath.split('.')[-1].lower()
 
-            if extension == "xls":
-                # Обработка .xls файлов с помощью xlrd
-                workbook = xlrd.open_workbook(filepath)
-                sheet_names = workbook.sheet_names()
-            elif extension == "xlsx":
-                # Обработка .xlsx файлов с помощью openpyxl
-                workbook = openpyxl.load_workbook(filepath)
-                sheet_names = workbook.sheetnames
-            else:
+            if extension not in ("xls", "xlsx"):
                 raise ValueError("Unsupported Excel file format")
+            sheets = read_sheets(filepath)
 
             file_info.update({
-                "num_sheets": len(sheet_names),
-                "sheet_names": sheet_names  # adding sheets names to results
+                "num_sheets": len(sheets),
+                "sheet_names": [sheet["name"] for sheet in sheets],  # adding sheets names to results
+                "sheet_dimensions": sheets,
             })
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Excel processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Excel processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing Excel {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
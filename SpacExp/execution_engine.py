@@ -0,0 +1,160 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .sandbox import SandboxPool, worker_context
+from .logging_config import setup_logging, worker_log_queue, init_worker_logging, file_log_sampling
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# менеджер, с которым работает процесс пула (инициализируется в _init_worker)
+_worker_manager = None
+
+
+def _init_worker(manager, log_queue=None, sample_every=None):
+    """
+    Инициализирует процесс пула: сохраняет копию менеджера с его обработчиками
+    и перенаправляет лог процесса писателю основного процесса.
+
+    Аргументы:
+        manager (FileManager): Менеджер, обработчики которого используются в процессе.
+        log_queue (multiprocessing.Queue, optional): Очередь записей лога основного процесса.
+        sample_every (int, optional): Период выборки сообщений о файлах в основном процессе.
+    """
+    global _worker_manager
+    init_worker_logging(log_queue, sample_every)
+    _worker_manager = manager
+    manager.init_worker_state()
+
+
+def _process_chunk(filepaths):
+    """
+    Обрабатывает пакет файлов в процессе пула.
+
+    Аргументы:
+        filepaths (list): Пути к файлам пакета.
+
+    Возвращает:
+        tuple: Список кортежей (filepath, file_data, error) в порядке входных путей
+               и состояние обработчиков процесса для слияния в основном процессе.
+    """
+    results = []
+    _worker_manager.prepare_files(filepaths)
+    for filepath in filepaths:
+        try:
+            results.append((filepath, _worker_manager.process_file(filepath), None))
+        except Exception as e:
+            results.append((filepath, None, str(e)))
+    return results, _worker_manager.get_handler_state()
+
+
+class ExecutionEngine:
+    """
+    Движок выполнения обработчиков файлов.
+
+    При workers <= 1 файлы обрабатываются последовательно в текущем процессе.
+    Иначе пути разбиваются на пакеты по chunk_size и раздаются пулу процессов;
+    результаты возвращаются строго в порядке входных путей, а состояние
+    обработчиков и их метрики сливаются в менеджер.
+    Если задан бюджет времени или памяти, каждый файл обрабатывается в изолированном
+    процессе SandboxPool: зависший файл не останавливает индексацию.
+
+    Аргументы:
+        manager (FileManager): Менеджер, предоставляющий process_file и состояние обработчиков.
+        workers (int): Количество процессов пула.
+        chunk_size (int): Количество файлов в одном пакете.
+        max_pending_chunks (int): Сколько пакетов может одновременно находиться в пуле.
+        timeout (int | float | dict): Бюджет времени на файл в секундах или словарь тип файла → секунды.
+        memory_limit (int): Лимит памяти процесса-обработчика в байтах.
+        max_tasks_per_child (int): Через сколько файлов процесс-песочница перезапускается.
+    """
+    def __init__(self, manager, workers=1, chunk_size=64, max_pending_chunks=None, timeout=None, memory_limit=None,
+                 max_tasks_per_child=1000):
+        self.manager = manager
+        self.workers = max(1, int(workers or 1))
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_pending_chunks = max_pending_chunks or self.workers * 2
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+
+    def map(self, filepaths, lookup=None):
+        """
+        Обрабатывает файлы и генерирует результаты в порядке входных путей.
+
+        Аргументы:
+            filepaths (iterable): Пути к файлам.
+            lookup (callable, optional): Функция, возвращающая готовый результат для пути
+                (например, из манифеста) или None, если файл нужно обработать.
+
+        Возвращает:
+            generator: Кортежи (filepath, file_data, error), где error — текст ошибки или None.
+        """
+        if self.timeout or self.memory_limit:
+            process_logger.info(f"Starting sandbox pool: {self.workers} workers, timeout {self.timeout}")
+            sandbox = SandboxPool(self.manager, workers=self.workers, timeouts=self.timeout,
+                                  memory_limit=self.memory_limit, max_tasks_per_child=self.max_tasks_per_child,
+                                  max_pending=self.workers * self.chunk_size, chunk_size=self.chunk_size)
+            yield from sandbox.map(filepaths, lambda filepath: self._lookup(filepath, lookup))
+            return
+
+        if self.workers <= 1:
+            for chunk in self._chunks(filepaths, lookup):
+                self.manager.prepare_files([filepath for filepath, cached in chunk if cached is None])
+                for filepath, cached in chunk:
+                    if cached is not None:
+                        yield filepath, cached, None
+                        continue
+                    try:
+                        yield filepath, self.manager.process_file(filepath), None
+                    except Exception as e:
+                        yield filepath, None, str(e)
+            return
+
+        process_logger.info(f"Starting process pool: {self.workers} workers, chunk size {self.chunk_size}")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context(), initializer=_init_worker,
+                                 initargs=(self.manager, worker_log_queue(), file_log_sampling())) as pool:
+            pending = deque()
+            for chunk in self._chunks(filepaths, lookup):
+                to_process = [filepath for filepath, cached in chunk if cached is None]
+                future = pool.submit(_process_chunk, to_process) if to_process else None
+                pending.append((chunk, future))
+                # ограничиваем число пакетов в полёте, чтобы не держать в памяти всё дерево
+                if len(pending) >= self.max_pending_chunks:
+                    yield from self._collect(*pending.popleft())
+            while pending:
+                yield from self._collect(*pending.popleft())
+
+    def _chunks(self, filepaths, lookup=None):
+        """Разбивает поток путей на пакеты пар (filepath, готовый результат или None)."""
+        iterator = iter(filepaths)
+        while True:
+            chunk = []
+            for filepath in islice(iterator, self.chunk_size):
+                chunk.append((filepath, self._lookup(filepath, lookup)))
+            if not chunk:
+                return
+            yield chunk
+
+    def _lookup(self, filepath, lookup):
+        """Возвращает готовый результат для пути; при сбое поиска файл будет обработан заново."""
+        if lookup is None:
+            return None
+        try:
+            return lookup(filepath)
+        except Exception as e:
+            error_logger.error(f"Lookup failed for {filepath}: {e}")
+            return None
+
+    def _collect(self, chunk, future):
+        """Дожидается пакета, сливает состояние обработчиков и отдаёт результаты в исходном порядке."""
+        processed = iter(())
+        if future is not None:
+            results, state = future.result()
+            self.manager.merge_handler_state(state)
+            processed = iter(results)
+        for filepath, cached in chunk:
+            if cached is not None:
+                yield filepath, cached, None
+            else:
+                yield next(processed)
@@ -1,25 +1,34 @@
 import os
-import mimetypes
 import time
-import pandas as pd
 from datetime import datetime
 
 # importing app classes
-from .base_processor import FileProcessor
-from .pdf_processor import PDFProcessor, PDFProcessorWeb
-from .image_processor import ImageProcessor, ImageProcessorWeb
-from .docx_processor import DOCXProcessor, DOCXProcessorWeb
-from .excel_processor import ExcelProcessor, ExcelProcessorWeb
-from .audio_processor import AudioProcessor, AudioProcessorWeb
-from .video_processor import VideoProcessor, VideoProcessorWeb
+from .base_processor import FileProcessor, as_file_entry
+from .records import RecordBatch
+from .tree_walker import ParallelTreeWalker, DEFAULT_WALK_THREADS, filter_entries, matches
+from .processor_registry import ProcessorRegistry, MIME_PREFIX_TYPES
+from .execution_engine import ExecutionEngine
+from .manifest import IndexManifest
+from .journal import ScanJournal
+from .metadata_store import IndexWriter
+from .dedup import find_duplicates
+from .watcher import IndexWatcher
+from .two_phase import TwoPhaseScan
+from .profiling import ScanProfiler
+from .pipeline import ScanPipeline, FileCounter, DEFAULT_WALK_DEPTH, DEFAULT_RESULT_DEPTH
+from . import metrics
 from .logging_config import setup_logging
 process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# значение по умолчанию process_file: тип файла ещё не определён (None — определён, обработчика нет)
+_UNRESOLVED = object()
+
 class BaseFileManager:
     """Базовый класс для управления файлами."""
-    def __init__(self, directory=None):
+    def __init__(self, directory=None, walk_threads=DEFAULT_WALK_THREADS):
         self.default_handler = FileProcessor()
         self.directory = directory
+        self.walk_threads = walk_threads
 
     def get_files(self, directory=None):
         """
@@ -27,89 +36,189 @@ class BaseFileManager:
         
         :return: Путь к каждому файлу в директории.
         """
+        for entry in self.get_entries(directory):
+            yield entry.path
+
+    def get_entries(self, directory=None):
+        """
+        Обходит директорию параллельным обходчиком и генерирует записи FileEntry.
+
+        Порядок совпадает с os.walk: сначала файлы каталога, затем вложенные каталоги.
+        Каталоги читаются в walk_threads потоков с опережением, stat для каждого файла
+        выполняется ровно один раз, и его результат передаётся дальше по конвейеру вместе с путём.
+
+        :return: FileEntry для каждого файла в директории.
+        """
         if directory is None:
             directory = self.directory
         if not directory:
             raise ValueError("Directory path is not specified.")
-        for root, _, files in os.walk(directory):
-            for file in files:
-                yield os.path.join(root, file)
+        return ParallelTreeWalker(threads=self.walk_threads).walk(directory)
 
-    def save_results(self, data, output_file="output_analysis.csv"):
+    def save_results(self, data, output_file="output_analysis.csv", output_format=None):
         """
-        Сохраняет результаты обработки файлов в CSV файл.
+        Сохраняет результаты обработки файлов в CSV или Parquet файл.
 
-        :param data: Список с результатами обработки файлов.
-        """
-        process_logger.info(f"Total files processed: {len(data)}")
-        if data:
-            # Создаём директорию для файла, если она не существует
-            output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+        :param data: Список (или любой итератор) с результатами обработки файлов.
+        :param output_format: "csv" или "parquet"; по умолчанию определяется по расширению output_file.
 
-            df = pd.DataFrame(data)
-            df.to_csv(output_file, index=False)
-            process_logger.info(f"Results saved to {output_file}")
+        Динамические метаданные строк (EXIF, теги) пишутся в таблицу <output_file>.meta.<формат>.
+        """
+        with IndexWriter(output_file, output_format) as writer:
+            for row in data:
+                writer.write(row)
+        process_logger.info(f"Total files processed: {writer.rows_written}")
 
 
 class FileManager(BaseFileManager):
     """
     Класс для обработки файлов в указанной директории.
-    Для каждого файла определяется MIME-тип, и в зависимости от типа выбирается соответствующий обработчик.
+    Для каждого файла по реестру обработчиков определяется тип (по расширению или сигнатуре),
+    и в зависимости от типа выбирается соответствующий обработчик.
     Результаты обработки сохраняются в CSV файл.
+
+    :param directory: Корневая директория или список директорий (обходятся по очереди).
+    :param workers: Количество процессов для параллельной обработки (1 — без пула).
+    :param chunk_size: Количество файлов в пакете, передаваемом процессу пула.
+    :param incremental: Переиспользовать результаты неизменившихся файлов из манифеста рядом с output_file.
+    :param output_format: Формат индекса: "csv" или "parquet"; по умолчанию определяется по расширению output_file.
+    :param resume: Продолжить прерванный проход: файлы из журнала <output>.journal не обрабатываются повторно.
+    :param journal: Вести журнал обработанных файлов во время run(), чтобы прерванный проход можно было возобновить.
+    :param timeout: Бюджет времени на файл в секундах или словарь тип файла → секунды (ключ "default" — для
+                    остальных). Файл, превысивший бюджет, записывается с ошибкой таймаута, его процесс перезапускается.
+    :param memory_limit: Лимит памяти процесса-обработчика в байтах (только POSIX).
+    :param duplicates: После индексации построить таблицу дубликатов <output>.duplicates.csv.
+    :param walk_threads: Количество потоков обхода каталогов.
+    :param shard_plan: ShardPlan: обрабатывать только поддеревья шарда shard_index этого плана.
+    :param shard_index: Номер шарда (с нуля) в shard_plan.
+    :param metrics_file: Файл, в который во время обработки записываются метрики обработчиков
+                         в текстовом формате Prometheus (например, для textfile-коллектора node_exporter).
+    :param metrics_interval: Период (секунды) перезаписи metrics_file.
+    :param profile_dir: Включает профилирование обработчиков: после run() в каталог записываются статистика
+                        cProfile по каждому обработчику, свёрнутые стеки для flame graph и отчёт о самых
+                        медленных файлах (см. ScanProfiler.write_report).
+    :param profile_top: Сколько самых медленных файлов включать в отчёт.
+    :param include: Шаблоны fnmatch (по имени файла или пути относительно корня): обрабатываются только
+                    подходящие файлы.
+    :param exclude: Шаблоны fnmatch: подходящие файлы пропускаются.
+    :param walk_queue_depth: Сколько найденных обходом файлов может ждать обработки (обратное давление на обход).
+    :param result_queue_depth: Сколько готовых строк может ждать записи в индекс.
     """
-    def __init__(self, directory, output_file):
-        super().__init__()
+    def __init__(self, directory, output_file, workers=1, chunk_size=64, incremental=False, output_format=None,
+                 resume=False, journal=True, timeout=None, memory_limit=None, duplicates=False,
+                 walk_threads=DEFAULT_WALK_THREADS, shard_plan=None, shard_index=None, metrics_file=None,
+                 metrics_interval=15.0, profile_dir=None, profile_top=20, include=None, exclude=None,
+                 walk_queue_depth=DEFAULT_WALK_DEPTH, result_queue_depth=DEFAULT_RESULT_DEPTH):
+        super().__init__(walk_threads=walk_threads)
         self.directory = directory
         self.output_file = output_file
-        self.handlers = {
-            'application/pdf': PDFProcessor(),
-            'image': ImageProcessor(),
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': DOCXProcessor(),
-            'application/vnd.openxmlformats-officedocument.themeManager+xml' : DOCXProcessor(),
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ExcelProcessor(),
-            'application/msword': DOCXProcessor(),
-            'audio': AudioProcessor(),
-            'video': VideoProcessor(),
-        }
-
-    def run(self):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.incremental = incremental
+        self.output_format = output_format
+        self.resume = resume
+        self.journal = journal
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.duplicates = duplicates
+        self.shard_plan = shard_plan
+        self.shard_index = shard_index
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self._metrics_written = 0.0
+        self.profile_dir = profile_dir
+        self.include = include
+        self.exclude = exclude
+        self.walk_queue_depth = walk_queue_depth
+        self.result_queue_depth = result_queue_depth
+        # при выключенном профилировании process_file проверяет только этот атрибут
+        self.profiler = ScanProfiler(profile_top) if profile_dir else None
+        self.registry = ProcessorRegistry.desktop()
+        # обработчики по префиксам MIME-типов (для get_handler), те же экземпляры, что и в реестре
+        self.handlers = {prefix: self.registry.processors[file_type] for prefix, file_type in MIME_PREFIX_TYPES}
+
+    def get_entries(self, directory=None):
+        """
+        Обходит директорию (или по очереди каждую из списка); если задан shard_plan,
+        обходятся только поддеревья шарда shard_index. Файлы отбираются по шаблонам include/exclude.
+
+        :return: FileEntry для каждого файла.
+        """
+        if self.shard_plan is not None and directory in (None, self.directory):
+            walker = ParallelTreeWalker(threads=self.walk_threads)
+            entries = self.shard_plan.iter_entries(self.shard_index, walker)
+            return filter_entries(entries, self.shard_plan.root, self.include, self.exclude)
+        if directory is None:
+            directory = self.directory
+        if isinstance(directory, (list, tuple)):
+            return self._iter_roots(directory)
+        return filter_entries(super().get_entries(directory), directory, self.include, self.exclude)
+
+    def _iter_roots(self, directories):
+        """Обходит директории по очереди; close() доходит до обходчика текущей и останавливает его потоки."""
+        for directory in directories:
+            yield from self.get_entries(directory)
+
+    def roots(self):
+        """
+        Возвращает абсолютные пути корневых директорий менеджера.
+
+        :return: Список корней (один элемент, если directory — строка).
+        """
+        directories = self.directory if isinstance(self.directory, (list, tuple)) else [self.directory]
+        return [os.path.abspath(directory) for directory in directories]
+
+    def accepts(self, filepath):
+        """
+        Проверяет, попадает ли файл в обход менеджера так же, как в get_entries: лежит в одном из корней
+        (при заданном shard_plan — в поддереве шарда shard_index) и проходит шаблоны include/exclude.
+
+        :param filepath: Путь к файлу.
+        :return: True, если файл обрабатывается этим менеджером.
+        """
+        filepath = os.path.abspath(os.fspath(filepath))
+        if self.shard_plan is not None:
+            if not self.shard_plan.owns(filepath, self.shard_index):
+                return False
+            root = self.shard_plan.root
+        else:
+            root = next((root for root in self.roots() if filepath.startswith(os.path.join(root, ""))), None)
+            if root is None:
+                return False
+        return ((not self.include or matches(filepath, root, self.include))
+                and not (self.exclude and matches(filepath, root, self.exclude)))
+
+    def run(self, on_result=None):
         """
         Запускает процесс обработки файлов в указанной директории.
-        Результаты обработки сохраняются в CSV файл.
+        Обход, обработчики и запись индекса работают как стадии ScanPipeline, связанные
+        очередями ограниченной длины; результаты потоково сохраняются в CSV или Parquet файл.
+
+        :param on_result: Необязательная функция on_result(row), вызываемая для каждой сохраняемой строки
+                          (например, для вывода прогресса).
         """
         try:
             start_time = time.time()
-            data = []
-
-            for filepath in self.get_files(self.directory):
-                try:
-                    mime_type, _ = mimetypes.guess_type(filepath)
-                    handler = self.get_handler(mime_type)
-                    if handler:
-                        file_data = handler.process(filepath)
-                    else:
-                        file_data = self.default_handler.get_generic_info(filepath)
-
-                    if file_data:
-                        data.append(file_data)
-                except Exception as e:
-                    error_logger.error(f"Error processing {filepath}: {e}")
-
-        # Преобразуем путь к output_file относительно директории проекта
-            if not os.path.isabs(self.output_file):
-                self.output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.output_file)
-
-        # Создаем директорию, если она не существует
-            output_dir = os.path.dirname(self.output_file)
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+            self.resolve_output_file()
+            journal = self.open_journal() if self.journal or self.resume else None
+            stage = ScanPipeline(self, self.walk_queue_depth, self.result_queue_depth).results(journal)
             try:
-                self.save_results(data, self.output_file)
+                results = _observed(stage, on_result) if on_result is not None else stage
+                self.save_results(results, self.output_file, self.output_format)
             except Exception as e:
                 error_logger.error(f"Error saving results to {self.output_file}: {e}")
                 raise
+            finally:
+                # стадии останавливаются до закрытия журнала, в который пишет поток обработки
+                stage.stop()
+                if journal:
+                    journal.close()
+            if journal:
+                journal.remove()
+            if self.duplicates:
+                find_duplicates(self.output_file)
+            if self.profiler is not None:
+                self.profiler.write_report(self.profile_dir)
 
             total_time = time.time() - start_time
             process_logger.info(f"Total processing time: {total_time:.2f} seconds")
@@ -118,6 +227,227 @@ class FileManager(BaseFileManager):
             error_logger.error(f"Error in FileManager run: {str(e)}")
             raise
 
+    def run_two_phase(self, priority="smallest", background=True, **options):
+        """
+        Двухфазный проход: сначала индекс из общей информации о файлах,
+        затем извлечение метаданных обработчиками в порядке priority.
+
+        :param priority: Порядок второй фазы ("smallest", "largest", "newest", "path") или функция key(file_type, entry).
+        :param background: Выполнять вторую фазу в фоновом потоке; иначе дождаться её завершения.
+        :param options: Параметры TwoPhaseScan (batch_size, flush_interval, max_deferred).
+        :return: TwoPhaseScan для отслеживания прогресса, смены приоритета и остановки.
+        """
+        scan = TwoPhaseScan(self, priority=priority, **options)
+        scan.run_phase_one()
+        if background:
+            return scan.start()
+        scan.run_phase_two()
+        return scan
+
+    def watch(self, stop_event=None, initial_run=True, **options):
+        """
+        Запускает режим наблюдения: после полного прохода индекс обновляется
+        по событиям файловой системы (inotify, при его отсутствии — опрос).
+
+        :param stop_event: threading.Event для остановки наблюдения; без него наблюдение бесконечно.
+        :param initial_run: Выполнить полный проход перед началом наблюдения.
+        :param options: Параметры IndexWatcher (debounce, max_delay, poll_interval).
+        """
+        IndexWatcher(self, **options).run(stop_event, initial_run=initial_run)
+
+    def resolve_output_file(self):
+        """
+        Приводит output_file к абсолютному пути и создаёт его директорию.
+
+        :return: Абсолютный путь к выходному файлу.
+        """
+        # Преобразуем путь к output_file относительно директории проекта
+        if not os.path.isabs(self.output_file):
+            self.output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.output_file)
+
+        # Создаем директорию, если она не существует
+        output_dir = os.path.dirname(self.output_file)
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        return self.output_file
+
+    def open_journal(self):
+        """
+        Открывает журнал обработанных файлов для output_file.
+
+        При resume=True журнал предыдущего прохода воспроизводится, иначе он удаляется.
+
+        :return: ScanJournal.
+        """
+        journal = ScanJournal(self.resolve_output_file())
+        if self.resume:
+            journal.replay()
+        else:
+            journal.remove()
+        return journal
+
+    def start_count(self):
+        """
+        Запускает в фоне быстрый подсчёт файлов директории для индикатора прогресса.
+
+        :return: FileCounter (total становится известен по окончании подсчёта).
+        """
+        return FileCounter(self.directory, self.include, self.exclude).start()
+
+    def iter_results(self, entries=None, progress=None, journal=None):
+        """
+        Генерирует результаты обработки файлов по мере их готовности, не накапливая их в памяти.
+
+        В инкрементальном режиме манифест обновляется по ходу обхода и финализируется
+        (с удалением исчезнувших файлов) только если генератор был исчерпан полностью.
+
+        :param entries: Пути или FileEntry для обработки; по умолчанию — обход self.directory.
+        :param progress: Необязательная функция progress(processed_count), вызываемая после каждого файла.
+        :param journal: ScanJournal для записи обработанных файлов и пропуска уже обработанных.
+        :return: Словари с результатами обработки.
+        """
+        if entries is None:
+            entries = self.get_entries(self.directory)
+        manifest = IndexManifest(self.resolve_output_file()) if self.incremental else None
+        try:
+            for i, (_, file_data) in enumerate(self.iter_processed(entries, manifest, journal), 1):
+                if file_data:
+                    yield file_data
+                if progress:
+                    progress(i)
+            if manifest:
+                manifest.finish()
+        finally:
+            if manifest:
+                manifest.close()
+
+    def iter_processed(self, filepaths, manifest=None, journal=None):
+        """
+        Обрабатывает файлы движком выполнения и генерирует их результаты.
+
+        :param filepaths: Пути к файлам или записи FileEntry.
+        :param manifest: IndexManifest для инкрементального режима или None.
+        :param journal: ScanJournal: готовые результаты берутся из него, новые — дописываются.
+        :return: Пары (filepath, file_data) в порядке входных путей; при ошибке file_data равен None,
+                 а ошибка записывается в лог.
+        """
+        engine = ExecutionEngine(self, workers=self.workers, chunk_size=self.chunk_size,
+                                 timeout=self.timeout, memory_limit=self.memory_limit)
+
+        def lookup(filepath):
+            # манифест опрашивается всегда, чтобы зафиксировать подпись файла
+            cached = manifest.lookup(filepath) if manifest else None
+            journaled = journal.lookup(filepath) if journal else None
+            return journaled if journaled is not None else cached
+
+        for filepath, file_data, error in engine.map(filepaths, lookup=lookup if manifest or journal else None):
+            if error:
+                error_logger.error(f"Error processing {filepath}: {error}")
+                if manifest:
+                    manifest.discard(filepath)
+                if journal:
+                    journal.record(filepath, None)
+                self.write_metrics()
+                yield filepath, None
+                continue
+            if manifest:
+                manifest.record(filepath, file_data)
+            if journal:
+                journal.record(filepath, file_data)
+            self.write_metrics()
+            yield filepath, file_data
+        self.write_metrics(force=True)
+
+    def process_file(self, filepath, file_type=_UNRESOLVED):
+        """
+        Обрабатывает один файл обработчиком, подходящим по типу файла.
+
+        :param filepath: Путь к файлу или FileEntry.
+        :param file_type: Тип файла, уже определённый вызывающим (пул песочниц определяет его
+            для бюджета времени), чтобы сигнатура не читалась повторно; по умолчанию определяется здесь.
+        :return: Словарь с результатами обработки или None.
+        """
+        # одна запись на файл: stat, полученный обработчиком, используют метрики и профилировщик
+        filepath = as_file_entry(filepath)
+        if file_type is _UNRESOLVED:
+            file_type = self.registry.resolve_type(filepath)
+        handler = self.registry.processors.get(file_type)
+        if handler is None:
+            return self.process_generic(filepath)
+        if self.profiler is not None:
+            return self.profiler.call(type(handler).__name__, handler.process, filepath)
+        return handler.process(filepath)
+
+    def prepare_files(self, filepaths):
+        """
+        Готовит обработчики к пакету файлов перед их обработкой (см. FileProcessor.prepare).
+
+        Ошибка подготовки не прерывает обработку: файлы будут обработаны по одному.
+
+        :param filepaths: Пути к файлам или записи FileEntry пакета.
+        """
+        try:
+            self.registry.prepare(filepaths)
+        except Exception as e:
+            error_logger.error(f"Failed to prepare {len(filepaths)} files: {e}")
+
+    def process_generic(self, filepath):
+        """
+        Возвращает общую информацию о файле без обработчика; учитывается в метриках как "generic".
+
+        :param filepath: Путь к файлу или FileEntry.
+        :return: Словарь с общей информацией о файле или None.
+        """
+        started = time.perf_counter()
+        if self.profiler is not None:
+            row = self.profiler.call("generic", self.default_handler.get_generic_info, filepath)
+        else:
+            row = self.default_handler.get_generic_info(filepath)
+        metrics.REGISTRY.observe("generic", time.perf_counter() - started, metrics.file_size(filepath))
+        return row
+
+    def write_metrics(self, force=False):
+        """
+        Записывает метрики обработчиков в metrics_file, если он задан и прошло metrics_interval секунд.
+
+        :param force: Записать независимо от интервала.
+        """
+        if not self.metrics_file:
+            return
+        now = time.monotonic()
+        if not force and now - self._metrics_written < self.metrics_interval:
+            return
+        self._metrics_written = now
+        try:
+            metrics.REGISTRY.write(self.metrics_file)
+        except OSError as e:
+            error_logger.error(f"Failed to write metrics to {self.metrics_file}: {e}")
+
+    def init_worker_state(self):
+        """
+        Готовит копию менеджера в процессе пула: метрики и профиль, унаследованные
+        от основного процесса при fork, уже учтены в нём и обнуляются.
+        """
+        metrics.REGISTRY.reset()
+        if self.profiler is not None:
+            self.profiler.drain()
+
+    def get_handler_state(self):
+        """
+        Возвращает состояние обработчиков для передачи из процесса пула.
+
+        Метрики и профиль процесса передаются вместе с состоянием и обнуляются, чтобы не учитываться дважды.
+        """
+        return {"processors": self.registry.get_state(), "metrics": metrics.REGISTRY.drain(),
+                "profile": self.profiler.drain() if self.profiler is not None else None}
+
+    def merge_handler_state(self, state):
+        """Сливает состояние обработчиков, метрики и профиль, полученные из процесса пула."""
+        self.registry.merge_state(state["processors"])
+        metrics.REGISTRY.merge(state["metrics"])
+        if self.profiler is not None:
+            self.profiler.merge(state["profile"])
+
     def get_handler(self, mime_type):
         """Возвращает обработчик для MIME-типа."""
         if not mime_type:
@@ -130,87 +460,69 @@ class FileManager(BaseFileManager):
 
 
 
+def _observed(rows, callback):
+    """Передаёт каждую строку в callback, не задерживая поток строк."""
+    for row in rows:
+        callback(row)
+        yield row
+
+
 class FileManagerWeb(BaseFileManager):
     """
     Класс для обработки файлов в веб-среде.
     Для каждого файла определяется расширение, и в зависимости от расширения выбирается соответствующий обработчик.
     Результаты обработки возвращаются в виде списка словарей.
     """
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, walk_threads=DEFAULT_WALK_THREADS):
         """
         Инициализирует FileManagerWeb.
         
         :param folder_path: Путь к папке, содержащей файлы для обработки.
+        :param walk_threads: Количество потоков обхода каталогов.
         """
-        super().__init__()
+        super().__init__(walk_threads=walk_threads)
         self.folder_path = folder_path
+        self.registry = ProcessorRegistry.web()
 
     def process_files(self):
         """
         Обрабатывает файлы в указанной папке.
         
-        :return: Список словарей с результатами обработки файлов.
+        :return: RecordBatch — компактная последовательность словарей с результатами обработки файлов.
         """
-        results = []
-        for filepath in self.get_files(self.folder_path):
-            file_name = os.path.basename(filepath)
-            extension = os.path.splitext(file_name)[1].lower()
+        results = RecordBatch()
+        for entry in self.get_entries(self.folder_path):
+            file_name = entry.name
 
-            # детектим обработчик по расширению файла
-            processor = self.get_processor(extension)
+            # детектим обработчик по расширению файла (или по сигнатуре, если расширение неизвестно)
+            file_type = self.registry.resolve_type(entry)
+            processor = self.registry.processors.get(file_type)
             if processor:
-                result = processor.process(filepath)
+                result = processor.process(entry)
             else:
                 result = {"file_name": file_name, "type": "unknown"}
 
-            # общая информация о файле
+            # общая информация о файле берётся из stat, полученного при обходе
+            stats = entry.get_stat()
             result.update({
                 "file_name": file_name,
-                "file_size": os.path.getsize(filepath),
-                "creation_time": datetime.fromtimestamp(os.path.getctime(filepath)),
-                "modification_time": datetime.fromtimestamp(os.path.getmtime(filepath)),
-                "type": self.get_file_type(extension),
+                "file_size": stats.st_size,
+                "creation_time": datetime.fromtimestamp(stats.st_ctime),
+                "modification_time": datetime.fromtimestamp(stats.st_mtime),
+                "type": file_type or "unknown",
             })
             results.append(result)
         return results
 
     def get_processor(self, extension):
         """Возвращает обработчик для расширения файла."""
-        match extension:
-            case ".pdf":
-                return PDFProcessorWeb()
-            case ".png" | ".jpg" | ".jpeg" | ".bmp" | ".gif":
-                return ImageProcessorWeb()
-            case ".doc" | ".docx":
-                return DOCXProcessorWeb()
-            case ".xls" | ".xlsx":
-                return ExcelProcessorWeb()
-            case ".mp3" | ".wav" | ".flac" | ".aac" | ".ogg":
-                return AudioProcessorWeb()
-            case ".mp4" | ".avi" | ".mov" | ".mkv" | ".flv":
-                return VideoProcessorWeb()
-            case _:
-                return None
+        return self.registry.for_extension(extension)
 
     def get_file_type(self, extension):
         """
         Определяет тип файла на основе его расширения.
         
-        :param file_path: Путь к файлу.
+        :param extension: Расширение файла (с точкой).
         :return: Тип файла.
         """
-        match extension:
-            case ".mp3" | ".wav" | ".flac" | ".aac" | ".ogg":
-                return "audio"
-            case ".pdf":
-                return "pdf"
-            case ".png" | ".jpg" | ".jpeg" | ".bmp" | ".gif":
-                return "image"
-            case ".doc" | ".docx":
-                return "document"
-            case ".xls" | ".xlsx":
-                return "excel"
-            case ".mp4" | ".avi" | ".mov" | ".mkv" | ".flv":
-                return "video"
-            case _:
-                return "unknown"
+        return self.registry.extension_table.get(extension.lower()) or "unknown"
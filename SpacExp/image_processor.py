@@ -1,7 +1,8 @@
 from PIL import Image, ExifTags
 from .base_processor import FileProcessor
+from .metadata_store import META_KEY, metadata_value
 import time, os
-from .logging_config import setup_logging
+from .logging_config import setup_logging, file_logger
 
 # логгирование
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -17,12 +18,6 @@ class ImageProcessor(FileProcessor):
     Методы:
         process(filepath): Извлекает информацию о размере изображения, DPI, метаданных EXIF.
     """
-    def __init__(self):
-        """
-        Инициализирует объект ImageProcessor с набором всех уникальных ключей EXIF, 
-        которые встречаются во время обработки.
-        """
-        self.all_exif_keys = set()
     def process(self, filepath):
         """
         Обрабатывает изображение и извлекает параметры, такие как размер, DPI и EXIF-данные.
@@ -36,43 +31,41 @@ class ImageProcessor(FileProcessor):
                 - image_height (int): Высота изображения.
                 - dpi_x (float или None): DPI по горизонтали.
                 - dpi_y (float или None): DPI по вертикали.
-                - exif_data (dict): Словарь с сырыми EXIF-данными.
-                - exif_* (различные ключи EXIF): Индивидуальные данные EXIF.
+                - _meta (dict): {"exif": {ключ: значение}} — теги EXIF изображения; записываются
+                  в таблицу метаданных, а не в колонки индекса.
 
             В случае ошибки возвращает словарь с ключом "error" и описанием ошибки.
         """
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
             with Image.open(filepath) as img:
                 width, height = img.size
                 dpi = img.info.get('dpi', (None, None))
                 exif_data = img.getexif()
-                exif = {ExifTags.TAGS.get(tag, tag): value for tag, value in exif_data.items()} if exif_data else {}
+                exif = {
+                    str(ExifTags.TAGS.get(tag, tag)): metadata_value(value) for tag, value in exif_data.items()
+                } if exif_data else {}
 
                 file_info.update({
                     "image_width": width,
                     "image_height": height,
                     "dpi_x": dpi[0],
                     "dpi_y": dpi[1],
-                    "exif_data": exif,
                 })
-
-                # tracking all unique exif keys encountered
-                self.all_exif_keys.update(exif.keys())
-
-                # adding each exif key-value pair to file_info, or None if key is missing
-                for key in self.all_exif_keys:
-                    file_info[f"exif_{key}"] = exif.get(key, None)
+                # только теги этого изображения: стоимость не зависит от числа ранее обработанных файлов
+                if exif:
+                    file_info[META_KEY] = {"exif": exif}
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Image processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Image processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing image {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
 
 class ImageProcessorWeb(FileProcessor):
     """
@@ -108,6 +101,7 @@ class ImageProcessorWeb(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(file_path)
+            file_path = os.fspath(file_path)
             
             # processing images
             with Image.open(file_path) as img:
@@ -121,9 +115,9 @@ class ImageProcessorWeb(FileProcessor):
             })
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Image processed: {file_path} in {elapsed_time:.2f} seconds")
+            file_logger.info("Image processed: %s in %.2f seconds", file_path, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing image {file_path}: {e}")
-            return {"type": "image", "error": str(e)}  # setting the type despite an error
+            return self.error_info(e, type="image")  # setting the type despite an error
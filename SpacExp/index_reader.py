@@ -0,0 +1,101 @@
+import os
+import csv
+import pandas as pd
+
+from .result_writer import PYARROW_AVAILABLE
+
+
+def index_format(index_file):
+    """
+    Определяет формат файла индекса по расширению.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+
+    Возвращает:
+        str: "parquet" для .parquet/.pq, иначе "csv".
+    """
+    extension = os.path.splitext(index_file)[1].lower()
+    return "parquet" if extension in (".parquet", ".pq") else "csv"
+
+
+def load_index(index_file, columns=None):
+    """
+    Загружает файл индекса (CSV или Parquet) в DataFrame.
+
+    Для Parquet читаются только запрошенные колонки, без разбора остальных;
+    для CSV лишние колонки отбрасываются при чтении. Отсутствующие в индексе
+    колонки из списка columns игнорируются. Если у индекса есть таблица изменений
+    (режим наблюдения, вторая фаза двухфазной индексации), она накладывается на результат.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+        columns (list, optional): Нужные колонки; по умолчанию загружаются все.
+
+    Возвращает:
+        pd.DataFrame: Данные индекса.
+    """
+    from .metadata_store import patch_frame, read_patch
+    patch = read_patch(index_file)
+    if patch is None:
+        return _read_index(index_file, columns)
+    frame = _read_index(index_file, None if columns is None else list(dict.fromkeys([*columns, "file_path"])))
+    frame = patch_frame(frame, *patch, columns=columns, output_format=index_format(index_file))
+    if columns is not None:
+        frame = frame[[column for column in columns if column in frame.columns]]
+    return frame
+
+
+def _read_index(index_file, columns=None):
+    if index_format(index_file) == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to read parquet index files")
+        import pyarrow.parquet as pq
+        if columns is not None:
+            available = set(pq.read_schema(index_file).names)
+            columns = [column for column in columns if column in available]
+        return pd.read_parquet(index_file, columns=columns)
+    if columns is None:
+        return pd.read_csv(index_file)
+    wanted = set(columns)
+    return pd.read_csv(index_file, usecols=lambda column: column in wanted)
+
+
+def iter_index_rows(index_file, batch_size=10000):
+    """
+    Потоково читает строки индекса как словари.
+
+    Для CSV значения возвращаются в исходном текстовом виде (пустые — как None),
+    чтобы перезапись индекса не меняла представление неизменённых строк.
+    """
+    if not os.path.exists(index_file):
+        return
+    if index_format(index_file) == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to read parquet index files")
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(index_file).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+        return
+    with open(index_file, newline="", encoding="utf-8") as source:
+        for row in csv.DictReader(source):
+            yield {column: (value if value != "" else None) for column, value in row.items()}
+
+
+def index_columns(index_file):
+    """
+    Возвращает список колонок индекса, не читая данные.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+
+    Возвращает:
+        list: Имена колонок в порядке файла.
+    """
+    if index_format(index_file) == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to read parquet index files")
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(index_file).names)
+    with open(index_file, newline="", encoding="utf-8") as source:
+        return next(csv.reader(source), [])
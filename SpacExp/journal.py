@@ -0,0 +1,116 @@
+import os
+import json
+
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class ScanJournal:
+    """
+    Журнал обработанных файлов для возобновления прерванного прохода.
+
+    Журнал хранится рядом с выходным файлом (<output>.journal) в формате JSON Lines:
+    одна строка на обработанный файл с его результатом. Запись только дописывается
+    и принудительно сбрасывается на диск (fsync) каждые fsync_every записей.
+    После успешного завершения прохода журнал удаляется.
+
+    Аргументы:
+        output_file (str): Путь к выходному файлу индекса.
+        fsync_every (int): Количество записей между вызовами fsync.
+    """
+    def __init__(self, output_file, fsync_every=256):
+        self.path = f"{output_file}.journal"
+        self.fsync_every = fsync_every
+        self.completed = {}
+        self._handle = None
+        self._unsynced = 0
+
+    def replay(self):
+        """
+        Читает журнал предыдущего прохода.
+
+        Незавершённая последняя строка (обрыв при записи) игнорируется.
+
+        Возвращает:
+            int: Количество восстановленных записей.
+        """
+        self.completed = {}
+        if not os.path.exists(self.path):
+            return 0
+        valid_size = 0
+        with open(self.path, "rb") as journal:
+            for raw_line in journal:
+                if not raw_line.endswith(b"\n"):
+                    break
+                valid_size += len(raw_line)
+                line = raw_line.decode("utf-8")
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                # файлы, обработка которых завершилась ошибкой (в том числе строки с "error",
+                # например таймаут песочницы), будут обработаны заново, как и в манифесте
+                row = record.get("row")
+                if not row or "error" in row:
+                    continue
+                # строка результата хранится сериализованной до момента обращения
+                self.completed[record["path"]] = line
+        # обрезаем оборванную строку, чтобы новые записи начинались с новой строки
+        if valid_size < os.path.getsize(self.path):
+            os.truncate(self.path, valid_size)
+        process_logger.info(f"Journal replayed: {len(self.completed)} files already processed")
+        return len(self.completed)
+
+    def lookup(self, filepath):
+        """
+        Возвращает результат файла из журнала предыдущего прохода.
+
+        Аргументы:
+            filepath (str | FileEntry): Путь к файлу.
+
+        Возвращает:
+            dict: Сохранённый результат или None, если файл не был успешно обработан
+                (результат с ключом "error" успешным не считается).
+        """
+        line = self.completed.get(os.fspath(filepath))
+        return json.loads(line)["row"] if line else None
+
+    def record(self, filepath, row):
+        """
+        Дописывает результат обработки файла в журнал.
+
+        Аргументы:
+            filepath (str | FileEntry): Путь к файлу.
+            row (dict): Результат обработки или None при ошибке.
+        """
+        filepath = os.fspath(filepath)
+        if filepath in self.completed:
+            return
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps({"path": filepath, "row": row}, default=str) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Сбрасывает журнал на диск."""
+        if self._handle is None:
+            return
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """Сбрасывает и закрывает журнал, оставляя его на диске для возобновления."""
+        if self._handle is not None:
+            self.sync()
+            self._handle.close()
+            self._handle = None
+
+    def remove(self):
+        """Удаляет журнал после успешного завершения прохода."""
+        self.close()
+        self.completed = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,18 +1,92 @@
 # logging_config.py
+import atexit
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import threading
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# логгер сообщений об обработке отдельных файлов ("Image processed: ... in N seconds");
+# их много, поэтому в лог попадает только каждое FILE_LOG_SAMPLE_EVERY-е
+FILE_LOGGER = "process.files"
+FILE_LOG_SAMPLE_EVERY = 100
+
+_lock = threading.Lock()
+_handlers = []
+_listeners = []
+_worker_queue = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает одну из every записей уровня ниже WARNING (первую, every+1-ю и т.д.).
+
+    Фильтр стоит на логгере, поэтому отброшенные записи не форматируются и не попадают в очередь.
+
+    Аргументы:
+        every (int): Период выборки; 1 — пропускать все записи.
+    """
+    def __init__(self, every=FILE_LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, int(every))
+        self.seen = 0
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        self.seen += 1
+        if (self.seen - 1) % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+file_logger = logging.getLogger(FILE_LOGGER)
+_sampler = SamplingFilter()
+file_logger.addFilter(_sampler)
+
+
+def set_file_log_sampling(every):
+    """
+    Задаёт период выборки сообщений об обработке отдельных файлов.
+
+    Аргументы:
+        every (int): В лог попадает каждое every-е сообщение; 1 — все сообщения.
+    """
+    _sampler.every = max(1, int(every))
+
+
+def file_log_sampling():
+    """Возвращает текущий период выборки сообщений об обработке отдельных файлов."""
+    return _sampler.every
+
 
 def setup_logging(project_root):
-    """Настраивает логирование."""
-    log_file = os.path.join(project_root, 'file_analyzer.log')
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    """
+    Настраивает логирование.
+
+    Вызывается каждым модулем при импорте; настраивает корневой логгер только один раз.
+    Записи не пишутся в файл в вызывающем потоке: корневой логгер кладёт их в очередь,
+    а фоновый QueueListener пишет в file_analyzer.log и в консоль. Если у корневого
+    логгера уже есть обработчики (логирование настроено приложением), они не заменяются.
+    """
+    with _lock:
+        root = logging.getLogger()
+        if not _listeners and not root.handlers:
+            log_file = os.path.join(project_root, 'file_analyzer.log')
+            formatter = logging.Formatter(LOG_FORMAT)
+            for handler in (logging.FileHandler(log_file), logging.StreamHandler()):
+                handler.setFormatter(formatter)
+                _handlers.append(handler)
+            records = queue.SimpleQueue()
+            _start_listener(records)
+            root.addHandler(logging.handlers.QueueHandler(records))
+            root.setLevel(logging.INFO)
+            atexit.register(stop_logging)
 
     # Логгер для ошибок
     error_logger = logging.getLogger('error')
@@ -23,3 +97,88 @@ def setup_logging(project_root):
     process_logger.setLevel(logging.INFO)
 
     return process_logger, error_logger
+
+
+def _start_listener(records):
+    listener = logging.handlers.QueueListener(records, *_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def worker_log_queue():
+    """
+    Возвращает межпроцессную очередь, через которую процессы пула передают записи лога.
+
+    Записи из неё пишет тот же фоновый писатель, что и записи основного процесса.
+    Если логирование настроено не через setup_logging, возвращает None.
+    """
+    global _worker_queue
+    with _lock:
+        if _worker_queue is None and _handlers:
+            # процессы пула запускаются через forkserver или spawn (см. sandbox.worker_context),
+            # а очередь, созданная в контексте fork, им передать нельзя
+            _worker_queue = multiprocessing.get_context("spawn").Queue()
+            _start_listener(_worker_queue)
+            # multiprocessing закрывает свои каналы при выходе; писатель должен остановиться раньше
+            atexit.register(stop_logging)
+        return _worker_queue
+
+
+def init_worker_logging(records=None, sample_every=None):
+    """
+    Настраивает логирование в процессе пула.
+
+    Если передана очередь, все записи процесса передаются через неё писателю основного процесса.
+    Без очереди процесс пишет в те же файл и консоль сам, синхронно: так работают процессы,
+    которые могут быть убиты в любой момент и не должны держать блокировку общей очереди.
+
+    Аргументы:
+        records (multiprocessing.Queue, optional): Очередь из worker_log_queue().
+        sample_every (int, optional): Период выборки основного процесса (file_log_sampling());
+            процесс, запущенный не через fork, не наследует его.
+    """
+    global _lock, _worker_queue
+    if sample_every is not None:
+        set_file_log_sampling(sample_every)
+    if not _handlers:
+        # логирование настроено приложением, а не setup_logging
+        return
+    # блокировку основного процесса не берём: при fork она могла скопироваться захваченной
+    # другим его потоком; процесс получает свою
+    _lock = threading.Lock()
+    _worker_queue = None
+    # писатели, унаследованные при fork, в дочернем процессе не работают; запущенные
+    # при импорте модулей в новом процессе (spawn) останавливаются
+    listeners = list(_listeners)
+    _listeners.clear()
+    for listener in listeners:
+        if listener._thread is not None and listener._thread.is_alive():
+            listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if records is not None:
+        root.addHandler(logging.handlers.QueueHandler(records))
+    else:
+        for handler in _handlers:
+            root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def flush_logging():
+    """Дожидается записи всех накопленных в очередях записей."""
+    with _lock:
+        for listener in _listeners:
+            listener.stop()
+            listener.start()
+
+
+def stop_logging():
+    """Останавливает фоновых писателей, дописав накопленные записи (вызывается при выходе)."""
+    with _lock:
+        for listener in _listeners:
+            if listener._thread is not None:
+                listener.stop()
+        for handler in _handlers:
+            handler.flush()
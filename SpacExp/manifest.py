@@ -0,0 +1,138 @@
+import os
+import json
+import sqlite3
+
+from .base_processor import as_file_entry
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class IndexManifest:
+    """
+    Манифест инкрементальной индексации.
+
+    Хранится рядом с выходным файлом (SQLite) и для каждого пути содержит подпись файла
+    (inode, размер, mtime_ns) и строку результата предыдущей обработки. Если подпись
+    не изменилась, строка переиспользуется без вызова обработчика. Файлы, не встреченные
+    в текущем проходе, удаляются из манифеста в finish().
+
+    Аргументы:
+        output_file (str): Путь к выходному файлу индекса.
+        batch_size (int): Количество изменений, после которого выполняется commit.
+    """
+    def __init__(self, output_file, batch_size=1000):
+        self.path = self.manifest_path(output_file)
+        self.batch_size = batch_size
+        self._pending = {}
+        self._writes = []
+        self._touches = []
+        self.reused = 0
+        self.updated = 0
+
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir and not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+            "generation INTEGER, row TEXT)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        # каждый проход получает новый номер поколения; всё, что не обновлено, — удалённые файлы
+        self.generation = int(stored[0]) + 1 if stored else 1
+
+    @staticmethod
+    def manifest_path(output_file):
+        """Возвращает путь к манифесту для указанного выходного файла."""
+        return f"{output_file}.manifest.sqlite3"
+
+    @staticmethod
+    def signature(stats):
+        """Возвращает подпись файла (inode, размер, mtime_ns) по результату os.stat."""
+        return stats.st_ino, stats.st_size, stats.st_mtime_ns
+
+    def lookup(self, filepath):
+        """
+        Возвращает сохранённую строку, если подпись файла не изменилась.
+
+        Аргументы:
+            filepath (str | FileEntry): Путь к файлу или запись обхода; для записи используется её stat.
+
+        Возвращает:
+            dict: Строка предыдущей обработки или None, если файл нужно обработать заново.
+        """
+        entry = as_file_entry(filepath)
+        filepath = entry.path
+        signature = self.signature(entry.get_stat())
+        stored = self.connection.execute(
+            "SELECT inode, size, mtime_ns, row FROM files WHERE path = ?", (filepath,)
+        ).fetchone()
+        hit = stored is not None and tuple(stored[:3]) == signature
+        self._pending[filepath] = (signature, hit)
+        return json.loads(stored[3]) if hit else None
+
+    def record(self, filepath, row):
+        """
+        Фиксирует результат обработки файла, для которого ранее вызывался lookup.
+
+        Строки с ошибкой не сохраняются, чтобы файл был обработан повторно в следующий раз.
+
+        Аргументы:
+            filepath (str | FileEntry): Путь к файлу.
+            row (dict): Результат обработки.
+        """
+        filepath = os.fspath(filepath)
+        signature, hit = self._pending.pop(filepath, (None, False))
+        if signature is None:
+            return
+        if hit:
+            self._touches.append((self.generation, filepath))
+            self.reused += 1
+        elif row and "error" not in row:
+            self._writes.append((filepath, *signature, self.generation, json.dumps(row, default=str)))
+            self.updated += 1
+        if len(self._touches) + len(self._writes) >= self.batch_size:
+            self.flush()
+
+    def discard(self, filepath):
+        """Забывает файл, обработка которого завершилась ошибкой."""
+        self._pending.pop(os.fspath(filepath), None)
+
+    def flush(self):
+        """Записывает накопленные изменения в базу."""
+        with self.connection:
+            if self._writes:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, generation, row) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", self._writes
+                )
+            if self._touches:
+                self.connection.executemany("UPDATE files SET generation = ? WHERE path = ?", self._touches)
+        self._writes = []
+        self._touches = []
+
+    def finish(self):
+        """
+        Завершает проход: удаляет из манифеста файлы, которых больше нет, и сохраняет номер поколения.
+
+        Возвращает:
+            int: Количество удалённых записей.
+        """
+        self.flush()
+        with self.connection:
+            removed = self.connection.execute(
+                "DELETE FROM files WHERE generation < ?", (self.generation,)
+            ).rowcount
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)", (str(self.generation),)
+            )
+        process_logger.info(
+            f"Manifest updated: {self.reused} reused, {self.updated} processed, {removed} removed"
+        )
+        return removed
+
+    def close(self):
+        """Закрывает соединение с базой манифеста."""
+        self.connection.close()
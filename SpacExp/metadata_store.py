@@ -0,0 +1,386 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+from .result_writer import ParquetResultSink, TEXT_SUFFIX, create_sink
+from .index_reader import index_columns, index_format, iter_index_rows, load_index
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ключ строки результата, под которым обработчики передают динамические метаданные:
+# {пространство имён: {ключ: значение}}, например {"exif": {...}, "tags": {...}}
+META_KEY = "_meta"
+
+# колонки длинной таблицы метаданных
+METADATA_COLUMNS = ["file_id", "namespace", "key", "value"]
+
+# двоичные значения длиннее этого порога не сохраняются целиком
+MAX_BINARY_VALUE = 64
+
+# сколько записей может накопиться в таблице изменений, прежде чем она вливается в индекс
+COMPACT_THRESHOLD = 10000
+
+
+def file_id(path):
+    """
+    Стабильный идентификатор файла по пути (знаковое 64-битное целое).
+
+    Не зависит от порядка строк, поэтому связь основной таблицы и таблицы метаданных
+    сохраняется при обновлении индекса в режиме наблюдения и при слиянии шардов.
+    """
+    digest = hashlib.blake2b(os.fspath(path).encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def metadata_path(output_file, output_format=None):
+    """Путь к таблице метаданных рядом с индексом: index.csv → index.csv.meta.csv."""
+    return f"{output_file}.meta.{output_format or index_format(output_file)}"
+
+
+def patch_path(output_file):
+    """Путь к таблице изменений рядом с индексом: index.csv → index.csv.patch.sqlite3."""
+    return f"{output_file}.patch.sqlite3"
+
+
+def _under(path, directories):
+    return any(path.startswith(os.path.join(directory, "")) for directory in directories)
+
+
+def metadata_value(value):
+    """Приводит значение метаданных к строке для длинной таблицы."""
+    if isinstance(value, bytes):
+        if len(value) > MAX_BINARY_VALUE:
+            return f"<{len(value)} bytes>"
+        return value.hex()
+    if isinstance(value, str):
+        return value.replace("\x00", "").strip()
+    return str(value)
+
+
+class IndexWriter:
+    """
+    Запись индекса из двух таблиц.
+
+    Основные колонки строки пишутся в индекс, а динамические метаданные из ключа META_KEY —
+    в длинную таблицу (file_id, namespace, key, value) рядом с ним. Так ширина индекса
+    не зависит от того, сколько разных ключей EXIF или тегов встретилось в дереве.
+    Если метаданных нет, прежняя таблица метаданных удаляется.
+
+    Записанный индекс заменяет прежний целиком, поэтому таблица изменений
+    прежнего индекса (IndexPatch) при закрытии удаляется.
+
+    Аргументы:
+        output_file (str): Путь к файлу индекса.
+        output_format (str, optional): "csv" или "parquet"; по умолчанию по расширению.
+        columns (list, optional): Колонки индекса, который публикуется, даже если в нём не осталось строк.
+    """
+    def __init__(self, output_file, output_format=None, columns=None):
+        self.output_format = output_format or index_format(output_file)
+        self.output_file = output_file
+        self.metadata_file = metadata_path(output_file, self.output_format)
+        self.sink = create_sink(output_file, self.output_format, columns=columns)
+        self.metadata_sink = None
+        self.metadata_rows = 0
+
+    @property
+    def rows_written(self):
+        return self.sink.rows_written
+
+    def write(self, row):
+        """Записывает строку результата; метаданные уходят в таблицу метаданных."""
+        meta = row.pop(META_KEY, None)
+        self.sink.write(row)
+        if meta:
+            identifier = file_id(row.get("file_path", ""))
+            for namespace, values in meta.items():
+                for key, value in values.items():
+                    if value is not None:
+                        self.write_metadata([identifier, namespace, str(key), metadata_value(value)])
+
+    def write_metadata(self, values):
+        """Записывает одну строку таблицы метаданных (file_id, namespace, key, value)."""
+        if self.metadata_sink is None:
+            self.metadata_sink = create_sink(self.metadata_file, self.output_format)
+        self.metadata_sink.write(dict(zip(METADATA_COLUMNS, values)))
+        self.metadata_rows += 1
+
+    def copy_metadata(self, metadata_file, skip_ids=()):
+        """Переносит строки существующей таблицы метаданных, кроме файлов из skip_ids."""
+        skip_ids = set(skip_ids)
+        for row in iter_index_rows(metadata_file):
+            identifier = int(row["file_id"])
+            if identifier not in skip_ids:
+                self.write_metadata([identifier, row["namespace"], row["key"], row["value"]])
+
+    def close(self):
+        self.sink.close()
+        if self.metadata_sink is not None:
+            self.metadata_sink.close()
+        elif os.path.exists(self.metadata_file):
+            os.remove(self.metadata_file)
+        if os.path.exists(patch_path(self.output_file)):
+            os.remove(patch_path(self.output_file))
+
+    def abort(self):
+        self.sink.abort()
+        if self.metadata_sink is not None:
+            self.metadata_sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class IndexPatch:
+    """
+    Таблица изменений индекса (SQLite рядом с ним, см. patch_path).
+
+    Режим наблюдения и вторая фаза двухфазной индексации не переписывают индекс при каждом
+    пакете изменений: новые строки файлов и отметки об удалении записываются сюда по file_id,
+    так что стоимость пакета зависит от числа изменений, а не от размера индекса.
+    load_index и load_metadata накладывают таблицу на индекс при чтении, compact_index
+    вливает её в индекс одним потоковым проходом.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+    """
+    def __init__(self, index_file):
+        self.path = patch_path(index_file)
+        self.connection = sqlite3.connect(self.path)
+        # row равен NULL для удалённого файла
+        self.connection.execute("CREATE TABLE IF NOT EXISTS files (file_id INTEGER PRIMARY KEY, path TEXT, row TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS removed_dirs (path TEXT PRIMARY KEY)")
+
+    @staticmethod
+    def _encode(row):
+        row = dict(row)
+        meta = row.pop(META_KEY, None)
+        if meta:
+            # метаданные хранятся в том же виде, что и в таблице метаданных
+            row[META_KEY] = {namespace: {str(key): metadata_value(value) for key, value in values.items()
+                                         if value is not None}
+                             for namespace, values in meta.items()}
+        return json.dumps(row, default=str)
+
+    def record(self, rows, removed=(), removed_dirs=()):
+        """
+        Добавляет изменения; более поздние записи о файле заменяют прежние.
+
+        Аргументы:
+            rows (dict): Путь → новая строка результата.
+            removed (iterable): Пути удалённых файлов.
+            removed_dirs (iterable): Пути удалённых каталогов.
+
+        Возвращает:
+            int: Количество записей в таблице.
+        """
+        with self.connection:
+            for directory in removed_dirs:
+                prefix = os.path.join(directory, "")
+                # записи о файлах удалённого каталога больше не нужны: его строки отбрасываются целиком
+                self.connection.execute("DELETE FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+                self.connection.execute("INSERT OR IGNORE INTO removed_dirs (path) VALUES (?)", (directory,))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files (file_id, path, row) VALUES (?, ?, NULL)",
+                [(file_id(path), os.fspath(path)) for path in removed]
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files (file_id, path, row) VALUES (?, ?, ?)",
+                [(file_id(path), os.fspath(path), self._encode(row)) for path, row in rows.items()]
+            )
+        return len(self)
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT (SELECT COUNT(*) FROM files) + (SELECT COUNT(*) FROM removed_dirs)"
+        ).fetchone()[0]
+
+    def load(self):
+        """
+        Возвращает изменения целиком.
+
+        Возвращает:
+            tuple: (словарь file_id → строка или None для удалённого файла, список удалённых каталогов).
+        """
+        changes = {identifier: json.loads(row) if row is not None else None
+                   for identifier, row in self.connection.execute("SELECT file_id, row FROM files")}
+        removed_dirs = [path for path, in self.connection.execute("SELECT path FROM removed_dirs")]
+        return changes, removed_dirs
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def read_patch(index_file):
+    """Возвращает IndexPatch.load() для индекса или None, если таблицы изменений нет."""
+    if not os.path.exists(patch_path(index_file)):
+        return None
+    with IndexPatch(index_file) as patch:
+        return patch.load()
+
+
+def apply_patch(rows, changes, removed_dirs=(), stale_ids=None):
+    """
+    Накладывает изменения на поток строк индекса.
+
+    Изменённые строки заменяются на месте, строки удалённых файлов и файлов из удалённых
+    каталогов отбрасываются, новые файлы добавляются в конец.
+
+    Аргументы:
+        rows (iterable): Строки индекса.
+        changes (dict): file_id → новая строка или None (см. IndexPatch.load).
+        removed_dirs (list): Удалённые каталоги.
+        stale_ids (set, optional): Сюда добавляются file_id заменённых и удалённых строк индекса.
+    """
+    pending = dict(changes)
+    for row in rows:
+        path = row.get("file_path") or ""
+        identifier = file_id(path)
+        if identifier in changes:
+            replacement = pending.pop(identifier, None)
+        elif removed_dirs and _under(path, removed_dirs):
+            replacement = None
+        else:
+            yield row
+            continue
+        if stale_ids is not None:
+            stale_ids.add(identifier)
+        if replacement is not None:
+            yield dict(replacement)
+    for row in pending.values():
+        if row is not None:
+            yield dict(row)
+
+
+def patch_frame(frame, changes, removed_dirs, columns=None, output_format="csv"):
+    """
+    Накладывает изменения на загруженный индекс (DataFrame с колонкой file_path).
+
+    Новые строки приводятся к типам колонок так же, как при записи индекса,
+    и добавляются в конец.
+
+    Аргументы:
+        frame (pd.DataFrame): Данные индекса.
+        changes (dict): file_id → новая строка или None.
+        removed_dirs (list): Удалённые каталоги.
+        columns (list, optional): Колонки новых строк; по умолчанию все.
+        output_format (str): Формат индекса.
+
+    Возвращает:
+        pd.DataFrame: Данные индекса с изменениями.
+    """
+    import pandas as pd
+    paths = frame["file_path"].fillna("").astype(str)
+    keep = ~paths.map(file_id).isin(list(changes))
+    if removed_dirs:
+        keep &= ~paths.map(lambda path: _under(path, removed_dirs))
+    frame = frame[keep]
+    rows = [row for row in changes.values() if row is not None]
+    if not rows:
+        return frame.reset_index(drop=True)
+    names = [name for name in dict.fromkeys(key for row in rows for key in row)
+             if name != META_KEY and (columns is None or name in columns)]
+    if output_format == "parquet":
+        import pyarrow as pa
+        arrays = {}
+        for name in names:
+            rejected = []
+            arrays[name] = ParquetResultSink.to_array(name, [row.get(name) for row in rows], rejected)
+            if rejected:
+                # как при записи: неточные числа остаются строками в колонке <name>_text
+                texts = [None] * len(rows)
+                for index, text in rejected:
+                    texts[index] = text
+                arrays[name + TEXT_SUFFIX] = pa.array(texts, type=pa.string())
+        added = pa.table(arrays).to_pandas()
+    else:
+        added = pd.DataFrame([[row.get(name) for name in names] for row in rows], columns=names)
+    return pd.concat([frame, added], ignore_index=True)
+
+
+def patch_metadata(changes):
+    """Строки таблицы метаданных (file_id, namespace, key, value) для строк из таблицы изменений."""
+    for identifier, row in changes.items():
+        for namespace, values in ((row or {}).get(META_KEY) or {}).items():
+            for key, value in values.items():
+                yield [identifier, namespace, key, value]
+
+
+def compact_index(index_file, output_format=None):
+    """
+    Вливает таблицу изменений в индекс одним потоковым проходом и удаляет её.
+
+    Итоговый файл атомарно заменяет прежний; если в индексе не осталось строк,
+    публикуется пустой индекс с прежними колонками. Таблица метаданных переносится
+    тем же проходом без строк заменённых и удалённых файлов.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+        output_format (str, optional): "csv" или "parquet"; по умолчанию по расширению.
+
+    Возвращает:
+        int: Количество строк в индексе или None, если изменений не было.
+    """
+    patch = read_patch(index_file)
+    if patch is None:
+        return None
+    changes, removed_dirs = patch
+    stale_ids = set()
+    columns = index_columns(index_file) if os.path.exists(index_file) else None
+    with IndexWriter(index_file, output_format, columns=columns) as writer:
+        for row in apply_patch(iter_index_rows(index_file), changes, removed_dirs, stale_ids):
+            writer.write(row)
+        if os.path.exists(writer.metadata_file):
+            writer.copy_metadata(writer.metadata_file, stale_ids)
+    return writer.rows_written
+
+
+def load_metadata(index_file, namespace=None, keys=None):
+    """
+    Загружает таблицу метаданных индекса и добавляет к ней пути файлов.
+
+    Метаданные файлов из таблицы изменений (IndexPatch) берутся из неё.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+        namespace (str, optional): Оставить только это пространство имён ("exif", "tags").
+        keys (list, optional): Оставить только эти ключи.
+
+    Возвращает:
+        pd.DataFrame: Колонки file_id, file_path, namespace, key, value.
+    """
+    import pandas as pd
+    path = metadata_path(index_file)
+    patch = read_patch(index_file)
+    if not os.path.exists(path) and patch is None:
+        return pd.DataFrame(columns=["file_id", "file_path", "namespace", "key", "value"])
+    metadata = load_index(path) if os.path.exists(path) else pd.DataFrame(columns=METADATA_COLUMNS)
+    metadata = metadata.astype({"file_id": "int64"})
+    if patch is not None:
+        changes, _ = patch
+        metadata = pd.concat([metadata[~metadata["file_id"].isin(list(changes))],
+                              pd.DataFrame(list(patch_metadata(changes)), columns=METADATA_COLUMNS)],
+                             ignore_index=True).astype({"file_id": "int64"})
+    if namespace is not None:
+        metadata = metadata[metadata["namespace"] == namespace]
+    if keys is not None:
+        metadata = metadata[metadata["key"].isin(keys)]
+    paths = load_index(index_file, columns=["file_path"])["file_path"].dropna()
+    ids = pd.DataFrame({"file_id": [file_id(p) for p in paths], "file_path": paths.values})
+    # строки файлов, которых уже нет в индексе (удалённые каталоги из таблицы изменений), отбрасываются
+    metadata = metadata.merge(ids, on="file_id", how="inner")
+    return metadata[["file_id", "file_path", "namespace", "key", "value"]]
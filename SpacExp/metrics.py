@@ -0,0 +1,255 @@
+import os
+import time
+import threading
+import functools
+from bisect import bisect_left
+
+# границы корзин гистограммы длительности обработки файла, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# тип содержимого текстового формата Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# класс исключения, перехваченного обработчиком в текущем потоке (см. note_error)
+_local = threading.local()
+
+
+def note_error(error):
+    """
+    Запоминает класс исключения, которое обработчик перехватил и вернул строкой с ключом "error".
+
+    Аргументы:
+        error (Exception): Перехваченное исключение.
+    """
+    _local.error_class = type(error).__name__
+
+
+def _take_error():
+    error_class = getattr(_local, "error_class", None)
+    _local.error_class = None
+    return error_class
+
+
+class ProcessorMetrics:
+    """
+    Метрики одного обработчика: гистограмма длительности, число файлов,
+    объём обработанных файлов и ошибки по классам исключений.
+
+    Аргументы:
+        buckets (tuple): Верхние границы корзин гистограммы (секунды, по возрастанию).
+    """
+    __slots__ = ("buckets", "counts", "total", "seconds", "bytes", "errors")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # последняя корзина — +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.errors = {}
+
+    def observe(self, seconds, size=0, error_class=None):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += 1
+        self.seconds += seconds
+        self.bytes += size
+        if error_class:
+            self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+    def snapshot(self):
+        return {"buckets": self.buckets, "counts": list(self.counts), "total": self.total,
+                "seconds": self.seconds, "bytes": self.bytes, "errors": dict(self.errors)}
+
+    def merge(self, snapshot):
+        if tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [own + other for own, other in zip(self.counts, snapshot["counts"])]
+        self.total += snapshot["total"]
+        self.seconds += snapshot["seconds"]
+        self.bytes += snapshot["bytes"]
+        for error_class, count in snapshot["errors"].items():
+            self.errors[error_class] = self.errors.get(error_class, 0) + count
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик обработчиков файлов.
+
+    Заполняется автоматически: каждый вызов process() подкласса FileProcessor
+    записывает длительность, размер файла и класс исключения при ошибке.
+    Процессы пула передают накопленные метрики в основной процесс вместе с состоянием
+    обработчиков (drain/merge). Реестр выводится в текстовом формате Prometheus (render)
+    и может периодически записываться в файл для textfile-коллектора node_exporter (write).
+
+    Аргументы:
+        buckets (tuple): Границы корзин гистограммы длительности, секунды.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._processors = {}
+        self._lock = threading.Lock()
+
+    def _metrics(self, processor):
+        metrics = self._processors.get(processor)
+        if metrics is None:
+            metrics = self._processors[processor] = ProcessorMetrics(self.buckets)
+        return metrics
+
+    def observe(self, processor, seconds, size=0, error_class=None):
+        """
+        Записывает обработку одного файла.
+
+        Аргументы:
+            processor (str): Имя обработчика (метка processor).
+            seconds (float): Длительность обработки.
+            size (int): Размер файла в байтах.
+            error_class (str, optional): Класс исключения, если обработка завершилась ошибкой.
+        """
+        with self._lock:
+            self._metrics(processor).observe(seconds, size, error_class)
+
+    def record_error(self, processor, error_class, seconds=0.0):
+        """Записывает файл, обработка которого была прервана снаружи (таймаут, падение процесса)."""
+        self.observe(processor, seconds, error_class=error_class)
+
+    def snapshot(self):
+        """Возвращает копию метрик: {обработчик: словарь значений}."""
+        with self._lock:
+            return {processor: metrics.snapshot() for processor, metrics in self._processors.items()}
+
+    def drain(self):
+        """Возвращает накопленные метрики и обнуляет реестр (для передачи из процесса пула)."""
+        with self._lock:
+            snapshot = {processor: metrics.snapshot() for processor, metrics in self._processors.items()}
+            self._processors = {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """Добавляет метрики, полученные drain() в другом процессе."""
+        if not snapshot:
+            return
+        with self._lock:
+            for processor, values in snapshot.items():
+                self._metrics(processor).merge(values)
+
+    def reset(self):
+        """Обнуляет реестр и время начала отсчёта."""
+        with self._lock:
+            self._processors = {}
+            self.started = time.time()
+
+    def render(self):
+        """
+        Выводит метрики в текстовом формате Prometheus.
+
+        Возвращает:
+            str: Гистограмма spacexp_processor_duration_seconds, счётчики
+                 spacexp_processor_bytes_total и spacexp_processor_errors_total
+                 и пропускная способность spacexp_processor_files_per_second.
+        """
+        snapshot = self.snapshot()
+        elapsed = max(time.time() - self.started, 1e-9)
+        lines = [
+            "# HELP spacexp_processor_duration_seconds Time spent processing one file.",
+            "# TYPE spacexp_processor_duration_seconds histogram",
+        ]
+        for processor, values in sorted(snapshot.items()):
+            label = _label(processor)
+            cumulative = 0
+            for bound, count in zip(values["buckets"] + (float("inf"),), values["counts"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'spacexp_processor_duration_seconds_bucket{{processor="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'spacexp_processor_duration_seconds_sum{{processor="{label}"}} {values["seconds"]!r}')
+            lines.append(f'spacexp_processor_duration_seconds_count{{processor="{label}"}} {values["total"]}')
+        lines += [
+            "# HELP spacexp_processor_bytes_total Size of files passed to the processor.",
+            "# TYPE spacexp_processor_bytes_total counter",
+        ]
+        for processor, values in sorted(snapshot.items()):
+            lines.append(f'spacexp_processor_bytes_total{{processor="{_label(processor)}"}} {values["bytes"]}')
+        lines += [
+            "# HELP spacexp_processor_errors_total Files that failed processing, by exception class.",
+            "# TYPE spacexp_processor_errors_total counter",
+        ]
+        for processor, values in sorted(snapshot.items()):
+            for error_class, count in sorted(values["errors"].items()):
+                lines.append(f'spacexp_processor_errors_total{{processor="{_label(processor)}",'
+                             f'exception="{_label(error_class)}"}} {count}')
+        lines += [
+            "# HELP spacexp_processor_files_per_second Files processed per second since the registry started.",
+            "# TYPE spacexp_processor_files_per_second gauge",
+        ]
+        for processor, values in sorted(snapshot.items()):
+            lines.append(f'spacexp_processor_files_per_second{{processor="{_label(processor)}"}} '
+                         f'{values["total"] / elapsed:.6g}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Атомарно записывает метрики в файл (формат textfile-коллектора Prometheus).
+
+        Аргументы:
+            path (str): Путь к файлу .prom.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temp_path, path)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# реестр процесса; в него пишут все обработчики
+REGISTRY = MetricsRegistry()
+
+
+def instrument(process):
+    """
+    Оборачивает метод process обработчика записью метрик в REGISTRY.
+
+    Вложенные вызовы (подкласс, вызывающий super().process) учитываются один раз.
+    Путь приводится к FileEntry, поэтому размер файла для метрик берётся из stat,
+    полученного обходом или самим обработчиком, без повторного обращения к диску.
+    """
+    # импорт здесь: base_processor импортирует этот модуль
+    from .base_processor import as_file_entry
+
+    @functools.wraps(process)
+    def wrapper(self, filepath, *args, **kwargs):
+        if getattr(_local, "active", False):
+            return process(self, filepath, *args, **kwargs)
+        filepath = as_file_entry(filepath)
+        _local.active = True
+        _local.error_class = None
+        started = time.perf_counter()
+        error_class = None
+        try:
+            result = process(self, filepath, *args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                error_class = _take_error() or "Error"
+            return result
+        except Exception as e:
+            error_class = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _local.active = False
+            REGISTRY.observe(type(self).__name__, elapsed, file_size(filepath), error_class)
+
+    return wrapper
+
+
+def file_size(filepath):
+    """Размер файла по пути или FileEntry (из его CompactStat, без повторного stat); 0 при ошибке."""
+    get_stat = getattr(filepath, "get_stat", None)
+    try:
+        if get_stat is not None:
+            return get_stat().st_size
+        return os.stat(filepath).st_size
+    except (OSError, TypeError, ValueError):
+        return 0
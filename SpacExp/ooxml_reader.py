@@ -0,0 +1,252 @@
+# ooxml_reader.py
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+
+# части пакета Office Open XML (.docx, .xlsx, .pptx) со свойствами документа
+APP_PROPERTIES = "docProps/app.xml"
+CORE_PROPERTIES = "docProps/core.xml"
+# книга .xlsx и её отношения (пути к частям листов)
+WORKBOOK = "xl/workbook.xml"
+WORKBOOK_RELATIONSHIPS = "xl/_rels/workbook.xml.rels"
+
+# числовые свойства docProps/app.xml → ключи результата
+APP_COUNTS = {
+    "Pages": "pages",
+    "Words": "words",
+    "Characters": "characters",
+    "CharactersWithSpaces": "characters_with_spaces",
+    "Lines": "lines",
+    "Paragraphs": "paragraphs",
+}
+
+# свойства docProps/core.xml → ключи результата
+CORE_FIELDS = {
+    "creator": "creator",
+    "lastModifiedBy": "last_modified_by",
+    "title": "title",
+    "subject": "subject",
+    "created": "created",
+    "modified": "modified",
+}
+
+# формат дат, в котором их выдают обработчики
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# адрес ячейки в диапазоне <dimension ref="A1:D10">
+_CELL = re.compile(r"([A-Z]{1,3})(\d+)")
+
+
+def local_name(tag):
+    """Возвращает имя элемента без пространства имён ("{...}Pages" → "Pages")."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_part(archive, name, events=("end",)):
+    """
+    Потоково разбирает XML-часть пакета, не загружая её в память целиком.
+
+    Аргументы:
+        archive (zipfile.ZipFile): Открытый пакет.
+        name (str): Имя части ("docProps/app.xml").
+        events (tuple): События iterparse.
+
+    Возвращает:
+        generator: Пары (событие, элемент).
+
+    Исключения:
+        KeyError: В пакете нет такой части.
+    """
+    with archive.open(name) as stream:
+        yield from ElementTree.iterparse(stream, events)
+
+
+def parse_w3cdtf(value):
+    """
+    Преобразует дату W3CDTF из core.xml ("2024-03-01T10:15:00Z") в DATE_FORMAT (UTC).
+
+    Возвращает:
+        str: Дата в формате DATE_FORMAT или None, если дата не разобрана.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(DATE_FORMAT)
+
+
+def app_properties(archive):
+    """
+    Читает счётчики из docProps/app.xml: страницы, слова, символы и т.д.
+
+    Значения записывает приложение при сохранении (Word — по своей вёрстке), поэтому
+    их не нужно вычислять по тексту документа.
+
+    Возвращает:
+        dict: Ключи из APP_COUNTS со значениями int; отсутствующие свойства не включаются.
+    """
+    counts = {}
+    try:
+        for _, element in iter_part(archive, APP_PROPERTIES):
+            key = APP_COUNTS.get(local_name(element.tag))
+            if key is not None and element.text:
+                try:
+                    counts[key] = int(element.text.strip())
+                except ValueError:
+                    pass
+    except KeyError:
+        return {}
+    return counts
+
+
+def core_properties(archive):
+    """
+    Читает автора, заголовок и даты из docProps/core.xml.
+
+    Возвращает:
+        dict: Ключи из CORE_FIELDS; даты created и modified — в DATE_FORMAT.
+    """
+    fields = {}
+    try:
+        for _, element in iter_part(archive, CORE_PROPERTIES):
+            key = CORE_FIELDS.get(local_name(element.tag))
+            text = (element.text or "").strip()
+            if key is None or not text:
+                continue
+            if key in ("created", "modified"):
+                text = parse_w3cdtf(text)
+                if text is None:
+                    continue
+            fields[key] = text
+    except KeyError:
+        return {}
+    return fields
+
+
+def read_properties(filepath):
+    """
+    Читает свойства документа Office Open XML из частей docProps.
+
+    Из zip-архива читаются только центральный каталог и две небольшие части, а не
+    содержимое документа.
+
+    Аргументы:
+        filepath (str): Путь к файлу .docx, .xlsx или .pptx.
+
+    Возвращает:
+        dict: Объединение app_properties и core_properties.
+
+    Исключения:
+        zipfile.BadZipFile: Файл не является zip-пакетом.
+        xml.etree.ElementTree.ParseError: Часть docProps повреждена.
+    """
+    with zipfile.ZipFile(filepath) as archive:
+        properties = app_properties(archive)
+        properties.update(core_properties(archive))
+    return properties
+
+
+def column_number(letters):
+    """Номер столбца по буквенному обозначению ("A" → 1, "AB" → 28)."""
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def dimension_size(ref):
+    """
+    Размер используемого диапазона листа по атрибуту ref элемента <dimension> ("A1:D10").
+
+    Возвращает:
+        tuple: (строки, столбцы) или (None, None), если диапазон не разобран.
+    """
+    cells = [_CELL.fullmatch(cell.replace("$", "")) for cell in ref.upper().split(":")]
+    if not cells or len(cells) > 2 or not all(cells):
+        return None, None
+    first, last = cells[0], cells[-1]
+    rows = int(last.group(2)) - int(first.group(2)) + 1
+    columns = column_number(last.group(1)) - column_number(first.group(1)) + 1
+    return rows, columns
+
+
+def sheet_dimension(archive, name):
+    """
+    Читает элемент <dimension> листа, разбирая только начало его XML-части.
+
+    <dimension> стоит перед данными листа, поэтому разбор останавливается на нём или на
+    начале <sheetData>, и ячейки листа не распаковываются и не разбираются.
+
+    Возвращает:
+        str: Значение атрибута ref или None, если элемента нет.
+    """
+    events = iter_part(archive, name, ("start",))
+    try:
+        for _, element in events:
+            tag = local_name(element.tag)
+            if tag == "dimension":
+                return element.get("ref")
+            if tag == "sheetData":
+                return None
+    finally:
+        events.close()
+    return None
+
+
+def _relationship_targets(archive, name, base):
+    """Отношения части: идентификатор → путь к целевой части внутри пакета."""
+    targets = {}
+    try:
+        for _, element in iter_part(archive, name):
+            if local_name(element.tag) == "Relationship" and element.get("TargetMode") != "External":
+                target = element.get("Target", "")
+                if target.startswith("/"):
+                    target = target.lstrip("/")
+                else:
+                    target = posixpath.normpath(posixpath.join(base, target))
+                targets[element.get("Id")] = target
+    except KeyError:
+        return {}
+    return targets
+
+
+def workbook_sheets(filepath):
+    """
+    Возвращает листы книги .xlsx без загрузки ячеек.
+
+    Имена и порядок листов читаются из xl/workbook.xml, части листов — по отношениям книги,
+    размеры — из элемента <dimension> каждого листа.
+
+    Аргументы:
+        filepath (str): Путь к файлу .xlsx или .xlsm.
+
+    Возвращает:
+        list: Словари {"name", "rows", "columns"}; rows и columns равны None, если размер
+            листа не записан (например, у листов-диаграмм).
+
+    Исключения:
+        zipfile.BadZipFile: Файл не является zip-пакетом.
+        KeyError: В пакете нет xl/workbook.xml.
+    """
+    sheets = []
+    with zipfile.ZipFile(filepath) as archive:
+        targets = _relationship_targets(archive, WORKBOOK_RELATIONSHIPS, "xl")
+        for _, element in iter_part(archive, WORKBOOK):
+            if local_name(element.tag) != "sheet":
+                continue
+            relationship = next((value for key, value in element.attrib.items() if local_name(key) == "id"), None)
+            part = targets.get(relationship)
+            rows = columns = None
+            if part is not None:
+                try:
+                    ref = sheet_dimension(archive, part)
+                except KeyError:
+                    ref = None
+                if ref:
+                    rows, columns = dimension_size(ref)
+            sheets.append({"name": element.get("name"), "rows": rows, "columns": columns})
+    return sheets
@@ -0,0 +1,464 @@
+# pdf_probe.py
+import mmap
+import re
+import zlib
+
+# пробельные символы и разделители PDF (ISO 32000-1, 7.2.2)
+_SPACE = re.compile(rb"(?:[\x00\t\n\x0c\r ]+|%[^\r\n]*)*")
+_TOKEN = re.compile(rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]+")
+_NAME = re.compile(rb"/([^\x00\t\n\x0c\r ()<>\[\]{}/%]*)")
+_NAME_ESCAPE = re.compile(rb"#([0-9A-Fa-f]{2})")
+_INTEGER = re.compile(rb"[+-]?\d+$")
+_REAL = re.compile(rb"[+-]?(?:\d+\.\d*|\.\d+)$")
+_REF_TAIL = re.compile(rb"[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+_OBJ_HEADER = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+obj")
+_STREAM = re.compile(rb"[\x00\t\n\x0c\r ]*stream(?:\r\n|\n|\r)")
+_ENDSTREAM = re.compile(rb"[\x00\t\n\x0c\r ]*endstream")
+_STARTXREF = re.compile(rb"startxref[\x00\t\n\x0c\r ]+(\d+)")
+_SUBSECTION = re.compile(rb"(\d+)[\x00\t\x0c ]+(\d+)")
+_XREF_ENTRY = re.compile(rb"(\d{10}) (\d{5}) ([fn])")
+_LITERAL_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+                    b"(": b"(", b")": b")", b"\\": b"\\"}
+
+# startxref ищется в последних байтах файла
+_TAIL_SIZE = 2048
+# предел цепочки косвенных ссылок при разрешении значения
+_MAX_REFERENCE_DEPTH = 32
+
+_MISSING = object()
+
+
+class PDFProbeError(ValueError):
+    """Структура PDF-файла повреждена или не поддерживается быстрым разбором."""
+
+
+class Name(str):
+    """Имя PDF ("/Type"); отличается от строк, которые разбираются в bytes."""
+    __slots__ = ()
+
+
+class Ref:
+    """Косвенная ссылка на объект ("12 0 R")."""
+    __slots__ = ("num", "gen")
+
+    def __init__(self, num, gen):
+        self.num = num
+        self.gen = gen
+
+    def __eq__(self, other):
+        return isinstance(other, Ref) and (self.num, self.gen) == (other.num, other.gen)
+
+    def __hash__(self):
+        return hash((self.num, self.gen))
+
+    def __repr__(self):
+        return f"Ref({self.num}, {self.gen})"
+
+
+def parse_object(data, pos):
+    """
+    Разбирает объект PDF, начиная с позиции pos.
+
+    Аргументы:
+        data (bytes | mmap): Содержимое файла или потока объектов.
+        pos (int): Позиция начала объекта (допускаются пробелы и комментарии перед ним).
+
+    Возвращает:
+        tuple: (объект, позиция сразу после него). Словари — dict с ключами Name, массивы — list,
+            строки — bytes, ссылки — Ref, null — None.
+    """
+    pos = _SPACE.match(data, pos).end()
+    char = data[pos:pos + 1]
+    if char == b"/":
+        match = _NAME.match(data, pos)
+        name = _NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), match.group(1))
+        return Name("/" + name.decode("latin-1")), match.end()
+    if char == b"<":
+        if data[pos + 1:pos + 2] == b"<":
+            return _parse_dict(data, pos + 2)
+        end = data.find(b">", pos)
+        if end < 0:
+            raise PDFProbeError(f"Unterminated hex string at {pos}")
+        digits = re.sub(rb"[^0-9A-Fa-f]", b"", data[pos + 1:end])
+        if len(digits) % 2:
+            digits += b"0"
+        return bytes.fromhex(digits.decode("ascii")), end + 1
+    if char == b"[":
+        items = []
+        pos += 1
+        while True:
+            pos = _SPACE.match(data, pos).end()
+            if data[pos:pos + 1] == b"]":
+                return items, pos + 1
+            item, pos = parse_object(data, pos)
+            items.append(item)
+    if char == b"(":
+        return _parse_literal(data, pos + 1)
+    match = _TOKEN.match(data, pos)
+    if match is None:
+        raise PDFProbeError(f"Unexpected {char!r} at {pos}")
+    word, end = match.group(), match.end()
+    if _INTEGER.match(word):
+        reference = _REF_TAIL.match(data, end)
+        if reference is not None:
+            return Ref(int(word), int(reference.group(1))), reference.end()
+        return int(word), end
+    if _REAL.match(word):
+        return float(word), end
+    if word in (b"true", b"false"):
+        return word == b"true", end
+    if word == b"null":
+        return None, end
+    raise PDFProbeError(f"Unexpected keyword {word[:20]!r} at {pos}")
+
+
+def _parse_dict(data, pos):
+    result = {}
+    while True:
+        pos = _SPACE.match(data, pos).end()
+        if data[pos:pos + 2] == b">>":
+            return result, pos + 2
+        key, pos = parse_object(data, pos)
+        if not isinstance(key, Name):
+            raise PDFProbeError(f"Dictionary key is not a name at {pos}")
+        result[key], pos = parse_object(data, pos)
+
+
+def _parse_literal(data, pos):
+    out = bytearray()
+    depth = 1
+    size = len(data)
+    while pos < size:
+        char = data[pos:pos + 1]
+        pos += 1
+        if char == b"\\":
+            escaped = data[pos:pos + 1]
+            pos += 1
+            if escaped in _LITERAL_ESCAPES:
+                out += _LITERAL_ESCAPES[escaped]
+            elif escaped.isdigit() and escaped < b"8":
+                digits = escaped
+                while len(digits) < 3 and data[pos:pos + 1].isdigit() and data[pos:pos + 1] < b"8":
+                    digits += data[pos:pos + 1]
+                    pos += 1
+                out.append(int(digits, 8) & 0xFF)
+            elif escaped == b"\r":
+                # перенос строки после обратной косой черты не входит в строку
+                if data[pos:pos + 1] == b"\n":
+                    pos += 1
+            elif escaped != b"\n":
+                out += escaped
+        elif char == b"(":
+            depth += 1
+            out += char
+        elif char == b")":
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos
+            out += char
+        else:
+            out += char
+    raise PDFProbeError("Unterminated string")
+
+
+def decode_text(value):
+    """
+    Преобразует текстовую строку PDF в str.
+
+    Строки с меткой порядка байтов UTF-16BE или UTF-8 декодируются по ней, остальные — как
+    PDFDocEncoding, которая совпадает с Latin-1 во всех печатных символах, кроме 0x80–0x9F.
+    """
+    if isinstance(value, Name):
+        return str(value)
+    if value.startswith(b"\xfe\xff"):
+        return value[2:].decode("utf-16-be", errors="replace")
+    if value.startswith(b"\xef\xbb\xbf"):
+        return value[3:].decode("utf-8", errors="replace")
+    return value.decode("latin-1")
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _unpredict(data, parms):
+    """Снимает PNG-предсказание (Predictor >= 10), которым обычно сжимаются потоки перекрёстных ссылок."""
+    predictor = parms.get("/Predictor", 1)
+    if predictor == 1:
+        return data
+    if predictor < 10:
+        raise PDFProbeError(f"Unsupported predictor {predictor}")
+    colors = parms.get("/Colors", 1)
+    bits = parms.get("/BitsPerComponent", 8)
+    columns = parms.get("/Columns", 1)
+    pixel = max(1, colors * bits // 8)
+    width = (colors * bits * columns + 7) // 8
+    out = bytearray()
+    previous = bytearray(width)
+    for start in range(0, len(data) - width, width + 1):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + 1 + width])
+        for i in range(width):
+            left = row[i - pixel] if i >= pixel else 0
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + previous[i]) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+            elif kind == 4:
+                upper_left = previous[i - pixel] if i >= pixel else 0
+                estimate = left + previous[i] - upper_left
+                distances = (abs(estimate - left), abs(estimate - previous[i]), abs(estimate - upper_left))
+                best = (left, previous[i], upper_left)[distances.index(min(distances))]
+                row[i] = (row[i] + best) & 0xFF
+            elif kind != 0:
+                raise PDFProbeError(f"Unknown PNG filter {kind}")
+        out += row
+        previous = row
+    return bytes(out)
+
+
+def decode_stream(stream_dict, raw):
+    """
+    Распаковывает поток. Поддерживается FlateDecode (с PNG-предсказанием) — единственный фильтр,
+    которым сжимаются потоки перекрёстных ссылок и потоки объектов.
+    """
+    parms = _as_list(stream_dict.get("/DecodeParms"))
+    for i, name in enumerate(_as_list(stream_dict.get("/Filter"))):
+        if name not in ("/FlateDecode", "/Fl"):
+            raise PDFProbeError(f"Unsupported filter {name}")
+        try:
+            # decompressobj не требует конца потока zlib, который некоторые программы не пишут
+            raw = zlib.decompressobj().decompress(raw)
+        except zlib.error as e:
+            raise PDFProbeError(f"Broken stream: {e}") from e
+        parm = parms[i] if i < len(parms) and isinstance(parms[i], dict) else {}
+        raw = _unpredict(raw, parm)
+    return raw
+
+
+class PDFDocument:
+    """
+    Чтение отдельных объектов PDF по таблице перекрёстных ссылок без разбора всего файла.
+
+    Разбираются только последний startxref, секции xref (таблицы и потоки, включая цепочку /Prev
+    инкрементальных обновлений) и запрошенные объекты. Записи таблиц имеют фиксированную длину,
+    поэтому смещение объекта читается прямо по его номеру, а не из построенного словаря.
+
+    Аргументы:
+        data (bytes | mmap): Содержимое файла.
+    """
+    def __init__(self, data):
+        self.data = data
+        # секции перекрёстных ссылок от новой к старой
+        self._sections = []
+        self._objects = {}
+        self._object_streams = {}
+        self.trailer = self._load_xref()
+
+    def _load_xref(self):
+        data = self.data
+        tail = data.rfind(b"startxref", max(0, len(data) - _TAIL_SIZE))
+        match = _STARTXREF.match(data, tail) if tail >= 0 else None
+        if match is None:
+            raise PDFProbeError("startxref not found")
+        offset = int(match.group(1))
+        trailer = None
+        seen = set()
+        while offset is not None:
+            if offset in seen or offset >= len(data):
+                raise PDFProbeError(f"Bad xref offset {offset}")
+            seen.add(offset)
+            pos = _SPACE.match(data, offset).end()
+            if data[pos:pos + 4] == b"xref":
+                section = self._read_table(pos + 4)
+                # гибридные файлы дополняют таблицу потоком ссылок
+                if isinstance(section.get("/XRefStm"), int):
+                    self._read_xref_stream(section["/XRefStm"])
+            else:
+                section = self._read_xref_stream(offset)
+            if trailer is None:
+                trailer = section
+            offset = section.get("/Prev") if isinstance(section.get("/Prev"), int) else None
+        return trailer
+
+    def _read_table(self, pos):
+        data = self.data
+        while True:
+            pos = _SPACE.match(data, pos).end()
+            if data[pos:pos + 7] == b"trailer":
+                trailer, _ = parse_object(data, pos + 7)
+                if not isinstance(trailer, dict):
+                    raise PDFProbeError("Bad trailer")
+                return trailer
+            match = _SUBSECTION.match(data, pos)
+            if match is None:
+                raise PDFProbeError(f"Bad xref subsection at {pos}")
+            start, count = int(match.group(1)), int(match.group(2))
+            pos = _SPACE.match(data, match.end()).end()
+            # запись — 20 байт; некоторые программы пишут 19, с одним символом конца строки
+            size = 20 if data[pos + 19:pos + 20] in (b" ", b"\r", b"\n") else 19
+            if count and not _XREF_ENTRY.match(data, pos):
+                raise PDFProbeError(f"Bad xref entry at {pos}")
+            self._sections.append(("table", start, count, pos, size))
+            pos += count * size
+
+    def _read_xref_stream(self, offset):
+        stream_dict, raw = self._read_object_at(offset)
+        if not isinstance(stream_dict, dict) or stream_dict.get("/Type") != "/XRef" or raw is None:
+            raise PDFProbeError(f"No xref stream at {offset}")
+        widths = stream_dict["/W"]
+        index = stream_dict.get("/Index") or [0, stream_dict["/Size"]]
+        rows = decode_stream(stream_dict, raw)
+        row_size = sum(widths)
+        base = 0
+        for start, count in zip(index[0::2], index[1::2]):
+            self._sections.append(("stream", start, count, (rows, base, widths), row_size))
+            base += count * row_size
+        return stream_dict
+
+    def _locate(self, num):
+        """Возвращает ("offset", смещение), ("compressed", номер потока, индекс) или None для свободных объектов."""
+        for kind, start, count, where, size in self._sections:
+            if not start <= num < start + count:
+                continue
+            if kind == "table":
+                match = _XREF_ENTRY.match(self.data, where + (num - start) * size)
+                if match is None:
+                    raise PDFProbeError(f"Bad xref entry for object {num}")
+                return ("offset", int(match.group(1))) if match.group(3) == b"n" else None
+            rows, base, widths = where
+            pos = base + (num - start) * size
+            fields = []
+            for width in widths:
+                fields.append(int.from_bytes(rows[pos:pos + width], "big"))
+                pos += width
+            kind = fields[0] if widths[0] else 1
+            if kind == 1:
+                return ("offset", fields[1])
+            if kind == 2:
+                return ("compressed", fields[1], fields[2])
+            return None
+        return _MISSING
+
+    def _read_object_at(self, offset, num=None):
+        data = self.data
+        match = _OBJ_HEADER.match(data, offset)
+        if match is None or (num is not None and int(match.group(1)) != num):
+            raise PDFProbeError(f"Object {num} not found at {offset}")
+        obj, pos = parse_object(data, match.end())
+        raw = None
+        stream = _STREAM.match(data, pos) if isinstance(obj, dict) else None
+        if stream is not None:
+            start = stream.end()
+            length = obj.get("/Length")
+            if isinstance(length, Ref) and num is not None:
+                length = self.resolve(length)
+            if not isinstance(length, int) or _ENDSTREAM.match(data, start + length) is None:
+                # длина не указана или неверна: поток заканчивается перед endstream
+                end = data.find(b"endstream", start)
+                if end < 0:
+                    raise PDFProbeError(f"Unterminated stream at {start}")
+                length = len(data[start:end].rstrip(b"\r\n"))
+            raw = data[start:start + length]
+        return obj, raw
+
+    def _from_object_stream(self, stream_num, num):
+        parsed = self._object_streams.get(stream_num)
+        if parsed is None:
+            location = self._locate(stream_num)
+            if not location or location is _MISSING or location[0] != "offset":
+                raise PDFProbeError(f"Object stream {stream_num} not found")
+            stream_dict, raw = self._read_object_at(location[1], stream_num)
+            if not isinstance(stream_dict, dict) or stream_dict.get("/Type") != "/ObjStm" or raw is None:
+                raise PDFProbeError(f"Object {stream_num} is not an object stream")
+            content = decode_stream(stream_dict, raw)
+            first = stream_dict["/First"]
+            header = [int(value) for value in content[:first].split()]
+            offsets = dict(zip(header[0::2], header[1::2]))
+            parsed = self._object_streams[stream_num] = (content, first, offsets)
+        content, first, offsets = parsed
+        if num not in offsets:
+            raise PDFProbeError(f"Object {num} not in object stream {stream_num}")
+        return parse_object(content, first + offsets[num])[0]
+
+    def get(self, num):
+        """Возвращает объект по номеру (None для свободных и отсутствующих объектов)."""
+        if num not in self._objects:
+            location = self._locate(num)
+            if location is None or location is _MISSING:
+                obj = None
+            elif location[0] == "offset":
+                obj = self._read_object_at(location[1], num)[0]
+            else:
+                obj = self._from_object_stream(location[1], num)
+            self._objects[num] = obj
+        return self._objects[num]
+
+    def resolve(self, value):
+        """Разрешает косвенные ссылки до прямого значения."""
+        for _ in range(_MAX_REFERENCE_DEPTH):
+            if not isinstance(value, Ref):
+                return value
+            value = self.get(value.num)
+        raise PDFProbeError("Reference chain is too long")
+
+    def summary(self):
+        """
+        Возвращает количество страниц из /Root/Pages/Count и текстовые поля словаря /Info.
+
+        Возвращает:
+            dict: {"num_pages": int, "info": {"/Author": str, ...}}.
+        """
+        if "/Encrypt" in self.trailer:
+            # строки /Info зашифрованы
+            raise PDFProbeError("Encrypted document")
+        root = self.resolve(self.trailer.get("/Root"))
+        pages = self.resolve(root.get("/Pages")) if isinstance(root, dict) else None
+        count = self.resolve(pages.get("/Count")) if isinstance(pages, dict) else None
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise PDFProbeError("Page count not found")
+        info = self.resolve(self.trailer.get("/Info"))
+        fields = {}
+        if isinstance(info, dict):
+            for key, value in info.items():
+                value = self.resolve(value)
+                if isinstance(value, (bytes, Name)):
+                    fields[key] = decode_text(value)
+        return {"num_pages": count, "info": fields}
+
+
+def probe_pdf(filepath):
+    """
+    Быстро читает число страниц и словарь /Info PDF-файла.
+
+    Файл отображается в память (mmap), и читаются только хвост файла, секции перекрёстных
+    ссылок и несколько объектов (каталог, корень дерева страниц, /Info), поэтому время не зависит
+    от количества страниц. Дерево страниц, в отличие от PdfReader.pages, не обходится.
+
+    Аргументы:
+        filepath (str | PathLike): Путь к PDF-файлу.
+
+    Возвращает:
+        dict: {"num_pages": int, "info": dict} — ключи info совпадают с ключами PdfReader.metadata.
+
+    Исключения:
+        PDFProbeError: Структура файла повреждена, файл зашифрован или использует неподдерживаемые
+            возможности; в этом случае следует использовать PyPDF2.
+    """
+    with open(filepath, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            # пустой файл нельзя отобразить в память
+            raise PDFProbeError(str(e)) from e
+    with data:
+        try:
+            return PDFDocument(data).summary()
+        except PDFProbeError:
+            raise
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError, RecursionError) as e:
+            raise PDFProbeError(f"{type(e).__name__}: {e}") from e
@@ -1,17 +1,38 @@
 # pdf_processor.py
 import time, os
-import logging
 from PyPDF2 import PdfReader
 from datetime import datetime
 from .base_processor import FileProcessor
 import re
-import PyPDF2 
-from .logging_config import setup_logging
+from .pdf_probe import probe_pdf, PDFProbeError
+from .logging_config import setup_logging, file_logger
 
 # логгирование
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 process_logger, error_logger = setup_logging(project_root)
 
+
+def read_pdf_summary(filepath):
+    """
+    Возвращает количество страниц и метаданные PDF-файла.
+
+    Сначала используется быстрый разбор структуры файла (pdf_probe), который не обходит дерево
+    страниц; PdfReader строится, только если структура повреждена или не поддерживается.
+
+    Args:
+        filepath (str): Путь к PDF-файлу.
+
+    Returns:
+        tuple: (количество страниц, словарь метаданных с ключами "/Author", "/Title" и т.д.).
+    """
+    try:
+        summary = probe_pdf(filepath)
+        return summary["num_pages"], summary["info"]
+    except PDFProbeError as e:
+        process_logger.debug(f"PDF probe fell back to PyPDF2 for {filepath}: {e}")
+    reader = PdfReader(filepath)
+    return len(reader.pages), reader.metadata or {}
+
 class PDFProcessor(FileProcessor):
     """
     Класс для обработки PDF-файлов.
@@ -44,10 +65,9 @@ class PDFProcessor(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
-            reader = PdfReader(filepath)
-            num_pages = len(reader.pages)
-            pdf_info = reader.metadata
+            num_pages, pdf_info = read_pdf_summary(filepath)
 
             file_info.update({
                 "num_pages": num_pages,
@@ -58,12 +78,12 @@ class PDFProcessor(FileProcessor):
             })
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"PDF processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("PDF processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing PDF {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
 
     def parse_pdf_date(self, date_str):
         """
@@ -124,9 +144,9 @@ class PDFProcessorWeb(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(file_path)
+            file_path = os.fspath(file_path)
             
-            pdf_file = PyPDF2.PdfReader(file_path)
-            page_count = len(pdf_file.pages)  # страницы
+            page_count, _ = read_pdf_summary(file_path)  # страницы
 
             file_info.update({
                 "type": "pdf",  # тип файла
@@ -135,9 +155,9 @@ class PDFProcessorWeb(FileProcessor):
             })
 
             elapsed_time = time.time() - start_time
-            logging.info(f"PDF processed: {file_path} in {elapsed_time:.2f} seconds")
+            file_logger.info("PDF processed: %s in %.2f seconds", file_path, elapsed_time)
 
             return file_info
         except Exception as e:
-            logging.error(f"Error processing PDF {file_path}: {e}")
-            return {"type": "pdf", "error": str(e)}  # setting error type
+            error_logger.error(f"Error processing PDF {file_path}: {e}")
+            return self.error_info(e, type="pdf")  # setting error type
@@ -0,0 +1,206 @@
+import os
+import queue
+import threading
+
+from .tree_walker import matches
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# глубина очереди между обходом и обработчиками (записей FileEntry)
+DEFAULT_WALK_DEPTH = 4096
+# глубина очереди между обработчиками и записью индекса (строк результатов)
+DEFAULT_RESULT_DEPTH = 1024
+
+# конец потока элементов стадии
+_DONE = object()
+
+
+class _Failure:
+    """Исключение стадии, передаваемое потребителю через очередь."""
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class BoundedStage:
+    """
+    Стадия конвейера: фоновый поток перекладывает элементы итератора в очередь ограниченной длины.
+
+    Когда очередь заполнена, поток стадии ждёт потребителя (обратное давление), поэтому
+    стадия не может уйти вперёд больше чем на depth элементов. Исключение источника
+    передаётся потребителю и возбуждается при чтении. Если потребитель прекращает чтение
+    (ошибка записи, прерывание), стадия останавливается и закрывает свой источник,
+    что по цепочке останавливает и предыдущие стадии.
+
+    Аргументы:
+        source (iterable): Источник элементов.
+        depth (int): Максимальное число элементов в очереди.
+        name (str): Имя потока стадии.
+    """
+    def __init__(self, source, depth, name):
+        self.source = source
+        self.queue = queue.Queue(maxsize=max(1, int(depth)))
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for item in self.source:
+                if not self._put(item):
+                    return
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            close = getattr(self.source, "close", None)
+            if close is not None:
+                close()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Останавливает стадию и дожидается её потока."""
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class FileCounter:
+    """
+    Быстрый подсчёт файлов для индикатора прогресса.
+
+    Работает в фоновом потоке параллельно с индексацией: только читает каталоги
+    (os.scandir, без stat для файлов) и учитывает шаблоны include/exclude.
+    Пока подсчёт не закончен, total равен None, а counted — число уже найденных файлов.
+
+    Аргументы:
+        roots (str | list): Корневая директория или список директорий.
+        include (list, optional): Шаблоны отбираемых файлов.
+        exclude (list, optional): Шаблоны пропускаемых файлов.
+        follow_symlinks (bool): Переходить ли по символическим ссылкам на каталоги.
+    """
+    def __init__(self, roots, include=None, exclude=None, follow_symlinks=False):
+        self.roots = [roots] if isinstance(roots, (str, os.PathLike)) else list(roots)
+        self.include = include
+        self.exclude = exclude
+        self.follow_symlinks = follow_symlinks
+        self.counted = 0
+        self.total = None
+        self._done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="scan-count", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for root in self.roots:
+                self._count(os.fspath(root))
+            if not self._stop.is_set():
+                self.total = self.counted
+        except Exception as e:
+            error_logger.error(f"File count failed: {e}")
+        finally:
+            self._done.set()
+
+    def _count(self, root):
+        stack = [root]
+        while stack and not self._stop.is_set():
+            try:
+                with os.scandir(stack.pop()) as iterator:
+                    for entry in iterator:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            # как в tree_walker.list_directory: ссылка на каталог не является файлом
+                            # и обходится, только если follow_symlinks
+                            if self.follow_symlinks or not entry.is_symlink():
+                                stack.append(entry.path)
+                        elif self._selected(entry.path, root):
+                            self.counted += 1
+            except OSError:
+                continue
+
+    def _selected(self, path, root):
+        if self.include and not matches(path, root, self.include):
+            return False
+        return not (self.exclude and matches(path, root, self.exclude))
+
+    def wait(self, timeout=None):
+        """Ожидает окончания подсчёта; возвращает общее число файлов или None."""
+        self._done.wait(timeout)
+        return self.total
+
+    def stop(self):
+        self._stop.set()
+
+
+class ScanPipeline:
+    """
+    Конвейер индексации из стадий, связанных очередями ограниченной длины:
+
+        обход (поток) → [walk_depth] → обработчики (поток) → [result_depth] → запись индекса (вызывающий поток)
+
+    Каждая стадия блокируется, когда очередь следующей заполнена, поэтому память не растёт
+    на больших деревьях, даже если обход намного быстрее извлечения метаданных.
+    Порядок строк совпадает с порядком обхода.
+
+    Аргументы:
+        manager (FileManager): Менеджер с обходом и обработчиками.
+        walk_depth (int): Глубина очереди между обходом и обработчиками.
+        result_depth (int): Глубина очереди между обработчиками и записью.
+    """
+    def __init__(self, manager, walk_depth=DEFAULT_WALK_DEPTH, result_depth=DEFAULT_RESULT_DEPTH):
+        self.manager = manager
+        self.walk_depth = walk_depth
+        self.result_depth = result_depth
+
+    def results(self, journal=None):
+        """
+        Запускает стадии обхода и обработки.
+
+        Аргументы:
+            journal (ScanJournal, optional): Журнал обработанных файлов.
+
+        Возвращает:
+            BoundedStage: Итерируемые строки результатов для записи.
+        """
+        walk = BoundedStage(self.manager.get_entries(), self.walk_depth, "scan-walk").start()
+        extract = BoundedStage(self._extract(walk, journal), self.result_depth, "scan-extract")
+        return extract.start()
+
+    def _extract(self, walk, journal):
+        try:
+            yield from self.manager.iter_results(walk, journal=journal)
+        finally:
+            # обход останавливается, даже если обработка завершилась, не начав читать его очередь
+            walk.stop()
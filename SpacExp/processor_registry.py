@@ -0,0 +1,204 @@
+import os
+import mimetypes
+
+from .base_processor import as_file_entry
+from .pdf_processor import PDFProcessor, PDFProcessorWeb
+from .image_processor import ImageProcessor, ImageProcessorWeb
+from .docx_processor import DOCXProcessor, DOCXProcessorWeb
+from .excel_processor import ExcelProcessor, ExcelProcessorWeb
+from .audio_processor import AudioProcessor, AudioProcessorWeb
+from .video_processor import VideoProcessor, VideoProcessorWeb
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# обработчики по типам файлов для десктопного и веб-конвейера
+DESKTOP_PROCESSORS = {
+    "pdf": PDFProcessor,
+    "image": ImageProcessor,
+    "document": DOCXProcessor,
+    "excel": ExcelProcessor,
+    "audio": AudioProcessor,
+    "video": VideoProcessor,
+}
+
+WEB_PROCESSORS = {
+    "pdf": PDFProcessorWeb,
+    "image": ImageProcessorWeb,
+    "document": DOCXProcessorWeb,
+    "excel": ExcelProcessorWeb,
+    "audio": AudioProcessorWeb,
+    "video": VideoProcessorWeb,
+}
+
+# соответствие префиксов MIME-типов типам файлов (правила десктопного конвейера)
+MIME_PREFIX_TYPES = [
+    ('application/pdf', "pdf"),
+    ('image', "image"),
+    ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', "document"),
+    ('application/vnd.openxmlformats-officedocument.themeManager+xml', "document"),
+    ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', "excel"),
+    ('application/msword', "document"),
+    ('audio', "audio"),
+    ('video', "video"),
+]
+
+# расширения веб-конвейера
+WEB_EXTENSION_TYPES = {
+    ".pdf": "pdf",
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".bmp": "image", ".gif": "image",
+    ".doc": "document", ".docx": "document",
+    ".xls": "excel", ".xlsx": "excel",
+    ".mp3": "audio", ".wav": "audio", ".flac": "audio", ".aac": "audio", ".ogg": "audio",
+    ".mp4": "video", ".avi": "video", ".mov": "video", ".mkv": "video", ".flv": "video",
+}
+
+# сколько байт начала файла читается для определения типа по сигнатуре
+SNIFF_BYTES = 8192
+
+
+def mime_extension_table():
+    """
+    Строит таблицу расширение → тип файла по базе mimetypes и правилам MIME_PREFIX_TYPES.
+
+    Расширения, известные mimetypes, но не имеющие обработчика, попадают в таблицу
+    со значением None, чтобы для них не выполнялось чтение сигнатуры.
+
+    Возвращает:
+        dict: Расширение в нижнем регистре (с точкой) → тип файла или None.
+    """
+    mimetypes.init()
+    table = {}
+    for extension, mime_type in mimetypes.types_map.items():
+        table[extension.lower()] = next(
+            (file_type for prefix, file_type in MIME_PREFIX_TYPES if mime_type.startswith(prefix)), None
+        )
+    return table
+
+
+def sniff_file_type(filepath, limit=SNIFF_BYTES):
+    """
+    Определяет тип файла по сигнатуре в первых limit байтах.
+
+    Аргументы:
+        filepath (str): Путь к файлу.
+        limit (int): Максимальное количество читаемых байт.
+
+    Возвращает:
+        str: Тип файла ("pdf", "image", "document", "excel", "audio", "video") или None.
+    """
+    try:
+        with open(filepath, "rb") as file:
+            head = file.read(limit)
+    except OSError as e:
+        error_logger.error(f"Failed to read signature of {filepath}: {e}")
+        return None
+
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith((b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"II*\x00", b"MM\x00*")):
+        return "image"
+    if head.startswith(b"BM") and len(head) > 18 and int.from_bytes(head[14:18], "little") in (12, 40, 56, 108, 124):
+        return "image"
+    if head.startswith(b"RIFF") and len(head) >= 12:
+        return {b"WEBP": "image", b"WAVE": "audio", b"AVI ": "video"}.get(head[8:12])
+    if head.startswith((b"ID3", b"fLaC", b"OggS")) or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2",
+                                                                  b"\xff\xf1", b"\xff\xf9"):
+        return "audio"
+    if head[4:8] == b"ftyp":
+        return "audio" if head[8:12] in (b"M4A ", b"M4B ") else "video"
+    if head.startswith((b"\x1a\x45\xdf\xa3", b"FLV\x01")):
+        return "video"
+    if head.startswith(b"PK\x03\x04"):
+        # OOXML: имена частей лежат в локальных заголовках zip в начале архива
+        if b"word/" in head:
+            return "document"
+        if b"xl/" in head:
+            return "excel"
+    return None
+
+
+class ProcessorRegistry:
+    """
+    Единый реестр обработчиков для десктопного и веб-конвейера.
+
+    Тип файла определяется по заранее построенной таблице расширений за O(1);
+    для расширений, отсутствующих в таблице (и файлов без расширения), читается
+    ограниченное начало файла и проверяются сигнатуры форматов. Экземпляры
+    обработчиков создаются один раз и переиспользуются для всех файлов.
+
+    Аргументы:
+        processor_classes (dict): Тип файла → класс обработчика.
+        extension_table (dict): Расширение → тип файла или None.
+        sniff_bytes (int): Лимит чтения сигнатуры; 0 отключает определение по содержимому.
+    """
+    def __init__(self, processor_classes, extension_table, sniff_bytes=SNIFF_BYTES):
+        self.processors = {file_type: cls() for file_type, cls in processor_classes.items()}
+        self.extension_table = extension_table
+        self.sniff_bytes = sniff_bytes
+
+    @classmethod
+    def desktop(cls):
+        """Реестр десктопного конвейера: расширения из базы MIME-типов."""
+        return cls(DESKTOP_PROCESSORS, mime_extension_table())
+
+    @classmethod
+    def web(cls):
+        """
+        Реестр веб-конвейера: тип определяется только по расширению, сигнатура не читается.
+
+        Веб-конвейер обрабатывает лишь расширения из WEB_EXTENSION_TYPES, и файл с другим
+        расширением не получил бы обработчика и после чтения его начала.
+        """
+        return cls(WEB_PROCESSORS, dict(WEB_EXTENSION_TYPES), sniff_bytes=0)
+
+    def resolve_type(self, filepath):
+        """
+        Определяет тип файла.
+
+        Аргументы:
+            filepath (str | FileEntry): Путь к файлу или запись обхода.
+
+        Возвращает:
+            str: Тип файла или None, если подходящего обработчика нет.
+        """
+        entry = as_file_entry(filepath)
+        extension = os.path.splitext(entry.name)[1].lower()
+        if extension in self.extension_table:
+            return self.extension_table[extension]
+        if self.sniff_bytes:
+            return sniff_file_type(entry.path, self.sniff_bytes)
+        return None
+
+    def resolve(self, filepath):
+        """Возвращает обработчик для файла или None."""
+        return self.processors.get(self.resolve_type(filepath))
+
+    def for_extension(self, extension):
+        """Возвращает обработчик по расширению (с точкой) без чтения файла."""
+        return self.processors.get(self.extension_table.get(extension.lower()))
+
+    def prepare(self, filepaths):
+        """
+        Передаёт каждому обработчику файлы пакета, относящиеся к нему (по расширению).
+
+        Аргументы:
+            filepaths (list): Пути к файлам или FileEntry пакета.
+        """
+        groups = {}
+        for filepath in filepaths:
+            processor = self.for_extension(os.path.splitext(as_file_entry(filepath).name)[1])
+            if processor is not None:
+                groups.setdefault(id(processor), (processor, []))[1].append(filepath)
+        for processor, files in groups.values():
+            processor.prepare(files)
+
+    def get_state(self):
+        """Возвращает состояние обработчиков для передачи из процесса пула."""
+        return {file_type: processor.get_state() for file_type, processor in self.processors.items()}
+
+    def merge_state(self, state):
+        """Сливает состояние обработчиков, полученное из процесса пула."""
+        for file_type, processor_state in state.items():
+            processor = self.processors.get(file_type)
+            if processor is not None and processor_state is not None:
+                processor.merge_state(processor_state)
@@ -0,0 +1,193 @@
+import os
+import csv
+import time
+import heapq
+import pstats
+import cProfile
+
+from .metrics import file_size
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# колонки отчёта о самых медленных файлах
+SLOWEST_COLUMNS = ["processor", "file_path", "file_size", "elapsed_seconds"]
+
+# глубина стеков в файле для flame graph
+MAX_STACK_DEPTH = 64
+
+
+def _stats_from_dict(data):
+    """Создаёт pstats.Stats из словаря Stats.stats (например, полученного из процесса пула)."""
+    stats = pstats.Stats()
+    stats.stats = data
+    stats.get_top_level_stats()
+    return stats
+
+
+def _function_name(func):
+    filename, line, name = func
+    if filename == "~":
+        # встроенные функции: ('~', 0, "<built-in method ...>")
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats, max_depth=MAX_STACK_DEPTH):
+    """
+    Строит стеки вызовов в свёрнутом формате ("корень;вызываемая;... микросекунды").
+
+    cProfile хранит только рёбра вызывающий → вызываемый, поэтому стеки восстанавливаются
+    обходом графа от функций верхнего уровня; собственное время функции делится между
+    её вызывающими пропорционально числу вызовов. Результат подходит для flamegraph.pl
+    и speedscope.
+
+    Аргументы:
+        stats (pstats.Stats): Статистика профилировщика.
+        max_depth (int): Максимальная глубина стека.
+
+    Возвращает:
+        list: Строки "frame;frame;... value".
+    """
+    callees = {}
+    for func, (_, calls, own_time, _, callers) in stats.stats.items():
+        for caller, caller_stats in callers.items():
+            callees.setdefault(caller, []).append((func, caller_stats[0]))
+    totals = {func: values[1] for func, values in stats.stats.items()}
+    own = {func: values[2] for func, values in stats.stats.items()}
+    roots = [func for func, values in stats.stats.items() if not values[4]]
+
+    lines = {}
+
+    def visit(func, stack, share):
+        stack = stack + (func,)
+        micros = int(own[func] * share * 1e6)
+        if micros > 0:
+            key = ";".join(_function_name(frame) for frame in stack)
+            lines[key] = lines.get(key, 0) + micros
+        if len(stack) >= max_depth:
+            return
+        for callee, calls in callees.get(func, ()):
+            if callee in stack or not totals.get(callee):
+                continue
+            visit(callee, stack, share * min(1.0, calls / totals[callee]))
+
+    for root in roots:
+        visit(root, (), 1.0)
+    return [f"{key} {value}" for key, value in lines.items()]
+
+
+class ScanProfiler:
+    """
+    Профилирование вызовов обработчиков файлов.
+
+    Каждый вызов обработчика выполняется под cProfile; статистика накапливается
+    отдельно для каждого обработчика. Параллельно ведётся список top_n самых долгих файлов.
+    Процессы пула передают накопленное в основной процесс (drain/merge), как и метрики.
+
+    Аргументы:
+        top_n (int): Сколько самых медленных файлов хранить для отчёта.
+    """
+    def __init__(self, top_n=20):
+        self.top_n = top_n
+        self._profiles = {}
+        self._stats = {}
+        self._slowest = []
+        self._sequence = 0
+
+    def call(self, name, func, filepath):
+        """
+        Вызывает func(filepath) под профилировщиком обработчика name.
+
+        Аргументы:
+            name (str): Имя обработчика.
+            func (callable): Метод обработки.
+            filepath (str | FileEntry): Путь к файлу.
+
+        Возвращает:
+            object: Результат func(filepath).
+        """
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return func(filepath)
+        finally:
+            profile.disable()
+            self._record(name, os.fspath(filepath), file_size(filepath), time.perf_counter() - started)
+
+    def _record(self, name, path, size, elapsed):
+        self._sequence += 1
+        item = (elapsed, self._sequence, name, path, size)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def stats(self):
+        """Возвращает pstats.Stats по каждому обработчику: {имя: Stats}."""
+        result = {}
+        for name in set(self._stats) | set(self._profiles):
+            stats = _stats_from_dict({})
+            if name in self._stats:
+                stats.add(self._stats[name])
+            if name in self._profiles:
+                stats.add(pstats.Stats(self._profiles[name]))
+            result[name] = stats
+        return result
+
+    def slowest(self):
+        """Возвращает самые медленные файлы: список (обработчик, путь, размер, секунды) по убыванию времени."""
+        return [(name, path, size, elapsed) for elapsed, _, name, path, size in sorted(self._slowest, reverse=True)]
+
+    def drain(self):
+        """Возвращает накопленные данные в переносимом виде и обнуляет профилировщик."""
+        data = {"stats": {name: stats.stats for name, stats in self.stats().items()},
+                "slowest": list(self._slowest)}
+        self._profiles = {}
+        self._stats = {}
+        self._slowest = []
+        return data
+
+    def merge(self, data):
+        """Добавляет данные, полученные drain() в другом процессе."""
+        if not data:
+            return
+        for name, stats in data["stats"].items():
+            other = _stats_from_dict(stats)
+            if name in self._stats:
+                self._stats[name].add(other)
+            else:
+                self._stats[name] = other
+        for elapsed, _, name, path, size in data["slowest"]:
+            self._record(name, path, size, elapsed)
+
+    def write_report(self, directory):
+        """
+        Записывает отчёт профилирования в каталог:
+
+            <обработчик>.pstats     — статистика cProfile (pstats, snakeviz, gprof2dot);
+            <обработчик>.collapsed  — свёрнутые стеки для flame graph;
+            slowest_files.csv       — самые медленные файлы (обработчик, путь, размер, секунды).
+
+        Пути файлов в лог не пишутся: в лог попадает одна строка с итогом.
+
+        Аргументы:
+            directory (str): Каталог отчёта (создаётся при необходимости).
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, stats in self.stats().items():
+            stats.dump_stats(os.path.join(directory, f"{name}.pstats"))
+            with open(os.path.join(directory, f"{name}.collapsed"), "w", encoding="utf-8") as file:
+                for line in collapsed_stacks(stats):
+                    file.write(line + "\n")
+        with open(os.path.join(directory, "slowest_files.csv"), "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(SLOWEST_COLUMNS)
+            for name, path, size, elapsed in self.slowest():
+                writer.writerow([name, path, size, f"{elapsed:.6f}"])
+        # сами файлы — только в отчёте; в лог идёт одна строка
+        slowest = self.slowest()
+        summary = f", slowest file took {slowest[0][3]:.2f} seconds in {slowest[0][0]}" if slowest else ""
+        process_logger.info(f"Profiling report saved to {directory}: {len(slowest)} slowest files{summary}")
@@ -0,0 +1,254 @@
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+# формат дат в строках результатов обработчиков
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# начало отсчёта для хранения дат целыми числами (наивное локальное время, как в строках результатов)
+_EPOCH = datetime(1970, 1, 1)
+
+# общие поля строки результата, хранящиеся в колонках фиксированного типа
+FIXED_FIELDS = ("file_path", "file_name", "file_size", "creation_time", "modification_time", "extension")
+_PATH, _NAME, _SIZE, _CTIME, _MTIME, _EXTENSION = (1 << index for index in range(len(FIXED_FIELDS)))
+# даты строки были объектами datetime, а не строками
+_DATETIME = 1 << len(FIXED_FIELDS)
+
+
+class CompactStat:
+    """
+    Компактный результат stat: только поля, которые использует конвейер.
+
+    os.stat_result хранит два десятка полей-объектов; запись обхода держит
+    только inode, размер и времена модификации и изменения в наносекундах.
+
+    Аргументы:
+        st_ino (int): Номер inode.
+        st_size (int): Размер в байтах.
+        st_mtime_ns (int): Время модификации, наносекунды.
+        st_ctime_ns (int): Время изменения метаданных (создания в Windows), наносекунды.
+    """
+    __slots__ = ("st_ino", "st_size", "st_mtime_ns", "st_ctime_ns")
+
+    def __init__(self, st_ino, st_size, st_mtime_ns, st_ctime_ns):
+        self.st_ino = st_ino
+        self.st_size = st_size
+        self.st_mtime_ns = st_mtime_ns
+        self.st_ctime_ns = st_ctime_ns
+
+    @classmethod
+    def from_stat(cls, stats):
+        """Создаёт CompactStat из os.stat_result (или возвращает None для None)."""
+        if stats is None or isinstance(stats, cls):
+            return stats
+        return cls(stats.st_ino, stats.st_size, stats.st_mtime_ns, stats.st_ctime_ns)
+
+    @property
+    def st_mtime(self):
+        return self.st_mtime_ns / 1e9
+
+    @property
+    def st_ctime(self):
+        return self.st_ctime_ns / 1e9
+
+    def __repr__(self):
+        return (f"CompactStat(st_ino={self.st_ino}, st_size={self.st_size}, "
+                f"st_mtime_ns={self.st_mtime_ns}, st_ctime_ns={self.st_ctime_ns})")
+
+
+def _to_micros(value):
+    """Переводит строку даты или datetime в микросекунды от _EPOCH; None, если значение не дата."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return None
+        moment = value
+    elif isinstance(value, str):
+        try:
+            moment = datetime.strptime(value, DATE_FORMAT)
+        except ValueError:
+            return None
+    else:
+        return None
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(micros, as_datetime):
+    moment = _EPOCH + timedelta(microseconds=micros)
+    return moment if as_datetime else moment.strftime(DATE_FORMAT)
+
+
+class RecordBatch:
+    """
+    Компактное колоночное хранилище строк результатов.
+
+    Общие поля строки (FIXED_FIELDS) хранятся в типизированных массивах: каталог пути —
+    кодом из таблицы каталогов, имя файла — в общем буфере байтов, размер и даты —
+    64-битными целыми (даты в микросекундах), расширение — кодом из таблицы
+    интернированных расширений; поле file_name не хранится отдельно, если совпадает
+    с последним компонентом пути. Остальные поля (метаданные обработчиков)
+    хранятся разреженно по колонкам: для каждого поля — номера строк, где оно есть,
+    и значения; для строки хранится только код набора её полей (он же задаёт их порядок). Поле, значение которого не
+    подходит под тип колонки, тоже уходит в разреженную часть, поэтому строки
+    восстанавливаются без потерь (общие поля идут первыми, в порядке FIXED_FIELDS).
+
+    Ведёт себя как последовательность словарей: поддерживает len(), индексацию и итерацию.
+
+    Нужно там, где результаты накапливаются целиком (FileManagerWeb.process_files).
+    Настольный конвейер (FileManager.run) строк не накапливает: они потоково уходят
+    в IndexWriter через очередь ограниченной длины, а записи обхода уже хранят CompactStat.
+    """
+    def __init__(self, rows=()):
+        self._flags = array("B")
+        self._directory_codes = array("I")
+        # имена файлов лежат одним буфером UTF-8, строка хранит только смещение
+        self._name_data = bytearray()
+        self._name_offsets = array("Q", [0])
+        self._sizes = array("q")
+        self._ctimes = array("q")
+        self._mtimes = array("q")
+        self._extension_codes = array("I")
+        self._directories = []
+        self._directory_index = {}
+        self._extensions = []
+        self._extension_index = {}
+        # наборы дополнительных полей строк; код 0 — строка без дополнительных полей
+        self._signatures = [()]
+        self._signature_index = {(): 0}
+        self._signature_codes = array("I")
+        self._columns = {}
+        for row in rows:
+            self.append(row)
+
+    def _code(self, value, values, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(sys.intern(value))
+        return code
+
+    def append(self, row):
+        """Добавляет строку результата (словарь)."""
+        flags = 0
+        extra = {}
+        directory, name = "", None
+        size = ctime = mtime = extension = 0
+        dates_as_datetime = None
+
+        path = row.get("file_path")
+        if isinstance(path, str):
+            directory, name = os.path.split(path)
+            if os.path.join(directory, name) == path:
+                flags |= _PATH
+            else:
+                directory, name = "", None
+        if "file_name" in row and not (flags & _PATH and row["file_name"] == name):
+            extra["file_name"] = row["file_name"]
+        elif "file_name" in row:
+            flags |= _NAME
+        value = row.get("file_size")
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            size = value
+            flags |= _SIZE
+        for field, bit in (("creation_time", _CTIME), ("modification_time", _MTIME)):
+            value = row.get(field)
+            micros = _to_micros(value)
+            kind = isinstance(value, datetime)
+            if micros is not None and dates_as_datetime in (None, kind):
+                dates_as_datetime = kind
+                if bit == _CTIME:
+                    ctime = micros
+                else:
+                    mtime = micros
+                flags |= bit
+        if dates_as_datetime:
+            flags |= _DATETIME
+        value = row.get("extension")
+        if isinstance(value, str):
+            extension = self._code(value, self._extensions, self._extension_index)
+            flags |= _EXTENSION
+
+        stored = {"file_path": _PATH, "file_size": _SIZE, "creation_time": _CTIME,
+                  "modification_time": _MTIME, "extension": _EXTENSION}
+        for key, value in row.items():
+            if key in stored:
+                if not flags & stored[key]:
+                    extra[key] = value
+            elif key != "file_name":
+                extra[key] = value
+
+        index = len(self._flags)
+        self._flags.append(flags)
+        self._directory_codes.append(self._code(directory, self._directories, self._directory_index))
+        if flags & _PATH:
+            self._name_data += name.encode("utf-8", "surrogatepass")
+        self._name_offsets.append(len(self._name_data))
+        self._sizes.append(size)
+        self._ctimes.append(ctime)
+        self._mtimes.append(mtime)
+        self._extension_codes.append(extension)
+        signature = tuple(extra)
+        code = self._signature_index.get(signature)
+        if code is None:
+            code = self._signature_index[signature] = len(self._signatures)
+            self._signatures.append(tuple(sys.intern(key) if isinstance(key, str) else key for key in signature))
+        self._signature_codes.append(code)
+        for key, value in extra.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = (array("I"), [])
+            column[0].append(index)
+            column[1].append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def row(self, index):
+        """Восстанавливает строку с номером index в виде словаря."""
+        flags = self._flags[index]
+        row = {}
+        if flags & (_PATH | _NAME):
+            start, end = self._name_offsets[index], self._name_offsets[index + 1]
+            name = self._name_data[start:end].decode("utf-8", "surrogatepass")
+        if flags & _PATH:
+            row["file_path"] = os.path.join(self._directories[self._directory_codes[index]], name)
+        if flags & _NAME:
+            row["file_name"] = name
+        if flags & _SIZE:
+            row["file_size"] = self._sizes[index]
+        as_datetime = bool(flags & _DATETIME)
+        if flags & _CTIME:
+            row["creation_time"] = _from_micros(self._ctimes[index], as_datetime)
+        if flags & _MTIME:
+            row["modification_time"] = _from_micros(self._mtimes[index], as_datetime)
+        if flags & _EXTENSION:
+            row["extension"] = self._extensions[self._extension_codes[index]]
+        row.update(self.extra(index))
+        return row
+
+    def extra(self, index):
+        """Возвращает дополнительные (не общие) поля строки с номером index."""
+        extra = {}
+        for key in self._signatures[self._signature_codes[index]]:
+            rows, values = self._columns[key]
+            extra[key] = values[bisect_left(rows, index)]
+        return extra
+
+    def __len__(self):
+        return len(self._flags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RecordBatch index out of range")
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
@@ -0,0 +1,479 @@
+import os
+import csv
+from collections import deque
+import pandas as pd
+
+# pyarrow нужен только для колоночного формата
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# типы известных колонок индекса в колоночном формате; остальные колонки хранятся строками
+COLUMN_TYPES = {
+    "file_size": "int64",
+    "creation_time": "timestamp",
+    "modification_time": "timestamp",
+    "extension": "dictionary",
+    "num_pages": "int64",
+    "page_count": "int64",
+    "pdf_creation_date": "timestamp",
+    "pdf_modification_date": "timestamp",
+    "doc_creation_date": "timestamp",
+    "doc_modification_date": "timestamp",
+    "doc_words": "int64",
+    "doc_characters": "int64",
+    "image_width": "int64",
+    "image_height": "int64",
+    "dpi_x": "float64",
+    "dpi_y": "float64",
+    "num_sheets": "int64",
+    "excel_rows": "int64",
+    "excel_columns": "int64",
+    "video_frame_count": "int64",
+    "video_fps": "float64",
+    "video_duration": "float64",
+    "video_width": "int64",
+    "video_height": "int64",
+    "audio_duration": "float64",
+    "audio_bitrate": "int64",
+    "audio_sample_rate": "int64",
+    # таблица метаданных (file_id, namespace, key, value)
+    "file_id": "int64",
+    "namespace": "dictionary",
+    "key": "dictionary",
+}
+
+# формат дат, в котором их выдают обработчики
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# значение, которое нельзя без потерь сохранить в типе своей колонки (дробное число в целой,
+# число вне диапазона, нечисловая строка, дата в другом формате), пишется строкой
+# в колонку <колонка><TEXT_SUFFIX>
+TEXT_SUFFIX = "_text"
+NUMERIC_KINDS = ("int64", "float64")
+TYPED_KINDS = NUMERIC_KINDS + ("timestamp",)
+
+
+def create_sink(output_file, output_format="csv", **kwargs):
+    """
+    Создаёт приёмник результатов для указанного формата.
+
+    Аргументы:
+        output_file (str): Путь к итоговому файлу.
+        output_format (str): "csv" или "parquet".
+        **kwargs: Дополнительные параметры приёмника (batch_size и т.п.).
+
+    Возвращает:
+        ResultSink: Приёмник результатов.
+    """
+    if output_format == "csv":
+        return CSVResultSink(output_file, **kwargs)
+    if output_format == "parquet":
+        return ParquetResultSink(output_file, **kwargs)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+
+class ResultSink:
+    """
+    Базовый приёмник результатов обработки.
+
+    Строки передаются по одной через write(), приёмник сам решает, когда сбрасывать их на диск.
+    Поддерживает протокол контекстного менеджера: при нормальном выходе вызывается close(),
+    при исключении — abort(), который сохраняет уже записанные данные.
+    """
+    def write(self, row):
+        """Принимает одну строку результата (словарь)."""
+        raise NotImplementedError
+
+    def close(self):
+        """Завершает запись и публикует результат."""
+        pass
+
+    def abort(self):
+        """Прерывает запись, сохраняя уже сброшенные на диск строки."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class CSVResultSink(ResultSink):
+    """
+    Потоковая запись результатов в CSV пакетами ограниченного размера.
+
+    Строки пишутся во временный файл <output>.part по мере обработки. Набор колонок
+    фиксируется первым пакетом; колонки, появившиеся позже, записываются в побочный
+    файл <output>.extra.csv в длинном формате (row, column, value). При закрытии
+    побочный файл вливается в основной потоковым проходом (consolidate=True),
+    после чего файл атомарно заменяет output_file. Память не зависит от числа строк.
+
+    Аргументы:
+        output_file (str): Путь к итоговому CSV файлу.
+        batch_size (int): Количество строк, после которого пакет сбрасывается на диск.
+        consolidate (bool): Вливать поздние колонки в основной файл при закрытии.
+        columns (list, optional): Заголовок файла, если не записано ни одной строки; без него
+            пустой результат не публикуется.
+    """
+    def __init__(self, output_file, batch_size=1000, consolidate=True, columns=None):
+        self.output_file = output_file
+        self.part_file = f"{output_file}.part"
+        self.extra_file = f"{output_file}.extra.csv"
+        self.batch_size = batch_size
+        self.consolidate = consolidate
+        self.header = columns
+        self.columns = None
+        self.extra_columns = []
+        self.rows_written = 0
+        self._buffer = []
+        self._main = None
+        self._main_writer = None
+        self._extra = None
+        self._extra_writer = None
+
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    @classmethod
+    def _rejects(cls, column, value):
+        """Проверяет, что значение нельзя без потерь сохранить в типе колонки."""
+        rejected = []
+        cls.to_array(column, [value], rejected)
+        return bool(rejected)
+
+    def write(self, row):
+        """Добавляет строку в буфер и сбрасывает пакет при его заполнении."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Записывает буфер на диск."""
+        if not self._buffer:
+            return
+        if self._main is None:
+            # колонки первого пакета в порядке появления, как у pd.DataFrame(list_of_dicts)
+            self.columns = list(dict.fromkeys(key for row in self._buffer for key in row))
+            self._main = open(self.part_file, "w", newline="", encoding="utf-8")
+            self._main_writer = csv.writer(self._main)
+            self._main_writer.writerow(self.columns)
+        known = set(self.columns)
+        for row in self._buffer:
+            self._main_writer.writerow([self._format(row.get(column)) for column in self.columns])
+            for column, value in row.items():
+                if column not in known:
+                    self._spill(column, value)
+            self.rows_written += 1
+        self._buffer = []
+        self._main.flush()
+        if self._extra:
+            self._extra.flush()
+
+    def _spill(self, column, value):
+        """Записывает значение поздней колонки в побочный файл."""
+        if self._extra is None:
+            self._extra = open(self.extra_file, "w", newline="", encoding="utf-8")
+            self._extra_writer = csv.writer(self._extra)
+            self._extra_writer.writerow(["row", "column", "value"])
+        if column not in self.extra_columns:
+            self.extra_columns.append(column)
+        self._extra_writer.writerow([self.rows_written, column, self._format(value)])
+
+    @staticmethod
+    def _format(value):
+        """Приводит значение к строке так же, как DataFrame.to_csv."""
+        if value is None:
+            return ""
+        if isinstance(value, float) and value != value:
+            return ""
+        return value if isinstance(value, str) else str(value)
+
+    def _close_files(self):
+        self.flush()
+        for handle in (self._main, self._extra):
+            if handle:
+                handle.close()
+
+    def close(self):
+        """Сбрасывает остаток, вливает поздние колонки и публикует итоговый файл."""
+        self._close_files()
+        if self._main is None:
+            if self.header is None:
+                return
+            # строк нет, но прежний файл должен замениться пустым с тем же заголовком
+            with open(self.part_file, "w", newline="", encoding="utf-8") as part:
+                csv.writer(part).writerow(self.header)
+        elif self.extra_columns and self.consolidate:
+            self._merge_extra_columns()
+        os.replace(self.part_file, self.output_file)
+        process_logger.info(f"Results saved to {self.output_file}")
+
+    def abort(self):
+        """Сохраняет уже обработанные строки в <output>.part, не трогая прежний output_file."""
+        self._close_files()
+        if self._main is not None:
+            error_logger.error(f"Writing interrupted, partial results kept in {self.part_file}")
+
+    def _merge_extra_columns(self):
+        """Потоково объединяет основной файл с побочным: оба упорядочены по номеру строки."""
+        merged_file = f"{self.output_file}.merge"
+        with open(self.part_file, newline="", encoding="utf-8") as main, \
+                open(self.extra_file, newline="", encoding="utf-8") as extra, \
+                open(merged_file, "w", newline="", encoding="utf-8") as merged:
+            main_reader = csv.reader(main)
+            extra_reader = csv.reader(extra)
+            writer = csv.writer(merged)
+            writer.writerow(next(main_reader) + self.extra_columns)
+            next(extra_reader)
+            positions = {column: i for i, column in enumerate(self.extra_columns)}
+            pending = next(extra_reader, None)
+            for row_number, row in enumerate(main_reader):
+                values = [""] * len(self.extra_columns)
+                while pending is not None and int(pending[0]) == row_number:
+                    values[positions[pending[1]]] = pending[2]
+                    pending = next(extra_reader, None)
+                writer.writerow(row + values)
+        os.replace(merged_file, self.part_file)
+        os.remove(self.extra_file)
+
+
+def _missing(value):
+    """Пустое значение (None, NaN, пустая строка), которое пишется как null без колонки _text."""
+    return pd.api.types.is_scalar(value) and (pd.isna(value) or value == "")
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Потоковая запись результатов в Parquet с типизированной схемой.
+
+    Известные колонки получают типы из COLUMN_TYPES: даты хранятся как timestamp (миллисекунды
+    эпохи), расширения — словарным кодированием, числа — int64/float64. Прочие колонки,
+    найденные в первом пакете, хранятся строками. Числа и даты приводятся к типу колонки только
+    без потерь; значение, которое так не сохранить, остаётся в типизированной колонке пустым, а его
+    строковое представление пишется в колонку <колонка>_text. Каждый пакет записывается отдельной
+    сжатой группой строк. Колонки, появившиеся после первого пакета, пишутся в побочную
+    таблицу <output>.extra.parquet (row, column, value) и при закрытии вливаются
+    в основной файл по одной группе строк.
+
+    Аргументы:
+        output_file (str): Путь к итоговому Parquet файлу.
+        batch_size (int): Количество строк в группе строк.
+        compression (str): Кодек сжатия групп строк.
+        consolidate (bool): Вливать поздние колонки в основной файл при закрытии.
+        columns (list, optional): Колонки схемы, если не записано ни одной строки; без них
+            пустой результат не публикуется.
+    """
+    def __init__(self, output_file, batch_size=10000, compression="zstd", consolidate=True, columns=None):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the parquet output format")
+        self.output_file = output_file
+        self.part_file = f"{output_file}.part"
+        self.extra_file = f"{output_file}.extra.parquet"
+        self.batch_size = batch_size
+        self.compression = compression
+        self.consolidate = consolidate
+        self.header = columns
+        self.schema = None
+        self.extra_columns = []
+        self.rows_written = 0
+        self._buffer = []
+        self._writer = None
+        self._extra_rows = []
+        self._extra_writer = None
+
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    @staticmethod
+    def field_type(column):
+        """Возвращает тип pyarrow для колонки индекса."""
+        kind = COLUMN_TYPES.get(column, "string")
+        if kind == "timestamp":
+            return pa.timestamp("ms")
+        if kind == "dictionary":
+            return pa.dictionary(pa.int32(), pa.string())
+        return getattr(pa, kind)()
+
+    @classmethod
+    def to_array(cls, column, values, rejected=None):
+        """
+        Преобразует значения колонки в массив pyarrow её типа; нераспознанные значения становятся null.
+
+        Аргументы:
+            column (str): Имя колонки.
+            values (list): Значения колонки.
+            rejected (list, optional): Сюда добавляются пары (позиция, строка) значений числовых
+                колонок и колонок дат, которые нельзя без потерь привести к типу колонки.
+
+        Возвращает:
+            pyarrow.Array: Массив типа field_type(column).
+        """
+        kind = COLUMN_TYPES.get(column, "string")
+        if kind == "timestamp":
+            parsed = pd.to_datetime(pd.Series(values, dtype=object), format=DATE_FORMAT, errors="coerce")
+            if rejected is not None:
+                for index, (value, missing) in enumerate(zip(values, parsed.isna())):
+                    if missing and not _missing(value):
+                        rejected.append((index, str(value)))
+            return pa.array(parsed, type=pa.timestamp("ms"), from_pandas=True)
+        if kind in NUMERIC_KINDS:
+            field_type = cls.field_type(column)
+            try:
+                # тип выводится по значениям без потерь, а безопасное приведение отвергает
+                # дробные значения в целой колонке и целые, не представимые в float64
+                return pa.array(values, from_pandas=True).cast(field_type, safe=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+                pass
+            numbers = []
+            for index, value in enumerate(values):
+                number = cls._exact_number(field_type, value)
+                if number is None and rejected is not None and not _missing(value):
+                    rejected.append((index, str(value)))
+                numbers.append(number)
+            return pa.array(numbers, type=field_type)
+        strings = pa.array([None if value is None else str(value) for value in values], type=pa.string())
+        return strings.dictionary_encode() if kind == "dictionary" else strings
+
+    @staticmethod
+    def _exact_number(field_type, value):
+        """Значение в типе field_type без потерь или None, если его так не сохранить."""
+        if isinstance(value, str):
+            value = pd.to_numeric(value.strip(), errors="coerce")
+        try:
+            return pa.array([value], from_pandas=True).cast(field_type, safe=True)[0].as_py()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+            return None
+
+    @classmethod
+    def _rejects(cls, column, value):
+        """Проверяет, что значение нельзя без потерь сохранить в типе колонки."""
+        rejected = []
+        cls.to_array(column, [value], rejected)
+        return bool(rejected)
+
+    def write(self, row):
+        """Добавляет строку в буфер и записывает группу строк при его заполнении."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Записывает буфер отдельной группой строк."""
+        if not self._buffer:
+            return
+        if self._writer is None:
+            columns = list(dict.fromkeys(key for row in self._buffer for key in row))
+            self.schema = pa.schema([pa.field(column, self.field_type(column)) for column in columns])
+            self._writer = pq.ParquetWriter(self.part_file, self.schema, compression=self.compression)
+        known = set(self.schema.names)
+        arrays = {}
+        for column in self.schema.names:
+            if COLUMN_TYPES.get(column) in TYPED_KINDS:
+                rejected = []
+                arrays[column] = self.to_array(column, [row.get(column) for row in self._buffer], rejected)
+                for offset, text in rejected:
+                    self._buffer[offset] = {**self._buffer[offset], column + TEXT_SUFFIX: text}
+        for offset, row in enumerate(self._buffer):
+            for column, value in list(row.items()):
+                if column in known:
+                    continue
+                if COLUMN_TYPES.get(column) in TYPED_KINDS and not _missing(value) and self._rejects(column, value):
+                    # поздняя типизированная колонка: при слиянии в неё попадают только точные значения
+                    column = column + TEXT_SUFFIX
+                    if column in known:
+                        self._buffer[offset] = {**self._buffer[offset], column: str(value)}
+                        continue
+                if column not in self.extra_columns:
+                    self.extra_columns.append(column)
+                self._extra_rows.append((self.rows_written + offset, column, None if value is None else str(value)))
+        arrays = [arrays[column] if column in arrays else self.to_array(column, [row.get(column) for row in self._buffer])
+                  for column in self.schema.names]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+        self._flush_extra()
+
+    def _flush_extra(self):
+        if not self._extra_rows:
+            return
+        rows, columns, values = zip(*self._extra_rows)
+        table = pa.table({"row": pa.array(rows, pa.int64()), "column": pa.array(columns, pa.string()),
+                          "value": pa.array(values, pa.string())})
+        if self._extra_writer is None:
+            self._extra_writer = pq.ParquetWriter(self.extra_file, table.schema, compression=self.compression)
+        self._extra_writer.write_table(table)
+        self._extra_rows = []
+
+    def _close_files(self):
+        self.flush()
+        for writer in (self._writer, self._extra_writer):
+            if writer:
+                writer.close()
+
+    def close(self):
+        """Сбрасывает остаток, вливает поздние колонки и публикует итоговый файл."""
+        self._close_files()
+        if self._writer is None:
+            if self.header is None:
+                return
+            # строк нет, но прежний файл должен замениться пустым с той же схемой
+            schema = pa.schema([pa.field(column, self.field_type(column)) for column in self.header])
+            pq.write_table(schema.empty_table(), self.part_file, compression=self.compression)
+        elif self.extra_columns and self.consolidate:
+            self._merge_extra_columns()
+        os.replace(self.part_file, self.output_file)
+        process_logger.info(f"Results saved to {self.output_file}")
+
+    def abort(self):
+        """Сохраняет уже записанные группы строк в <output>.part, не трогая прежний output_file."""
+        self._close_files()
+        if self._writer is not None:
+            error_logger.error(f"Writing interrupted, partial results kept in {self.part_file}")
+
+    def _merge_extra_columns(self):
+        """Добавляет поздние колонки к основному файлу, обрабатывая по одной группе строк."""
+        merged_file = f"{self.output_file}.merge"
+        source = pq.ParquetFile(self.part_file)
+        schema = self.schema
+        for column in self.extra_columns:
+            schema = schema.append(pa.field(column, self.field_type(column)))
+        extra_batches = pq.ParquetFile(self.extra_file).iter_batches()
+        pending = deque()
+        with pq.ParquetWriter(merged_file, schema, compression=self.compression) as writer:
+            offset = 0
+            for group in range(source.num_row_groups):
+                table = source.read_row_group(group)
+                end = offset + table.num_rows
+                values = {column: [None] * table.num_rows for column in self.extra_columns}
+                while True:
+                    while pending and pending[0][0] < end:
+                        row, column, value = pending.popleft()
+                        values[column][row - offset] = value
+                    if pending:
+                        break
+                    batch = next(extra_batches, None)
+                    if batch is None:
+                        break
+                    pending = deque(zip(*(batch.column(i).to_pylist() for i in range(3))))
+                for column in self.extra_columns:
+                    table = table.append_column(schema.field(column), self.to_array(column, values[column]))
+                writer.write_table(table)
+                offset = end
+        os.replace(merged_file, self.part_file)
+        os.remove(self.extra_file)
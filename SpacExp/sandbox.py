@@ -0,0 +1,299 @@
+import os
+import time
+import multiprocessing
+from itertools import islice
+from multiprocessing.connection import wait
+
+# ограничение памяти процессов доступно только на POSIX-системах
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from . import metrics
+from .logging_config import setup_logging, init_worker_logging, file_log_sampling
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# бюджет времени на файл (секунды) по умолчанию
+DEFAULT_TIMEOUT = 300
+# сколько ждать готовности нового процесса-песочницы (секунды)
+STARTUP_TIMEOUT = 120
+
+
+def worker_context():
+    """
+    Контекст multiprocessing для процессов-обработчиков.
+
+    Процессы запускаются из потока конвейера, пока другие потоки (обход, подсчёт файлов,
+    запись лога) могут держать блокировки; fork скопировал бы их захваченными, и процесс
+    мог бы зависнуть. forkserver порождает процессы от чистого серверного процесса,
+    в котором модули обработчиков уже импортированы; где его нет — используется spawn.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([f"{__package__}.file_manager"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _sandbox_worker(connection, manager, memory_limit, max_tasks, sample_every=None):
+    """
+    Цикл процесса-песочницы: получает задачи по каналу и возвращает результаты.
+
+    Аргументы:
+        connection (Connection): Канал связи с основным процессом.
+        manager (FileManager): Менеджер с обработчиками.
+        memory_limit (int): Лимит адресного пространства процесса в байтах или None.
+        max_tasks (int): После скольких файлов процесс завершается и заменяется новым (None — без ограничения).
+        sample_every (int, optional): Период выборки сообщений о файлах в основном процессе.
+    """
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    # процесс может быть убит в любой момент, поэтому пишет лог сам, без общей очереди
+    init_worker_logging(sample_every=sample_every)
+    manager.init_worker_state()
+    # запуск процесса (импорт модулей, распаковка менеджера) не входит в бюджет первого файла
+    connection.send(None)
+    handled = 0
+    while True:
+        task = connection.recv()
+        if task is None:
+            connection.send((None, manager.get_handler_state()))
+            return
+        index, filepath, file_type = task
+        try:
+            result = (index, manager.process_file(filepath, file_type), None)
+        except Exception as e:
+            result = (index, None, str(e))
+        handled += 1
+        recycle = bool(max_tasks) and handled >= max_tasks
+        # состояние обработчиков передаётся только перед плановым завершением процесса
+        connection.send((result, manager.get_handler_state() if recycle else None))
+        if recycle:
+            return
+
+
+class _Slot:
+    """Процесс-песочница, задача, которую он выполняет, и тип файла задачи с его бюджетом."""
+    __slots__ = ("process", "connection", "task", "deadline", "file_type", "budget")
+
+    def __init__(self):
+        self.process = None
+        self.connection = None
+        self.task = None
+        self.deadline = None
+        self.file_type = None
+        self.budget = None
+
+
+class SandboxPool:
+    """
+    Пул изолированных процессов с бюджетом времени и памяти на каждый файл.
+
+    Каждый файл отдаётся отдельному процессу пула. Если обработка превышает бюджет
+    времени своего типа файла, процесс убивается, файл записывается в результат
+    с общей информацией и ошибкой таймаута, а на место процесса запускается новый.
+    Так же обрабатывается аварийное завершение процесса (например, при превышении
+    лимита памяти). Процессы планово перезапускаются после max_tasks_per_child файлов.
+    Результаты возвращаются в порядке входных путей. Пути читаются пакетами по chunk_size,
+    и перед раздачей процессам пакет готовится в основном процессе (manager.prepare_files,
+    например пакетная конвертация .doc): процессы получают уже готовые файлы из кэша.
+
+    Аргументы:
+        manager (FileManager): Менеджер с обработчиками и реестром типов файлов.
+        workers (int): Количество процессов.
+        timeouts (int | float | dict): Бюджет времени в секундах: одно число для всех файлов
+            или словарь тип файла → секунды (ключ "default" — для остальных типов).
+        memory_limit (int): Лимит памяти процесса в байтах (RLIMIT_AS) или None.
+        max_tasks_per_child (int): Количество файлов, после которого процесс перезапускается.
+        max_pending (int): Насколько далеко выдача задач может опережать упорядоченный вывод.
+        chunk_size (int): Сколько путей готовится одним вызовом prepare_files.
+    """
+    def __init__(self, manager, workers=1, timeouts=None, memory_limit=None, max_tasks_per_child=1000,
+                 max_pending=None, chunk_size=64):
+        self.manager = manager
+        self.workers = max(1, int(workers or 1))
+        if isinstance(timeouts, dict):
+            self.timeouts = dict(timeouts)
+        else:
+            self.timeouts = {"default": timeouts or DEFAULT_TIMEOUT}
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_pending = max_pending or self.workers * 64
+        self.chunk_size = max(1, int(chunk_size))
+        self.timed_out = 0
+        self.crashed = 0
+        self._context = worker_context()
+
+    def budget(self, filepath):
+        """Возвращает бюджет времени (в секундах) для файла по его типу."""
+        return self._type_budget(self.manager.registry.resolve_type(filepath))
+
+    def _type_budget(self, file_type):
+        return self.timeouts.get(file_type, self.timeouts.get("default", DEFAULT_TIMEOUT))
+
+    def map(self, filepaths, lookup=None):
+        """
+        Обрабатывает файлы в песочницах и генерирует результаты в порядке входных путей.
+
+        Аргументы:
+            filepaths (iterable): Пути к файлам или FileEntry.
+            lookup (callable, optional): Функция, возвращающая готовый результат для пути или None.
+
+        Возвращает:
+            generator: Кортежи (filepath, file_data, error).
+        """
+        iterator = self._prepared(filepaths, lookup)
+        ready = {}
+        next_index = 0
+        submitted = 0
+        exhausted = False
+        slots = []
+        try:
+            slots.extend(self._spawn(_Slot(), wait=False) for _ in range(self.workers))
+            for slot in slots:
+                self._await_ready(slot)
+            while True:
+                # раздаём задачи свободным процессам, не уходя слишком далеко вперёд вывода
+                for slot in slots:
+                    while slot.task is None and not exhausted and submitted - next_index < self.max_pending:
+                        try:
+                            filepath, cached = next(iterator)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        index = submitted
+                        submitted += 1
+                        if cached is not None:
+                            ready[index] = (filepath, cached, None)
+                        else:
+                            self._assign(slot, index, filepath)
+
+                while next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+
+                busy = [slot for slot in slots if slot.task is not None]
+                if not busy:
+                    if exhausted and next_index == submitted:
+                        return
+                    continue
+
+                timeout = max(0.0, min(slot.deadline for slot in busy) - time.monotonic())
+                readable = wait([slot.connection for slot in busy], timeout)
+                for slot in busy:
+                    if slot.connection in readable:
+                        self._receive(slot, ready)
+                    elif time.monotonic() >= slot.deadline:
+                        self._kill(slot, ready, f"Timeout after {slot.budget} seconds", "TimeoutError", slot.budget)
+                        self.timed_out += 1
+        finally:
+            self._shutdown(slots)
+
+    def _prepared(self, filepaths, lookup=None):
+        """Генерирует пары (filepath, готовый результат или None), готовя каждый пакет до раздачи."""
+        iterator = iter(filepaths)
+        while True:
+            chunk = [(filepath, lookup(filepath) if lookup else None)
+                     for filepath in islice(iterator, self.chunk_size)]
+            if not chunk:
+                return
+            self.manager.prepare_files([filepath for filepath, cached in chunk if cached is None])
+            yield from chunk
+
+    def _spawn(self, slot, wait=True):
+        """Запускает новый процесс для слота; при wait дожидается его готовности."""
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_sandbox_worker,
+            args=(child_connection, self.manager, self.memory_limit, self.max_tasks_per_child, file_log_sampling()),
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        slot.process, slot.connection, slot.task, slot.deadline = process, parent_connection, None, None
+        if wait:
+            self._await_ready(slot)
+        return slot
+
+    def _await_ready(self, slot):
+        """Ожидает сообщения о готовности процесса слота."""
+        try:
+            if slot.connection.poll(STARTUP_TIMEOUT):
+                slot.connection.recv()
+                return
+        except (EOFError, OSError):
+            pass
+        slot.process.kill()
+        slot.process.join()
+        raise RuntimeError(f"Sandbox worker failed to start (exit code {slot.process.exitcode})")
+
+    def _assign(self, slot, index, filepath):
+        """Отдаёт файл процессу слота; тип файла определяется один раз и передаётся процессу."""
+        slot.file_type = self.manager.registry.resolve_type(filepath)
+        slot.budget = self._type_budget(slot.file_type)
+        slot.task = (index, filepath)
+        slot.deadline = time.monotonic() + slot.budget
+        slot.connection.send((index, filepath, slot.file_type))
+
+    def _receive(self, slot, ready):
+        """Забирает результат процесса; при обрыве канала фиксирует аварийное завершение."""
+        try:
+            result, state = slot.connection.recv()
+        except (EOFError, OSError):
+            slot.process.join(1)
+            self.crashed += 1
+            self._kill(slot, ready, f"Worker terminated with exit code {slot.process.exitcode}", "WorkerCrashed")
+            return
+        index, file_data, error = result
+        ready[index] = (slot.task[1], file_data, error)
+        slot.task = None
+        if state is not None:
+            # процесс отработал свою квоту файлов и завершается
+            self.manager.merge_handler_state(state)
+            slot.process.join(5)
+            slot.connection.close()
+            self._spawn(slot)
+
+    def _kill(self, slot, ready, message, error_class, seconds=0.0):
+        """Убивает процесс слота, записывает файл с ошибкой и запускает замену."""
+        index, filepath = slot.task
+        if slot.process.is_alive():
+            slot.process.kill()
+        slot.process.join()
+        slot.connection.close()
+        error_logger.error(f"Error processing {filepath}: {message}")
+        # метрики убитого процесса потеряны, поэтому сбой учитывается здесь
+        handler = self.manager.registry.processors.get(slot.file_type)
+        metrics.REGISTRY.record_error(type(handler).__name__ if handler else "generic", error_class, seconds)
+        ready[index] = (filepath, self._failure_row(filepath, message), None)
+        self._spawn(slot)
+
+    def _failure_row(self, filepath, message):
+        """Строка результата для файла, обработка которого была прервана."""
+        try:
+            row = self.manager.default_handler.get_generic_info(filepath) or {}
+        except Exception:
+            row = {"file_path": os.fspath(filepath)}
+        row["error"] = message
+        return row
+
+    def _shutdown(self, slots):
+        """Завершает процессы пула, собирая состояние обработчиков с простаивающих."""
+        for slot in slots:
+            if slot.task is None and slot.process.is_alive():
+                try:
+                    slot.connection.send(None)
+                    if slot.connection.poll(5):
+                        _, state = slot.connection.recv()
+                        self.manager.merge_handler_state(state)
+                except (EOFError, OSError):
+                    pass
+            if slot.process.is_alive():
+                slot.process.join(1)
+            if slot.process.is_alive():
+                slot.process.kill()
+                slot.process.join()
+            slot.connection.close()
+        if self.timed_out or self.crashed:
+            process_logger.info(f"Sandbox: {self.timed_out} files timed out, {self.crashed} workers crashed")
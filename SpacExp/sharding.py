@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+from .tree_walker import list_directory, ParallelTreeWalker
+from .index_reader import index_columns, iter_index_rows, load_index
+from .metadata_store import IndexWriter, metadata_path
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# единица разбиения для файлов, лежащих непосредственно в корне
+ROOT_FILES = "."
+
+
+def shard_output(output_file, shard_index, shard_count):
+    """Путь к выходному файлу шарда: index.csv → index.shard-2-of-4.csv."""
+    stem, extension = os.path.splitext(output_file)
+    return f"{stem}.shard-{shard_index + 1}-of-{shard_count}{extension}"
+
+
+def stable_hash(name):
+    """Хеш имени, не зависящий от процесса и платформы (в отличие от hash())."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ShardPlan:
+    """
+    Детерминированное разбиение корня на шарды по поддеревьям верхнего уровня.
+
+    Единица разбиения — подкаталог корня целиком (или все файлы, лежащие непосредственно
+    в корне). План сохраняется в JSON и раздаётся узлам, чтобы все они обрабатывали
+    одно и то же разбиение.
+
+    Аргументы:
+        root (str): Корневой каталог.
+        shard_count (int): Количество шардов.
+        assignments (dict): Единица разбиения → номер шарда (с нуля).
+        weights (dict): Единица разбиения → вес по предыдущему проходу.
+    """
+    def __init__(self, root, shard_count, assignments, weights=None):
+        self.root = root
+        self.shard_count = shard_count
+        self.assignments = assignments
+        self.weights = weights or {}
+
+    @classmethod
+    def create(cls, root, shard_count, previous_index=None, weight="files"):
+        """
+        Строит план разбиения.
+
+        Поддеревья, встречавшиеся в предыдущем индексе, распределяются жадно по убыванию веса
+        (каждое — в наименее загруженный шард, LPT); новые поддеревья без истории
+        распределяются по хешу имени. При равенстве весов порядок определяется именем,
+        поэтому один и тот же вход всегда даёт один и тот же план.
+
+        Аргументы:
+            root (str): Корневой каталог.
+            shard_count (int): Количество шардов.
+            previous_index (str, optional): Индекс предыдущего прохода (CSV или Parquet) для весов.
+            weight (str): "files" — вес равен числу файлов, "bytes" — суммарному размеру.
+
+        Возвращает:
+            ShardPlan: План разбиения.
+        """
+        if shard_count < 1:
+            raise ValueError("shard_count must be positive")
+        root = os.path.abspath(root)
+        files, subdirs, error = list_directory(root)
+        if error:
+            raise OSError(f"Failed to list directory {root}: {error}")
+        units = sorted(os.path.basename(subdir) for subdir in subdirs)
+        if files:
+            units.insert(0, ROOT_FILES)
+
+        history = cls.unit_weights(root, previous_index, weight) if previous_index else {}
+        loads = [0] * shard_count
+        assignments = {}
+        known = sorted((unit for unit in units if unit in history), key=lambda unit: (-history[unit], unit))
+        for unit in known:
+            shard = min(range(shard_count), key=lambda index: (loads[index], index))
+            assignments[unit] = shard
+            loads[shard] += history[unit]
+        for unit in units:
+            if unit not in assignments:
+                assignments[unit] = stable_hash(unit) % shard_count
+        weights = {unit: history[unit] for unit in known}
+        return cls(root, shard_count, dict(sorted(assignments.items())), weights)
+
+    @staticmethod
+    def unit_weights(root, index_file, weight="files"):
+        """Считает вес каждой единицы разбиения по строкам предыдущего индекса."""
+        if not os.path.exists(index_file):
+            return {}
+        index = load_index(index_file, columns=["file_path", "file_size"])
+        plan = ShardPlan(root, 1, {})
+        weights = {}
+        for path, size in zip(index["file_path"], index.get("file_size", [0] * len(index))):
+            unit = plan.unit(path) if isinstance(path, str) else None
+            if unit is None:
+                continue
+            value = size if weight == "bytes" else 1
+            weights[unit] = weights.get(unit, 0) + (int(value) if value == value else 0)
+        return weights
+
+    def units(self, shard_index):
+        """Единицы разбиения, назначенные шарду."""
+        return [unit for unit, shard in self.assignments.items() if shard == shard_index]
+
+    def unit(self, path):
+        """Единица разбиения, к которой относится путь внутри корня, или None для путей вне корня."""
+        prefix = os.path.join(self.root, "")
+        if not path.startswith(prefix):
+            return None
+        relative = path[len(prefix):]
+        return relative.split(os.sep, 1)[0] if os.sep in relative else ROOT_FILES
+
+    def shard_of(self, unit):
+        """
+        Номер шарда единицы разбиения.
+
+        Единицы, появившиеся после построения плана, распределяются по хешу имени,
+        как новые поддеревья в create(), поэтому все узлы назначают их одинаково.
+        """
+        shard = self.assignments.get(unit)
+        return shard if shard is not None else stable_hash(unit) % self.shard_count
+
+    def owns(self, path, shard_index):
+        """Проверяет, относится ли файл к поддеревьям шарда shard_index."""
+        unit = self.unit(path)
+        return unit is not None and self.shard_of(unit) == shard_index
+
+    def iter_entries(self, shard_index, walker=None):
+        """
+        Генерирует FileEntry всех файлов шарда.
+
+        Корень читается заново при каждом вызове: единицы, которых не было при построении
+        плана, назначаются по shard_of, а исчезнувшие пропускаются.
+
+        Аргументы:
+            shard_index (int): Номер шарда (с нуля).
+            walker (ParallelTreeWalker, optional): Обходчик поддеревьев.
+        """
+        walker = walker or ParallelTreeWalker()
+        files, subdirs, error = list_directory(self.root)
+        if error:
+            error_logger.error(f"Failed to list directory {self.root}: {error}")
+            return
+        units = sorted(os.path.basename(subdir) for subdir in subdirs)
+        if files:
+            units.insert(0, ROOT_FILES)
+        unplanned = [unit for unit in units if unit not in self.assignments and self.shard_of(unit) == shard_index]
+        if unplanned:
+            process_logger.info(f"Shard {shard_index + 1}: {len(unplanned)} units not in the plan assigned by hash: "
+                                f"{', '.join(unplanned)}")
+        for unit in units:
+            if self.shard_of(unit) != shard_index:
+                continue
+            if unit == ROOT_FILES:
+                yield from files
+            else:
+                yield from walker.walk(os.path.join(self.root, unit))
+
+    def loads(self):
+        """Суммарный вес каждого шарда по предыдущему проходу."""
+        loads = [0] * self.shard_count
+        for unit, weight in self.weights.items():
+            loads[self.assignments[unit]] += weight
+        return loads
+
+    def save(self, path):
+        """Сохраняет план в JSON."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"root": self.root, "shard_count": self.shard_count,
+                       "assignments": self.assignments, "weights": self.weights}, file, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """Загружает план из JSON."""
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        return cls(data["root"], data["shard_count"], data["assignments"], data.get("weights"))
+
+
+def merge_shards(shard_files, output_file, output_format=None, allow_missing=False):
+    """
+    Объединяет индексы шардов в один индекс с общей схемой.
+
+    Колонки итогового индекса — объединение колонок всех шардов в порядке первого
+    появления; строки копируются потоково, в порядке шардов. Таблицы метаданных
+    шардов склеиваются: идентификаторы файлов стабильны, перенумерация не нужна.
+
+    Аргументы:
+        shard_files (list): Пути к индексам шардов (CSV или Parquet, форматы можно смешивать).
+        output_file (str): Путь к итоговому индексу.
+        output_format (str, optional): "csv" или "parquet"; по умолчанию по расширению output_file.
+        allow_missing (bool): Пропускать отсутствующие файлы (шард без файлов не создаёт индекс).
+
+    Возвращает:
+        int: Количество строк в итоговом индексе.
+    """
+    missing = [path for path in shard_files if not os.path.exists(path)]
+    if missing and not allow_missing:
+        raise FileNotFoundError(f"Shard outputs not found: {', '.join(missing)}")
+    for path in missing:
+        error_logger.error(f"Shard output not found, skipping: {path}")
+    shard_files = [path for path in shard_files if path not in missing]
+    columns = list(dict.fromkeys(column for path in shard_files for column in index_columns(path)))
+    with IndexWriter(output_file, output_format) as writer:
+        for path in shard_files:
+            for row in iter_index_rows(path):
+                writer.write({column: row.get(column) for column in columns})
+        for path in shard_files:
+            if os.path.exists(metadata_path(path)):
+                writer.copy_metadata(metadata_path(path))
+    process_logger.info(f"Merged {len(shard_files)} shards into {output_file}: {writer.rows_written} rows")
+    return writer.rows_written
+
+
+def main(argv=None):
+    """
+    Командная строка шардированной индексации:
+
+        python -m SpacExp.sharding plan ROOT -n 4 -o plan.json [--previous index.csv]
+        python -m SpacExp.sharding run plan.json SHARD -o index.csv
+        python -m SpacExp.sharding merge plan.json -o index.csv
+    """
+    parser = argparse.ArgumentParser(prog="python -m SpacExp.sharding", description="Sharded indexing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = commands.add_parser("plan", help="partition a root into shards")
+    plan_parser.add_argument("root")
+    plan_parser.add_argument("-n", "--shards", type=int, required=True)
+    plan_parser.add_argument("-o", "--output", required=True, help="plan file (JSON)")
+    plan_parser.add_argument("--previous", help="index of the previous run used to balance shards")
+    plan_parser.add_argument("--weight", choices=("files", "bytes"), default="files")
+
+    run_parser = commands.add_parser("run", help="index one shard")
+    run_parser.add_argument("plan")
+    run_parser.add_argument("shard", type=int, help="shard number, starting from 1")
+    run_parser.add_argument("-o", "--output", required=True, help="merged index path; the shard suffix is added")
+    run_parser.add_argument("-w", "--workers", type=int, default=1)
+
+    merge_parser = commands.add_parser("merge", help="merge shard outputs")
+    merge_parser.add_argument("plan")
+    merge_parser.add_argument("-o", "--output", required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "plan":
+        plan = ShardPlan.create(args.root, args.shards, args.previous, args.weight)
+        plan.save(args.output)
+        process_logger.info(f"Shard plan saved to {args.output}: loads {plan.loads()}")
+    elif args.command == "run":
+        from .file_manager import FileManager
+        plan = ShardPlan.load(args.plan)
+        if not 1 <= args.shard <= plan.shard_count:
+            parser.error(f"shard must be between 1 and {plan.shard_count}")
+        output_file = shard_output(os.path.abspath(args.output), args.shard - 1, plan.shard_count)
+        FileManager(plan.root, output_file, workers=args.workers, shard_plan=plan, shard_index=args.shard - 1).run()
+    else:
+        plan = ShardPlan.load(args.plan)
+        output_file = os.path.abspath(args.output)
+        merge_shards([shard_output(output_file, index, plan.shard_count) for index in range(plan.shard_count)],
+                     output_file, allow_missing=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import os
+from fnmatch import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .base_processor import FileEntry
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# количество потоков обхода по умолчанию
+DEFAULT_WALK_THREADS = 8
+
+
+def list_directory(path, follow_symlinks=False):
+    """
+    Читает содержимое одного каталога.
+
+    stat для файлов выполняется здесь же, в потоке обхода, чтобы задержка
+    сетевой файловой системы перекрывалась с чтением других каталогов.
+
+    Аргументы:
+        path (str): Путь к каталогу.
+        follow_symlinks (bool): Переходить ли по символическим ссылкам на каталоги.
+
+    Возвращает:
+        tuple: (список FileEntry файлов, список путей вложенных каталогов, текст ошибки или None).
+    """
+    try:
+        with os.scandir(path) as iterator:
+            dir_entries = list(iterator)
+    except OSError as e:
+        return [], [], str(e)
+    files = []
+    subdirs = []
+    for dir_entry in dir_entries:
+        try:
+            is_dir = dir_entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # как и os.walk, по умолчанию не переходим по символическим ссылкам на каталоги
+            if follow_symlinks or not dir_entry.is_symlink():
+                subdirs.append(dir_entry.path)
+        else:
+            files.append(FileEntry.from_dir_entry(dir_entry))
+    return files, subdirs, None
+
+
+class ParallelTreeWalker:
+    """
+    Многопоточный обход дерева каталогов.
+
+    Каталоги читаются пулом потоков (os.scandir отпускает GIL), так что на сетевых
+    файловых системах (SMB/NFS) запросы к разным каталогам выполняются одновременно,
+    а не последовательно. Одновременно запрошено и удерживается в памяти не более
+    max_pending прочитанных каталогов, поэтому медленный потребитель не приводит
+    к накоплению всего дерева в памяти.
+
+    В режиме depth_first файлы выдаются в том же порядке, что и при os.walk
+    (сначала файлы каталога, затем вложенные каталоги по порядку): потоки читают
+    каталоги с опережением, но выдача идёт строго по порядку обхода. Без него
+    каталоги выдаются по мере готовности, что быстрее при сильно различающихся задержках.
+
+    Аргументы:
+        threads (int): Количество потоков обхода.
+        max_pending (int): Сколько каталогов может быть запрошено или прочитано, но ещё не выдано.
+        depth_first (bool): Выдавать файлы в детерминированном порядке os.walk.
+        follow_symlinks (bool): Переходить ли по символическим ссылкам на каталоги.
+    """
+    def __init__(self, threads=DEFAULT_WALK_THREADS, max_pending=None, depth_first=True, follow_symlinks=False):
+        self.threads = max(1, int(threads or 1))
+        self.max_pending = max_pending or self.threads * 4
+        self.depth_first = depth_first
+        self.follow_symlinks = follow_symlinks
+
+    def walk(self, root):
+        """
+        Обходит дерево и генерирует записи FileEntry для всех файлов.
+
+        Аргументы:
+            root (str): Корневой каталог.
+
+        Возвращает:
+            generator: FileEntry для каждого файла.
+        """
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="tree-walker") as pool:
+            if self.depth_first:
+                yield from self._walk_ordered(pool, root)
+            else:
+                yield from self._walk_unordered(pool, root)
+
+    def _submit(self, pool, path):
+        return pool.submit(list_directory, path, self.follow_symlinks)
+
+    def _listing(self, path, future):
+        """Возвращает результат чтения каталога, записывая ошибку в лог."""
+        files, subdirs, error = future.result()
+        if error:
+            error_logger.error(f"Failed to list directory {path}: {error}")
+        return files, subdirs
+
+    def _walk_ordered(self, pool, root):
+        # стек элементов [путь, future]; future создаётся, только пока в полёте меньше max_pending каталогов
+        stack = [[root, self._submit(pool, root)]]
+        while stack:
+            path, future = stack.pop()
+            files, subdirs = self._listing(path, future)
+            yield from files
+            stack.extend([subdir, None] for subdir in reversed(subdirs))
+            # запрашиваем с опережением каталоги, которые будут выданы следующими
+            in_flight = 0
+            for item in reversed(stack):
+                if in_flight >= self.max_pending:
+                    break
+                if item[1] is None:
+                    item[1] = self._submit(pool, item[0])
+                in_flight += 1
+
+    def _walk_unordered(self, pool, root):
+        waiting = deque([root])
+        in_flight = {}
+        while waiting or in_flight:
+            while waiting and len(in_flight) < self.max_pending:
+                path = waiting.popleft()
+                in_flight[self._submit(pool, path)] = path
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = self._listing(in_flight.pop(future), future)
+                waiting.extend(subdirs)
+                yield from files
+
+
+def matches(path, root, patterns):
+    """
+    Проверяет, подходит ли файл под один из шаблонов fnmatch.
+
+    Шаблон сравнивается с именем файла ("*.pdf") и с путём относительно root
+    через "/" ("archive/*", "*/node_modules/*").
+
+    Аргументы:
+        path (str): Путь к файлу.
+        root (str): Корень обхода.
+        patterns (list): Шаблоны.
+    """
+    name = os.path.basename(path)
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    return any(fnmatch(name, pattern) or fnmatch(relative, pattern) for pattern in patterns)
+
+
+def filter_entries(entries, root, include=None, exclude=None):
+    """
+    Отбирает записи обхода по шаблонам.
+
+    Аргументы:
+        entries (iterable): FileEntry.
+        root (str): Корень обхода (для относительных путей в шаблонах).
+        include (list, optional): Оставить только файлы, подходящие под один из шаблонов.
+        exclude (list, optional): Пропустить файлы, подходящие под один из шаблонов.
+
+    Возвращает:
+        iterable: Отобранные записи (entries без изменений, если шаблоны не заданы);
+            close() отобранных записей закрывает и entries.
+    """
+    if not include and not exclude:
+        return entries
+
+    def selected():
+        try:
+            for entry in entries:
+                if (not include or matches(entry.path, root, include)) \
+                        and not (exclude and matches(entry.path, root, exclude)):
+                    yield entry
+        finally:
+            close = getattr(entries, "close", None)
+            if close is not None:
+                close()
+
+    return selected()
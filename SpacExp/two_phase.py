@@ -0,0 +1,236 @@
+import os
+import time
+import heapq
+import sqlite3
+import threading
+
+from .base_processor import FileEntry
+from .metadata_store import IndexPatch, compact_index
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def _size(entry):
+    stats = entry.get_stat()
+    return stats.st_size if stats else 0
+
+
+def _mtime(entry):
+    stats = entry.get_stat()
+    return stats.st_mtime if stats else 0
+
+
+# готовые порядки второй фазы: ключ сортировки по (тип файла, FileEntry), меньший — раньше
+PRIORITIES = {
+    "smallest": lambda file_type, entry: _size(entry),
+    "largest": lambda file_type, entry: -_size(entry),
+    "newest": lambda file_type, entry: -_mtime(entry),
+    "path": lambda file_type, entry: entry.path,
+}
+
+# сколько отложенных файлов хранится в памяти, прежде чем очередь начинает вытеснять их на диск
+MAX_DEFERRED_IN_MEMORY = 100000
+
+
+class DeferredQueue:
+    """
+    Очередь отложенных файлов второй фазы с приоритетом и ограниченной памятью.
+
+    Первые max_memory записей хранятся в куче в памяти вместе с FileEntry; остальные
+    вытесняются во временную базу SQLite (путь и ключ сортировки), которая удаляется
+    при закрытии. Выдаётся наименьшая запись из кучи и базы, так что порядок тот же,
+    что и у одной кучи, а память не зависит от размера дерева.
+
+    Аргументы:
+        max_memory (int): Сколько записей хранится в памяти.
+    """
+    def __init__(self, max_memory=MAX_DEFERRED_IN_MEMORY):
+        self.max_memory = max_memory
+        self._heap = []
+        self._spill = None
+        self._spilled = 0
+        self._count = 0
+
+    def push(self, key, entry):
+        """Добавляет файл с ключом сортировки key (число или строка)."""
+        if len(self._heap) < self.max_memory:
+            heapq.heappush(self._heap, (0, key, self._count, entry))
+        else:
+            if self._spill is None:
+                # пустое имя — временная база SQLite, удаляемая при закрытии соединения
+                self._spill = sqlite3.connect("", check_same_thread=False)
+                self._spill.execute("CREATE TABLE deferred (rank INTEGER, key, seq INTEGER PRIMARY KEY, path TEXT)")
+                self._spill.execute("CREATE INDEX deferred_order ON deferred (rank, key, seq)")
+            self._spill.execute("INSERT INTO deferred VALUES (0, ?, ?, ?)", (key, self._count, entry.path))
+            self._spilled += 1
+        self._count += 1
+
+    def pop(self):
+        """Возвращает FileEntry с наименьшим ключом или None, если очередь пуста."""
+        spilled = None
+        if self._spilled:
+            spilled = self._spill.execute(
+                "SELECT rank, key, seq, path FROM deferred ORDER BY rank, key, seq LIMIT 1"
+            ).fetchone()
+        if self._heap and (spilled is None or self._heap[0][:3] <= spilled[:3]):
+            return heapq.heappop(self._heap)[3]
+        if spilled is None:
+            return None
+        self._spill.execute("DELETE FROM deferred WHERE seq = ?", (spilled[2],))
+        self._spilled -= 1
+        return FileEntry(spilled[3])
+
+    def prioritize(self, prefix):
+        """Переносит файлы с путями, начинающимися с prefix, в начало очереди."""
+        self._heap = [(0 if entry.path.startswith(prefix) else 1, key, index, entry)
+                      for _, key, index, entry in self._heap]
+        heapq.heapify(self._heap)
+        if self._spilled:
+            self._spill.execute("UPDATE deferred SET rank = CASE WHEN substr(path, 1, ?) = ? THEN 0 ELSE 1 END",
+                                (len(prefix), prefix))
+
+    def __len__(self):
+        return len(self._heap) + self._spilled
+
+    def close(self):
+        """Освобождает очередь и удаляет временную базу."""
+        self._heap = []
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            self._spilled = 0
+
+
+class TwoPhaseScan:
+    """
+    Двухфазная индексация.
+
+    Первая фаза обходит дерево и сразу записывает индекс из общей информации
+    (get_generic_info: размер, даты, расширение) — статистика по размерам и расширениям
+    доступна, как только закончен обход. Вторая фаза в фоновом потоке запускает
+    обработчики (страницы PDF, длительность, EXIF, листы Excel) для файлов,
+    у которых есть обработчик, в порядке приоритета. Готовые строки пакетами записываются
+    в таблицу изменений индекса (IndexPatch), которая видна при чтении через load_index,
+    и вливаются в индекс одним проходом после завершения фазы.
+
+    Аргументы:
+        manager (FileManager): Менеджер с директорией, выходным файлом, обработчиками и движком выполнения.
+        priority (str | callable): Имя порядка из PRIORITIES или функция key(file_type, entry),
+            возвращающая число или строку.
+        batch_size (int): Сколько обработанных файлов накапливается перед записью в таблицу изменений.
+        flush_interval (float): Максимальный интервал (секунды) между записями в таблицу изменений.
+        max_deferred (int): Сколько отложенных файлов хранится в памяти (см. DeferredQueue).
+    """
+    def __init__(self, manager, priority="smallest", batch_size=5000, flush_interval=30.0,
+                 max_deferred=MAX_DEFERRED_IN_MEMORY):
+        self.manager = manager
+        self.key = PRIORITIES[priority] if isinstance(priority, str) else priority
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.total = 0
+        self.deferred = 0
+        self.processed = 0
+        self._queue = DeferredQueue(max_deferred)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_phase_one(self):
+        """
+        Обходит дерево и записывает индекс из общей информации о файлах.
+
+        Возвращает:
+            int: Количество файлов в индексе.
+        """
+        started = time.time()
+        output_file = self.manager.resolve_output_file()
+        self._queue.close()
+        self.manager.save_results(self._generic_rows(), output_file, self.manager.output_format)
+        self.deferred = len(self._queue)
+        process_logger.info(
+            f"Phase one: {self.total} files indexed in {time.time() - started:.2f} seconds, "
+            f"{self.deferred} deferred for extraction"
+        )
+        return self.total
+
+    def _generic_rows(self):
+        for entry in self.manager.get_entries():
+            try:
+                row = self.manager.default_handler.get_generic_info(entry)
+            except Exception as e:
+                error_logger.error(f"Failed to get info for file {entry.path}: {e}")
+                continue
+            if not row:
+                continue
+            file_type = self.manager.registry.resolve_type(entry)
+            if file_type is not None:
+                self._queue.push(self.key(file_type, entry), entry)
+            self.total += 1
+            yield row
+
+    def start(self):
+        """Запускает вторую фазу в фоновом потоке."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_phase_two, name="two-phase-extraction", daemon=True)
+        self._thread.start()
+        return self
+
+    def run_phase_two(self):
+        """
+        Обрабатывает отложенные файлы в порядке приоритета.
+
+        Строки пакетами записываются в таблицу изменений; по завершении (или остановке)
+        она вливается в индекс одним потоковым проходом.
+        """
+        started = time.time()
+        rows = {}
+        last_flush = time.monotonic()
+        with IndexPatch(self.manager.output_file) as patch:
+            for filepath, file_data in self.manager.iter_processed(self._next_entries()):
+                self.processed += 1
+                if file_data:
+                    rows[os.fspath(filepath)] = file_data
+                if len(rows) >= self.batch_size or (rows and time.monotonic() - last_flush >= self.flush_interval):
+                    patch.record(rows)
+                    rows = {}
+                    last_flush = time.monotonic()
+            patch.record(rows)
+        with self._lock:
+            self._queue.close()
+        compact_index(self.manager.output_file, self.manager.output_format)
+        process_logger.info(f"Phase two: {self.processed} files processed in {time.time() - started:.2f} seconds")
+
+    def _next_entries(self):
+        while not self._stop.is_set():
+            with self._lock:
+                entry = self._queue.pop()
+            if entry is None:
+                return
+            yield entry
+
+    def prioritize(self, directory):
+        """
+        Переносит ещё не обработанные файлы из directory в начало очереди второй фазы.
+
+        Аргументы:
+            directory (str): Каталог, метаданные которого нужны в первую очередь.
+        """
+        prefix = os.path.join(os.path.abspath(directory), "")
+        with self._lock:
+            self._queue.prioritize(prefix)
+
+    def progress(self):
+        """Возвращает пару (обработано во второй фазе, всего отложено)."""
+        return self.processed, self.deferred
+
+    def wait(self, timeout=None):
+        """Ожидает завершения второй фазы; возвращает True, если она завершена."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def stop(self):
+        """Останавливает вторую фазу; уже обработанные файлы записываются в индекс."""
+        self._stop.set()
+        return self.wait()
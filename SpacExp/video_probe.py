@@ -0,0 +1,321 @@
+# video_probe.py
+import os
+import struct
+
+# сколько байт заголовков разрешено прочитать из одного файла; остальное пропускается через seek
+MAX_PROBE_BYTES = 4 * 1024 * 1024
+
+# атомы MP4/MOV, с которых может начинаться файл
+_MP4_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot"}
+
+# идентификаторы элементов EBML (Matroska, WebM)
+_EBML = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_TYPE = 0x83
+_DEFAULT_DURATION = 0x23E383
+_VIDEO = 0xE0
+_PIXEL_WIDTH = 0xB0
+_PIXEL_HEIGHT = 0xBA
+_CLUSTER = 0x1F43B675
+# размер элемента EBML «неизвестен» (все единицы)
+_UNKNOWN_SIZE = object()
+
+
+class VideoProbeError(ValueError):
+    """Контейнер не распознан, повреждён или не содержит нужных заголовков."""
+
+
+class _BoundedReader:
+    """Чтение файла с ограничением на общее число прочитанных байт."""
+    def __init__(self, file, size, budget=MAX_PROBE_BYTES):
+        self.file = file
+        self.size = size
+        self.budget = budget
+
+    def read_at(self, offset, length):
+        if length > self.budget:
+            raise VideoProbeError("Header read budget exceeded")
+        self.budget -= length
+        self.file.seek(offset)
+        data = self.file.read(length)
+        if len(data) < length:
+            raise VideoProbeError(f"Unexpected end of file at {offset}")
+        return data
+
+
+def _result(frame_count, fps, duration, width, height):
+    if not width or not height or duration is None:
+        raise VideoProbeError("Incomplete video headers")
+    if frame_count is None and fps:
+        frame_count = int(round(duration * fps))
+    if fps is None and frame_count and duration:
+        fps = frame_count / duration
+    return {"frame_count": frame_count, "fps": fps, "duration": duration, "width": width, "height": height}
+
+
+# MP4 / MOV (ISO base media file format)
+
+def _atoms(reader, start, end):
+    """Генерирует атомы (тип, начало данных, конец) в диапазоне [start, end)."""
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack(">I4s", reader.read_at(offset, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", reader.read_at(offset + 8, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            raise VideoProbeError(f"Bad atom {kind!r} at {offset}")
+        yield kind, offset + header, offset + size
+        offset += size
+
+
+def _child(reader, parent, kind):
+    if parent is None:
+        return None
+    for child_kind, start, end in _atoms(reader, parent[0], parent[1]):
+        if child_kind == kind:
+            return start, end
+    return None
+
+
+def _path(reader, parent, *kinds):
+    for kind in kinds:
+        parent = _child(reader, parent, kind)
+    return parent
+
+
+def _media_header(reader, atom):
+    """Масштаб времени и длительность из mvhd или mdhd."""
+    version = reader.read_at(atom[0], 1)[0]
+    if version == 1:
+        timescale, duration = struct.unpack(">IQ", reader.read_at(atom[0] + 20, 12))
+    else:
+        timescale, duration = struct.unpack(">II", reader.read_at(atom[0] + 12, 8))
+    return timescale, duration
+
+
+def _sample_count(reader, stbl):
+    """Количество кадров дорожки: из заголовка stsz/stz2, иначе сумма записей stts."""
+    for kind in (b"stsz", b"stz2"):
+        atom = _child(reader, stbl, kind)
+        if atom is not None:
+            return struct.unpack(">I", reader.read_at(atom[0] + 8, 4))[0]
+    stts = _child(reader, stbl, b"stts")
+    if stts is None:
+        return None
+    entries = struct.unpack(">I", reader.read_at(stts[0] + 4, 4))[0]
+    data = reader.read_at(stts[0] + 8, entries * 8)
+    return sum(count for count, _ in struct.iter_unpack(">II", data))
+
+
+def _probe_mp4(reader):
+    moov = _child(reader, (0, reader.size), b"moov")
+    if moov is None:
+        raise VideoProbeError("moov atom not found")
+    mvhd = _child(reader, moov, b"mvhd")
+    movie_timescale, movie_duration = _media_header(reader, mvhd) if mvhd else (0, 0)
+    for kind, start, end in _atoms(reader, *moov):
+        if kind != b"trak":
+            continue
+        trak = (start, end)
+        hdlr = _path(reader, trak, b"mdia", b"hdlr")
+        if hdlr is None or reader.read_at(hdlr[0] + 8, 4) != b"vide":
+            continue
+        stbl = _path(reader, trak, b"mdia", b"minf", b"stbl")
+        width = height = None
+        stsd = _child(reader, stbl, b"stsd")
+        if stsd is not None and stsd[1] - stsd[0] >= 44:
+            # кодированный размер из первой записи визуального описания
+            width, height = struct.unpack(">HH", reader.read_at(stsd[0] + 40, 4))
+        if not width or not height:
+            tkhd = _child(reader, trak, b"tkhd")
+            if tkhd is not None:
+                offset = tkhd[0] + (88 if reader.read_at(tkhd[0], 1)[0] == 1 else 76)
+                fixed_width, fixed_height = struct.unpack(">II", reader.read_at(offset, 8))
+                width, height = fixed_width >> 16, fixed_height >> 16
+        mdhd = _path(reader, trak, b"mdia", b"mdhd")
+        timescale, track_duration = _media_header(reader, mdhd) if mdhd else (0, 0)
+        frame_count = _sample_count(reader, stbl) if stbl else None
+        if movie_timescale and movie_duration:
+            duration = movie_duration / movie_timescale
+        elif timescale and track_duration:
+            duration = track_duration / timescale
+        else:
+            duration = None
+        fps = frame_count / (track_duration / timescale) if frame_count and timescale and track_duration else None
+        if not frame_count:
+            # фрагментированный MP4: кадры описаны во фрагментах, а не в moov
+            raise VideoProbeError("No samples in moov")
+        return _result(frame_count, fps, duration, width, height)
+    raise VideoProbeError("No video track")
+
+
+# Matroska / WebM
+
+def _vint(reader, offset, keep_marker):
+    first = reader.read_at(offset, 1)[0]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise VideoProbeError(f"Bad EBML number at {offset}")
+    data = reader.read_at(offset, length)
+    value = int.from_bytes(data, "big")
+    if not keep_marker:
+        value &= (1 << (7 * length)) - 1
+        if value == (1 << (7 * length)) - 1:
+            value = _UNKNOWN_SIZE
+    return value, length
+
+
+def _elements(reader, start, end):
+    """Генерирует элементы EBML (идентификатор, начало данных, конец) в диапазоне [start, end)."""
+    offset = start
+    while offset < end:
+        element_id, id_length = _vint(reader, offset, keep_marker=True)
+        size, size_length = _vint(reader, offset + id_length, keep_marker=False)
+        data_start = offset + id_length + size_length
+        data_end = end if size is _UNKNOWN_SIZE else data_start + size
+        yield element_id, data_start, min(data_end, end)
+        if size is _UNKNOWN_SIZE:
+            return
+        offset = data_end
+
+
+def _ebml_uint(reader, start, end):
+    return int.from_bytes(reader.read_at(start, end - start), "big") if end > start else 0
+
+
+def _ebml_float(reader, start, end):
+    if end - start == 4:
+        return struct.unpack(">f", reader.read_at(start, 4))[0]
+    if end - start == 8:
+        return struct.unpack(">d", reader.read_at(start, 8))[0]
+    return 0.0
+
+
+def _probe_matroska(reader):
+    segment = next(((start, end) for element_id, start, end in _elements(reader, 0, reader.size)
+                    if element_id == _SEGMENT), None)
+    if segment is None:
+        raise VideoProbeError("Segment not found")
+    timecode_scale, duration = 1000000, None
+    width = height = frame_duration = None
+    for element_id, start, end in _elements(reader, *segment):
+        if element_id == _INFO:
+            for child_id, child_start, child_end in _elements(reader, start, end):
+                if child_id == _TIMECODE_SCALE:
+                    timecode_scale = _ebml_uint(reader, child_start, child_end)
+                elif child_id == _DURATION:
+                    duration = _ebml_float(reader, child_start, child_end)
+        elif element_id == _TRACKS:
+            for track_id, track_start, track_end in _elements(reader, start, end):
+                if track_id != _TRACK_ENTRY:
+                    continue
+                track = {child_id: (child_start, child_end)
+                         for child_id, child_start, child_end in _elements(reader, track_start, track_end)}
+                if _TRACK_TYPE not in track or _ebml_uint(reader, *track[_TRACK_TYPE]) != 1 or _VIDEO not in track:
+                    continue
+                for video_id, video_start, video_end in _elements(reader, *track[_VIDEO]):
+                    if video_id == _PIXEL_WIDTH:
+                        width = _ebml_uint(reader, video_start, video_end)
+                    elif video_id == _PIXEL_HEIGHT:
+                        height = _ebml_uint(reader, video_start, video_end)
+                if _DEFAULT_DURATION in track:
+                    frame_duration = _ebml_uint(reader, *track[_DEFAULT_DURATION])
+                break
+        elif element_id == _CLUSTER:
+            # Info и Tracks записываются перед данными
+            break
+    if duration is not None:
+        duration = duration * timecode_scale / 1e9
+    fps = 1e9 / frame_duration if frame_duration else None
+    return _result(None, fps, duration, width, height)
+
+
+# AVI (RIFF)
+
+def _chunks(reader, start, end):
+    """Генерирует блоки RIFF (идентификатор, тип списка или None, начало данных, конец)."""
+    offset = start
+    while offset + 8 <= end:
+        fourcc, size = struct.unpack("<4sI", reader.read_at(offset, 8))
+        data_start = offset + 8
+        data_end = min(data_start + size, end)
+        if fourcc in (b"LIST", b"RIFF"):
+            yield fourcc, reader.read_at(data_start, 4), data_start + 4, data_end
+        else:
+            yield fourcc, None, data_start, data_end
+        offset = data_start + size + (size & 1)
+
+
+def _probe_avi(reader):
+    hdrl = next(((start, end) for fourcc, kind, start, end in _chunks(reader, 12, reader.size)
+                 if fourcc == b"LIST" and kind == b"hdrl"), None)
+    if hdrl is None:
+        raise VideoProbeError("hdrl list not found")
+    width = height = total_frames = micro_seconds = None
+    frame_count = fps = None
+    for fourcc, kind, start, end in _chunks(reader, *hdrl):
+        if fourcc == b"avih" and end - start >= 40:
+            micro_seconds, _, _, _, total_frames, _, _, _, width, height = struct.unpack(
+                "<10I", reader.read_at(start, 40))
+        elif fourcc == b"LIST" and kind == b"strl" and frame_count is None:
+            strh = next(((s, e) for c, _, s, e in _chunks(reader, start, end) if c == b"strh"), None)
+            if strh is None or strh[1] - strh[0] < 36:
+                continue
+            header = reader.read_at(strh[0], 36)
+            if header[:4] != b"vids":
+                continue
+            scale, rate, _, length = struct.unpack("<4I", header[20:36])
+            frame_count = length
+            fps = rate / scale if scale and rate else None
+    if frame_count is None:
+        frame_count = total_frames
+    if fps is None and micro_seconds:
+        fps = 1e6 / micro_seconds
+    duration = frame_count / fps if frame_count is not None and fps else None
+    return _result(frame_count, fps, duration, width, height)
+
+
+def probe_video(filepath, budget=MAX_PROBE_BYTES):
+    """
+    Читает длительность, частоту кадров, количество кадров и размер кадра из заголовков контейнера.
+
+    Поддерживаются MP4/MOV (атомы moov/mvhd/trak), Matroska/WebM (Info и Tracks сегмента EBML)
+    и AVI (hdrl/avih/strh). Читаются только заголовки (обычно несколько КБ), данные пропускаются
+    через seek, кодек не инициализируется.
+
+    Аргументы:
+        filepath (str | PathLike): Путь к видеофайлу.
+        budget (int): Максимальное число байт заголовков, которое разрешено прочитать.
+
+    Возвращает:
+        dict: {"frame_count", "fps", "duration", "width", "height"}; frame_count и fps равны None,
+            если контейнер их не хранит (например, Matroska с переменной частотой кадров).
+
+    Исключения:
+        VideoProbeError: Контейнер не поддерживается или заголовки повреждены либо неполны.
+    """
+    with open(filepath, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        reader = _BoundedReader(file, size, budget)
+        head = reader.read_at(0, 12) if size >= 12 else b""
+        try:
+            if head[4:8] in _MP4_TOP_LEVEL:
+                return _probe_mp4(reader)
+            if head[:4] == _EBML.to_bytes(4, "big"):
+                return _probe_matroska(reader)
+            if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+                return _probe_avi(reader)
+        except (struct.error, ZeroDivisionError, OverflowError) as e:
+            raise VideoProbeError(f"{type(e).__name__}: {e}") from e
+    raise VideoProbeError("Unsupported container")
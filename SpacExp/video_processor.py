@@ -1,12 +1,60 @@
 import cv2
 from .base_processor import FileProcessor
 import time, os
-from .logging_config import setup_logging
+from .video_probe import probe_video, VideoProbeError
+from .logging_config import setup_logging, file_logger
 
 # логгирование
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 process_logger, error_logger = setup_logging(project_root)
 
+
+def read_video_info(filepath):
+    """
+    Возвращает параметры видео: количество кадров, частоту кадров, длительность и размеры.
+
+    Параметры читаются из заголовков контейнера (video_probe); cv2.VideoCapture открывается,
+    только если контейнер не поддерживается или его заголовки повреждены.
+
+    Args:
+        filepath (str): Путь к видеофайлу.
+
+    Returns:
+        dict: video_frame_count, video_fps, video_duration, video_width, video_height.
+    """
+    try:
+        info = probe_video(filepath)
+    except VideoProbeError as e:
+        process_logger.debug(f"Falling back to OpenCV for {filepath}: {e}")
+        info = _capture_info(filepath)
+    return {
+        "video_frame_count": info["frame_count"],
+        "video_fps": info["fps"],
+        "video_duration": info["duration"],
+        "video_width": info["width"],
+        "video_height": info["height"],
+    }
+
+
+def _capture_info(filepath):
+    """Параметры видео через cv2.VideoCapture; захват всегда освобождается."""
+    video = cv2.VideoCapture(filepath)
+    try:
+        if not video.isOpened():
+            raise ValueError(f"Cannot open video {filepath}")
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = video.get(cv2.CAP_PROP_FPS)
+        return {
+            "frame_count": frame_count,
+            "fps": fps,
+            # при нулевой частоте кадров длительность неизвестна
+            "duration": frame_count / fps if fps > 0 else None,
+            "width": int(video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        video.release()
+
 class VideoProcessor(FileProcessor):
     """
     Класс для обработки видеофайлов.
@@ -38,29 +86,17 @@ class VideoProcessor(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
-            video = cv2.VideoCapture(filepath)
-            duration = video.get(cv2.CAP_PROP_FRAME_COUNT) / video.get(cv2.CAP_PROP_FPS)
-            frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = video.get(cv2.CAP_PROP_FPS)
-            width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-            file_info.update({
-                "video_frame_count": frame_count,
-                "video_fps": fps,
-                "video_duration": duration,
-                "video_width": width,
-                "video_height": height,
-            })
+            file_info.update(read_video_info(filepath))
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Video processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Video processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing video {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
 
 
 
@@ -95,26 +131,14 @@ class VideoProcessorWeb(FileProcessor):
         try:
             start_time = time.time()
             file_info = self.get_generic_info(filepath)
+            filepath = os.fspath(filepath)
 
-            video = cv2.VideoCapture(filepath)
-            duration = video.get(cv2.CAP_PROP_FRAME_COUNT) / video.get(cv2.CAP_PROP_FPS)
-            frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = video.get(cv2.CAP_PROP_FPS)
-            width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-            file_info.update({
-                "video_frame_count": frame_count,
-                "video_fps": fps,
-                "video_duration": duration,
-                "video_width": width,
-                "video_height": height,
-            })
+            file_info.update(read_video_info(filepath))
 
             elapsed_time = time.time() - start_time
-            process_logger.info(f"Video processed: {filepath} in {elapsed_time:.2f} seconds")
+            file_logger.info("Video processed: %s in %.2f seconds", filepath, elapsed_time)
 
             return file_info
         except Exception as e:
             error_logger.error(f"Error processing video {filepath}: {e}")
-            return {"error": str(e)}
+            return self.error_info(e)
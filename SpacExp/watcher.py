@@ -0,0 +1,350 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from .base_processor import FileEntry
+from .tree_walker import ParallelTreeWalker
+from .metadata_store import COMPACT_THRESHOLD, IndexPatch, compact_index
+from .logging_config import setup_logging
+process_logger, error_logger = setup_logging(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# флаги inotify (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# виды изменений, которые сообщают источники событий
+MODIFIED = "modified"
+REMOVED = "removed"
+CREATED_DIR = "created_dir"
+REMOVED_DIR = "removed_dir"
+
+
+def _load_libc():
+    """Загружает libc с функциями inotify или возвращает None."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+class InotifyWatcher:
+    """
+    Источник событий файловой системы на основе Linux inotify (через ctypes).
+
+    Наблюдение устанавливается на каждый каталог дерева; новые каталоги добавляются
+    по мере появления. В режиме ожидания процесс блокируется в select без опроса диска.
+    При переполнении очереди ядра всё дерево помечается как изменённое.
+    """
+    def __init__(self):
+        self.libc = _load_libc()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = []
+        self.watches = {}
+
+    def add_tree(self, root):
+        """Устанавливает наблюдение на каталог и все его подкаталоги."""
+        if root not in self.roots and not _under(root, self.roots):
+            self.roots.append(root)
+        for current, _, _ in os.walk(root):
+            self._add_watch(current)
+
+    def _add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            # каталог мог исчезнуть между обходом и установкой наблюдения
+            if error not in (errno.ENOENT, errno.ENOTDIR):
+                error_logger.error(f"Failed to watch {path}: {os.strerror(error)}")
+            return
+        self.watches[wd] = path
+
+    def read_events(self, timeout):
+        """
+        Ожидает события не дольше timeout секунд.
+
+        Возвращает:
+            list: Пары (путь, вид изменения).
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                process_logger.info("inotify queue overflow, rescanning watched trees")
+                events.extend((root, CREATED_DIR) for root in self.roots)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    events.append((path, CREATED_DIR))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    events.append((path, REMOVED_DIR))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, REMOVED))
+            else:
+                # IN_CREATE учитывается тоже: жёсткие ссылки и пустые файлы не дают IN_CLOSE_WRITE
+                events.append((path, MODIFIED))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """
+    Запасной источник событий: периодически перечитывает дерево и сравнивает
+    размер и mtime файлов с предыдущим снимком.
+
+    Аргументы:
+        interval (float): Период опроса в секундах.
+        walker (ParallelTreeWalker): Обходчик дерева.
+    """
+    def __init__(self, interval=5.0, walker=None):
+        self.interval = interval
+        self.walker = walker or ParallelTreeWalker()
+        self.roots = []
+        self.snapshot = {}
+        self._next_scan = time.monotonic() + interval
+
+    def add_tree(self, root):
+        if root in self.roots or _under(root, self.roots):
+            return
+        self.roots.append(root)
+        self.snapshot.update(self._scan(root))
+
+    def _scan(self, root):
+        state = {}
+        for entry in self.walker.walk(root):
+            stats = entry.get_stat()
+            if stats is not None:
+                state[entry.path] = (stats.st_size, stats.st_mtime_ns)
+        return state
+
+    def read_events(self, timeout):
+        remaining = self._next_scan - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, remaining))
+        self._next_scan = time.monotonic() + self.interval
+        current = {}
+        for root in self.roots:
+            current.update(self._scan(root))
+        events = [(path, MODIFIED) for path, state in current.items() if self.snapshot.get(path) != state]
+        events.extend((path, REMOVED) for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return events
+
+    def close(self):
+        self.snapshot = {}
+
+
+def create_watcher(poll_interval=5.0, walker=None):
+    """Создаёт источник событий inotify, а при его недоступности — опрашивающий."""
+    try:
+        return InotifyWatcher()
+    except OSError as e:
+        process_logger.info(f"inotify unavailable ({e}), falling back to polling every {poll_interval} s")
+        return PollingWatcher(poll_interval, walker)
+
+
+def _under(path, directories):
+    return any(path.startswith(os.path.join(directory, "")) for directory in directories)
+
+
+def update_index(index_file, rows, removed=(), removed_dirs=(), output_format=None,
+                 compact_threshold=COMPACT_THRESHOLD):
+    """
+    Применяет изменения к индексу через его таблицу изменений (IndexPatch).
+
+    Изменения записываются в таблицу по file_id, так что пакет обходится в число
+    изменённых файлов, а не в размер индекса. Когда в таблице накапливается
+    compact_threshold записей, она вливается в индекс одним потоковым проходом
+    (compact_index): изменённые строки заменяются на месте, удалённые отбрасываются,
+    новые дописываются в конец.
+
+    Аргументы:
+        index_file (str): Путь к файлу индекса.
+        rows (dict): Путь → новая строка результата.
+        removed (iterable): Пути удалённых файлов.
+        removed_dirs (iterable): Пути удалённых каталогов.
+        output_format (str, optional): "csv" или "parquet"; по умолчанию по расширению.
+        compact_threshold (int): Размер таблицы изменений, при котором она вливается в индекс.
+
+    Возвращает:
+        int: Количество записей, ожидающих слияния с индексом.
+    """
+    with IndexPatch(index_file) as patch:
+        pending = patch.record(rows, removed, removed_dirs)
+    if pending >= compact_threshold:
+        compact_index(index_file, output_format)
+        return 0
+    return pending
+
+
+class IndexWatcher:
+    """
+    Режим наблюдения: поддерживает индекс актуальным по событиям файловой системы.
+
+    События группируются: изменения применяются, когда в течение debounce секунд
+    не пришло новых событий (но не реже, чем раз в max_delay секунд). Повторно
+    обрабатываются только изменённые файлы — тем же реестром обработчиков и движком,
+    что и при полном проходе, — после чего изменения записываются в таблицу изменений
+    индекса (update_index); при остановке наблюдения она вливается в индекс.
+
+    Аргументы:
+        manager (FileManager): Менеджер с директорией, выходным файлом и обработчиками.
+        debounce (float): Пауза в событиях (секунды), после которой применяются изменения.
+        max_delay (float): Максимальная задержка применения при непрерывном потоке событий.
+        poll_interval (float): Период опроса для запасного режима без inotify.
+        watcher: Источник событий; по умолчанию inotify или опрос.
+    """
+    def __init__(self, manager, debounce=1.0, max_delay=10.0, poll_interval=5.0, watcher=None):
+        self.manager = manager
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.walker = ParallelTreeWalker(threads=manager.walk_threads)
+        self.watcher = watcher or create_watcher(poll_interval, self.walker)
+        self.updates = 0
+
+    def run(self, stop_event=None, initial_run=True):
+        """
+        Наблюдает за директориями менеджера до установки stop_event.
+
+        Аргументы:
+            stop_event (threading.Event, optional): Событие остановки; без него наблюдение бесконечно.
+            initial_run (bool): Выполнить полный проход перед началом наблюдения
+                (выполняется всегда, если индекса ещё нет).
+        """
+        output_file = self.manager.resolve_output_file()
+        roots = self.manager.roots()
+        # наблюдение устанавливается до полного прохода, чтобы не потерять изменения во время него
+        try:
+            for root in roots:
+                self.watcher.add_tree(root)
+        except OSError as e:
+            if isinstance(self.watcher, PollingWatcher):
+                raise
+            process_logger.info(f"{e}, falling back to polling every {self.poll_interval} s")
+            self.watcher.close()
+            self.watcher = PollingWatcher(self.poll_interval, self.walker)
+            for root in roots:
+                self.watcher.add_tree(root)
+        if initial_run or not os.path.exists(output_file):
+            self.manager.run()
+        process_logger.info(f"Watching {', '.join(roots)} for changes ({type(self.watcher).__name__})")
+
+        pending = {}
+        first_event = None
+        try:
+            while stop_event is None or not stop_event.is_set():
+                events = self.watcher.read_events(self.debounce if pending else 1.0)
+                for path, kind in events:
+                    pending[path] = kind
+                if events and first_event is None:
+                    first_event = time.monotonic()
+                if pending and (not events or time.monotonic() - first_event >= self.max_delay):
+                    self.apply(pending)
+                    pending = {}
+                    first_event = None
+        finally:
+            self.watcher.close()
+            compact_index(self.manager.output_file, self.manager.output_format)
+
+    def apply(self, changes):
+        """
+        Обрабатывает накопленные изменения и обновляет индекс.
+
+        Аргументы:
+            changes (dict): Путь → вид изменения (MODIFIED, REMOVED, CREATED_DIR, REMOVED_DIR).
+        """
+        started = time.time()
+        entries = {}
+        removed = set()
+        removed_dirs = []
+        for path, kind in changes.items():
+            if kind == REMOVED_DIR:
+                removed_dirs.append(path)
+            elif kind == CREATED_DIR:
+                if os.path.isdir(path):
+                    try:
+                        self.watcher.add_tree(path)
+                    except OSError as e:
+                        error_logger.error(f"Failed to watch {path}: {e}")
+                    for entry in self.walker.walk(path):
+                        if self.manager.accepts(entry.path):
+                            entries[entry.path] = entry
+                else:
+                    removed_dirs.append(path)
+            elif os.path.isfile(path):
+                # файлы вне шарда и не прошедшие include/exclude не индексируются, как и при полном проходе
+                if self.manager.accepts(path):
+                    entries[path] = FileEntry(path)
+            else:
+                removed.add(path)
+
+        rows = {}
+        for filepath, file_data in self.manager.iter_processed(list(entries.values())):
+            if file_data:
+                rows[os.fspath(filepath)] = file_data
+            else:
+                # файл, который не удалось обработать, в индекс не попадает, как и при полном проходе
+                removed.add(os.fspath(filepath))
+
+        if not rows and not removed and not removed_dirs:
+            return
+        pending = update_index(self.manager.output_file, rows, removed, removed_dirs, self.manager.output_format)
+        self.updates += 1
+        process_logger.info(
+            f"Index updated: {len(rows)} files processed, {len(removed)} removed, "
+            f"{len(removed_dirs)} directories removed, {pending} changes pending compaction "
+            f"in {time.time() - started:.2f} seconds"
+        )
@@ -0,0 +1,55 @@
+from django.test import TestCase
+import contextlib
+import tempfile
+import io
+import os
+import pandas as pd
+from PIL import Image
+
+
+class CommandLineTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.temp_dir.name, "first")
+        self.second = os.path.join(self.temp_dir.name, "second")
+        os.makedirs(os.path.join(self.first, "cache"))
+        os.makedirs(self.second)
+        for name in ["a.txt", "b.txt", "cache/c.txt", "d.tmp"]:
+            with open(os.path.join(self.first, name), "w") as file:
+                file.write(name)
+        Image.new("RGB", (8, 8)).save(os.path.join(self.second, "image.png"))
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        from SpacExp.cli import main
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = main(list(argv))
+        return code, stderr.getvalue()
+
+    def test_multiple_roots_with_patterns(self):
+        code, output = self.run_cli(self.first, self.second, "-o", self.output_file, "-w", "2",
+                                    "--exclude", "*.tmp", "--exclude", "cache/*", "--progress-interval", "0")
+        self.assertEqual(code, 0)
+        names = sorted(pd.read_csv(self.output_file)["file_name"])
+        self.assertEqual(names, ["a.txt", "b.txt", "image.png"])
+        # прогресс с пропускной способностью и итог по обработчикам
+        self.assertIn("files/s", output)
+        self.assertIn("MB/s", output)
+        summary = {line.split()[0]: line.split()[1] for line in output.splitlines()
+                   if line.startswith(("ImageProcessor", "generic"))}
+        self.assertEqual(summary, {"ImageProcessor": "1", "generic": "2"})
+
+    def test_include_and_format(self):
+        output_file = os.path.join(self.temp_dir.name, "index.parquet")
+        code, _ = self.run_cli(self.first, "-o", output_file, "--include", "*.txt", "--quiet")
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(pd.read_parquet(output_file)["file_name"]), ["a.txt", "b.txt", "c.txt"])
+
+    def test_missing_root_is_rejected(self):
+        with self.assertRaises(SystemExit) as raised:
+            self.run_cli(os.path.join(self.temp_dir.name, "missing"), "-o", self.output_file)
+        self.assertEqual(raised.exception.code, 2)
@@ -0,0 +1,46 @@
+from django.test import TestCase
+from unittest import mock
+import tempfile
+import os
+import pandas as pd
+
+
+class DuplicateFinderTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(os.path.join(self.root, "copies"))
+        big = bytes(range(256)) * 1024
+        # две копии большого файла, файл того же размера с отличием в середине и с отличием в начале
+        self.write("big.bin", big)
+        self.write("copies/big_copy.bin", big)
+        self.write("middle.bin", big[:100000] + b"X" + big[100001:])
+        self.write("head.bin", b"X" + big[1:])
+        self.write("small.txt", b"hello")
+        self.write("copies/small.txt", b"hello")
+        self.write("unique.txt", b"unique content")
+        self.index_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), "wb") as file:
+            file.write(content)
+
+    def test_staged_hashing_finds_duplicate_groups(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.dedup import DuplicateFinder
+
+        original_full_hash = DuplicateFinder.full_hash
+        with mock.patch.object(DuplicateFinder, "full_hash", autospec=True, side_effect=original_full_hash) as full:
+            FileManager(self.root, self.index_file, duplicates=True).run()
+
+        # файл с уникальным размером и файл с отличающимся началом целиком не читаются
+        hashed = {os.path.basename(call.args[1]) for call in full.call_args_list}
+        self.assertEqual(hashed, {"big.bin", "big_copy.bin", "middle.bin", "small.txt"})
+
+        report = pd.read_csv(f"{self.index_file}.duplicates.csv")
+        groups = report.groupby("group_id")["file_path"].apply(lambda paths: sorted(map(os.path.basename, paths)))
+        self.assertEqual(list(groups), [["big.bin", "big_copy.bin"], ["small.txt", "small.txt"]])
+        self.assertEqual(report["reclaimable_bytes"].drop_duplicates().sum(), 256 * 1024 + 5)
@@ -0,0 +1,112 @@
+from django.test import TestCase
+import unittest
+import platform
+import tempfile
+import sys
+import os
+
+# заменитель soffice: пишет для каждого входного файла .docx с числом страниц, равным размеру файла,
+# и отмечает запуск в calls.log
+FAKE_OFFICE = """#!{python}
+import os, sys, zipfile
+args = sys.argv[1:]
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.log"), "a") as log:
+    log.write(" ".join(args) + "\\n")
+outdir = args[args.index("--outdir") + 1]
+os.makedirs(outdir, exist_ok=True)
+for source in args[args.index("--outdir") + 2:]:
+    name = os.path.splitext(os.path.basename(source))[0] + ".docx"
+    with zipfile.ZipFile(os.path.join(outdir, name), "w") as archive:
+        archive.writestr("docProps/app.xml", "<Properties><Pages>%d</Pages></Properties>" % os.path.getsize(source))
+"""
+
+
+class DocConverterTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.temp_dir.name, "cache")
+        self.data = os.path.join(self.temp_dir.name, "data")
+        tools = os.path.join(self.temp_dir.name, "tools")
+        os.makedirs(self.data)
+        os.makedirs(tools)
+        self.office = os.path.join(tools, "soffice")
+        with open(self.office, "w") as file:
+            file.write(FAKE_OFFICE.format(python=sys.executable))
+        os.chmod(self.office, 0o755)
+        self.calls = os.path.join(tools, "calls.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_doc(self, name, size):
+        path = os.path.join(self.data, name)
+        with open(path, "wb") as file:
+            file.write(b"\xd0\xcf\x11\xe0" + b"x" * (size - 4))
+        return path
+
+    def launches(self):
+        if not os.path.exists(self.calls):
+            return []
+        with open(self.calls) as file:
+            return file.read().splitlines()
+
+    def test_batches_and_cache(self):
+        from SpacExp.doc_converter import DocConverter
+        docs = [self.write_doc("a.doc", 10), self.write_doc("b.doc", 20), self.write_doc("copy.doc", 10),
+                self.write_doc("c.doc", 30)]
+        converted = DocConverter(self.cache, office=self.office, batch_size=2).convert_many(docs)
+        # три разных содержимых — два запуска офиса; копия получает ту же конвертацию
+        self.assertEqual(len(self.launches()), 2)
+        self.assertEqual(converted[docs[0]], converted[docs[2]])
+        self.assertTrue(all(path.startswith(self.cache) and os.path.exists(path) for path in converted.values()))
+        self.assertEqual(sorted(os.listdir(self.data)), ["a.doc", "b.doc", "c.doc", "copy.doc"])
+        self.assertIn("-env:UserInstallation=file://" + os.path.join(self.cache, "profiles", "profile-0"),
+                      self.launches()[0])
+
+        # следующий запуск берёт результаты из кэша
+        self.assertEqual(DocConverter(self.cache, office=self.office).convert(docs[3]), converted[docs[3]])
+        self.assertEqual(len(self.launches()), 2)
+
+    def test_missing_office(self):
+        from SpacExp.doc_converter import DocConverter
+        converter = DocConverter(self.cache, office=os.path.join(self.temp_dir.name, "missing"))
+        self.assertIsNone(converter.convert(self.write_doc("a.doc", 10)))
+
+    @unittest.skipUnless(platform.system() == "Linux", "legacy .doc files are converted on Linux")
+    def test_processor_prepares_batch(self):
+        from SpacExp.doc_converter import DocConverter
+        from SpacExp.processor_registry import ProcessorRegistry
+        registry = ProcessorRegistry.desktop()
+        processor = registry.for_extension(".doc")
+        processor.converter = DocConverter(self.cache, office=self.office)
+        docs = [self.write_doc(f"report_{i}.doc", 10 + i) for i in range(3)]
+        registry.prepare(docs)
+        pages = [processor.process(doc)["page_count"] for doc in docs]
+        self.assertEqual(pages, [10, 11, 12])
+        self.assertEqual(len(self.launches()), 1)
+
+    def test_single_requests_reuse_prepared_batch(self):
+        from unittest import mock
+        from SpacExp import doc_converter
+        converter = doc_converter.DocConverter(self.cache, office=self.office)
+        docs = [self.write_doc(f"report_{i}.doc", 10 + i) for i in range(3)]
+        prepared = converter.convert_many(docs)
+        with mock.patch.object(doc_converter, "content_hash", side_effect=doc_converter.content_hash) as hashed:
+            self.assertEqual([converter.convert(doc) for doc in docs], [prepared[doc] for doc in docs])
+        hashed.assert_not_called()
+
+        with mock.patch.object(doc_converter, "RECENT_LIMIT", 2):
+            converter.convert_many([self.write_doc("other.doc", 40)])
+        self.assertEqual(len(converter._recent), 2)
+
+    @unittest.skipUnless(platform.system() == "Linux", "legacy .doc files are converted on Linux")
+    def test_sandbox_pool_prepares_chunks(self):
+        from SpacExp.doc_converter import DocConverter
+        from SpacExp.file_manager import FileManager
+        manager = FileManager(self.data, os.path.join(self.temp_dir.name, "index.csv"), workers=2, timeout=60)
+        manager.registry.for_extension(".doc").converter = DocConverter(self.cache, office=self.office)
+        docs = [self.write_doc(f"report_{i}.doc", 10 + i) for i in range(4)]
+        rows = dict(manager.iter_processed(docs))
+        self.assertEqual([rows[doc]["page_count"] for doc in docs], [10, 11, 12, 13])
+        # пакет конвертирован одним запуском офиса до раздачи файлов процессам-песочницам
+        self.assertEqual(len(self.launches()), 1)
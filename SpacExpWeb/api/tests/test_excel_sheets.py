@@ -0,0 +1,58 @@
+from django.test import TestCase
+import tempfile
+import zipfile
+import os
+
+
+class ExcelSheetsTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "book.xlsx")
+        import openpyxl
+        workbook = openpyxl.Workbook()
+        first = workbook.active
+        first.title = "Данные"
+        for row in range(1, 121):
+            first.append([row, row * 2, f"r{row}"])
+        second = workbook.create_sheet("Итоги")
+        second["B2"] = 1
+        second["F9"] = 2
+        workbook.create_sheet("Пустой")
+        workbook.save(self.path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sheet_dimensions(self):
+        from SpacExp.excel_processor import read_sheets
+        self.assertEqual(read_sheets(self.path), [
+            {"name": "Данные", "rows": 120, "columns": 3},
+            {"name": "Итоги", "rows": 8, "columns": 5},
+            {"name": "Пустой", "rows": 1, "columns": 1},
+        ])
+
+    def test_processor_rows(self):
+        from SpacExp.excel_processor import ExcelProcessor, ExcelProcessorWeb
+        from SpacExp.metadata_store import META_KEY
+        row = ExcelProcessor().process(self.path)
+        self.assertEqual(row["num_sheets"], 3)
+        self.assertEqual(row["excel_rows"], 129)
+        self.assertEqual(row["excel_columns"], 5)
+        self.assertEqual(row[META_KEY]["sheet_rows"]["Данные"], 120)
+        web = ExcelProcessorWeb().process(self.path)
+        self.assertEqual(web["sheet_names"], ["Данные", "Итоги", "Пустой"])
+        self.assertEqual(web["sheet_dimensions"][1], {"name": "Итоги", "rows": 8, "columns": 5})
+
+    def test_sheet_without_dimension(self):
+        from SpacExp.excel_processor import read_sheets
+        # некоторые программы не пишут <dimension>: размер листа неизвестен, имена читаются
+        stripped = os.path.join(self.temp_dir.name, "stripped.xlsx")
+        with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(stripped, "w") as target:
+            for item in source.infolist():
+                data = source.read(item)
+                if item.filename.startswith("xl/worksheets/"):
+                    data = data.replace(b'<dimension ref="A1:C120"/>', b"")
+                target.writestr(item, data)
+        sheets = read_sheets(stripped)
+        self.assertEqual(sheets[0], {"name": "Данные", "rows": None, "columns": None})
+        self.assertEqual(sheets[1]["rows"], 8)
@@ -0,0 +1,58 @@
+from django.test import TestCase
+import tempfile
+import os
+import pandas as pd
+from PIL import Image
+
+
+class ExecutionEngineTests(TestCase):
+    def setUp(self):
+        # дерево с текстовыми файлами и парой изображений во вложенной папке
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(os.path.join(self.root, "images"))
+        for i in range(20):
+            with open(os.path.join(self.root, f"file_{i}.txt"), "w") as file:
+                file.write("x" * i)
+        for i in range(3):
+            Image.new("RGB", (10 + i, 20)).save(os.path.join(self.root, "images", f"img_{i}.png"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_manager(self, workers, name):
+        from SpacExp.file_manager import FileManager
+        output_file = os.path.join(self.temp_dir.name, name)
+        manager = FileManager(self.root, output_file, workers=workers, chunk_size=4)
+        manager.run()
+        return pd.read_csv(output_file)
+
+    def test_parallel_output_matches_serial(self):
+        # порядок и содержимое строк не зависят от числа процессов
+        serial = self.run_manager(1, "serial.csv")
+        parallel = self.run_manager(3, "parallel.csv")
+        self.assertEqual(len(parallel), 23)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_worker_errors_do_not_stop_run(self):
+        # ошибка в процессе пула возвращается вместе с путём, а не обрывает обработку
+        from SpacExp.file_manager import FileManager
+        from SpacExp.execution_engine import ExecutionEngine
+        manager = FileManager(self.root, os.path.join(self.temp_dir.name, "out.csv"))
+        missing = [os.path.join(self.root, f"missing_{i}.txt") for i in range(3)]
+        results = list(ExecutionEngine(manager, workers=2, chunk_size=2).map(missing))
+        self.assertEqual([path for path, _, _ in results], missing)
+        self.assertTrue(all(error for _, _, error in results))
+
+    def test_image_row_independent_of_history(self):
+        # строка изображения не зависит от ранее обработанных файлов
+        from SpacExp.image_processor import ImageProcessor
+        processor = ImageProcessor()
+        path = os.path.join(self.root, "images", "img_0.png")
+        first = processor.process(path)
+        exif = Image.Exif()
+        exif[0x010f] = "Canon"
+        Image.new("RGB", (5, 5)).save(os.path.join(self.root, "exif.jpg"), exif=exif)
+        processor.process(os.path.join(self.root, "exif.jpg"))
+        self.assertEqual(processor.process(path), first)
+        self.assertNotIn("_meta", first)
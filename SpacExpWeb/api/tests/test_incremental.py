@@ -0,0 +1,49 @@
+from django.test import TestCase
+from unittest import mock
+import tempfile
+import os
+import pandas as pd
+from PIL import Image
+
+
+class IncrementalIndexTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for i in range(3):
+            Image.new("RGB", (10 + i, 20)).save(os.path.join(self.root, f"img_{i}.png"))
+        with open(os.path.join(self.root, "notes.txt"), "w") as file:
+            file.write("notes")
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_manager(self):
+        from SpacExp.file_manager import FileManager
+        FileManager(self.root, self.output_file, incremental=True).run()
+        return pd.read_csv(self.output_file)
+
+    def test_unchanged_files_are_not_reprocessed(self):
+        from SpacExp.image_processor import ImageProcessor
+        first = self.run_manager()
+        self.assertEqual(len(first), 4)
+        self.assertTrue(os.path.exists(f"{self.output_file}.manifest.sqlite3"))
+
+        # меняем одно изображение и удаляем другое
+        changed = os.path.join(self.root, "img_0.png")
+        Image.new("RGB", (64, 48)).save(changed)
+        os.utime(changed, ns=(os.stat(changed).st_atime_ns, os.stat(changed).st_mtime_ns + 10**9))
+        os.remove(os.path.join(self.root, "img_2.png"))
+
+        original_process = ImageProcessor.process
+        with mock.patch.object(ImageProcessor, "process", autospec=True, side_effect=original_process) as process:
+            second = self.run_manager()
+
+        self.assertEqual([os.fspath(call.args[1]) for call in process.call_args_list], [changed])
+        self.assertEqual(len(second), 3)
+        self.assertNotIn("img_2.png", set(second["file_name"]))
+        widths = dict(zip(second["file_name"], second["image_width"]))
+        self.assertEqual(widths["img_0.png"], 64)
+        self.assertEqual(widths["img_1.png"], 11)
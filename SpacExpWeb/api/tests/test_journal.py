@@ -0,0 +1,47 @@
+from django.test import TestCase
+from unittest import mock
+import tempfile
+import os
+import pandas as pd
+
+
+class ResumeTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for i in range(10):
+            with open(os.path.join(self.root, f"file_{i}.txt"), "w") as file:
+                file.write("x" * i)
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resume_skips_journaled_files(self):
+        from SpacExp.file_manager import FileManager
+        original = FileManager.process_file
+        calls = []
+
+        def crash_after_six(manager, filepath):
+            if len(calls) == 6:
+                raise KeyboardInterrupt  # имитация аварийного завершения процесса
+            calls.append(os.fspath(filepath))
+            return original(manager, filepath)
+
+        with mock.patch.object(FileManager, "process_file", autospec=True, side_effect=crash_after_six):
+            with self.assertRaises(KeyboardInterrupt):
+                FileManager(self.root, self.output_file).run()
+        self.assertTrue(os.path.exists(f"{self.output_file}.journal"))
+        self.assertFalse(os.path.exists(self.output_file))
+
+        resumed = []
+        with mock.patch.object(FileManager, "process_file", autospec=True,
+                               side_effect=lambda manager, filepath: resumed.append(os.fspath(filepath))
+                               or original(manager, filepath)):
+            FileManager(self.root, self.output_file, resume=True).run()
+
+        self.assertEqual(len(resumed), 4)
+        self.assertFalse(set(resumed) & set(calls))
+        self.assertEqual(len(pd.read_csv(self.output_file)), 10)
+        self.assertFalse(os.path.exists(f"{self.output_file}.journal"))
@@ -0,0 +1,64 @@
+from django.test import TestCase
+import tempfile
+import logging
+import os
+from PIL import Image
+
+
+class LoggingConfigTests(TestCase):
+    def test_setup_is_idempotent(self):
+        from SpacExp.logging_config import setup_logging
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        setup_logging(tempfile.gettempdir())
+        setup_logging(tempfile.gettempdir())
+        self.assertEqual(root.handlers, handlers)
+
+    def test_sampling_filter(self):
+        from SpacExp.logging_config import SamplingFilter
+        sampler = SamplingFilter(every=3)
+        records = [logging.LogRecord("process.files", logging.INFO, "", 0, f"file {i}", None, None) for i in range(7)]
+        self.assertEqual([sampler.filter(record) for record in records],
+                         [True, False, False, True, False, False, True])
+        warning = logging.LogRecord("process.files", logging.WARNING, "", 0, "slow", None, None)
+        self.assertTrue(sampler.filter(warning))
+        self.assertEqual(sampler.dropped, 4)
+
+    def test_pool_workers_forward_records(self):
+        # записи процессов пула пишет фоновый писатель основного процесса
+        import SpacExp
+        from SpacExp.file_manager import FileManager
+        from SpacExp.logging_config import set_file_log_sampling, flush_logging, worker_log_queue, FILE_LOG_SAMPLE_EVERY
+        if worker_log_queue() is None:
+            self.skipTest("logging is configured by the application")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "data")
+            os.makedirs(root)
+            for i in range(4):
+                Image.new("RGB", (5, 5)).save(os.path.join(root, f"forwarded_{i}.png"))
+            set_file_log_sampling(1)
+            try:
+                FileManager(root, os.path.join(temp_dir, "out.csv"), workers=2, chunk_size=1, journal=False).run()
+            finally:
+                set_file_log_sampling(FILE_LOG_SAMPLE_EVERY)
+            flush_logging()
+            log_file = os.path.join(os.path.dirname(SpacExp.__file__), "..", "file_analyzer.log")
+            with open(log_file, encoding="utf-8", errors="replace") as file:
+                text = file.read()
+            for i in range(4):
+                self.assertIn(f"Image processed: {os.path.join(root, f'forwarded_{i}.png')}", text)
+
+    def test_worker_init_does_not_take_parent_lock(self):
+        # блокировка, захваченная другим потоком родителя в момент fork, не должна останавливать процесс пула
+        import multiprocessing
+        from SpacExp import logging_config
+        with logging_config._lock:
+            process = multiprocessing.get_context("fork").Process(target=logging_config.init_worker_logging)
+            process.start()
+        process.join(10)
+        hung = process.is_alive()
+        if hung:
+            process.kill()
+            process.join()
+        self.assertFalse(hung)
+        self.assertEqual(process.exitcode, 0)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+import tempfile
+import os
+import pandas as pd
+from PIL import Image
+
+
+class MetadataStoreTests(TestCase):
+    def setUp(self):
+        # изображения с разными наборами тегов EXIF и одно без EXIF
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        self.save_image("canon.jpg", {0x010f: "Canon", 0x0110: "EOS 5D"})
+        self.save_image("nikon.jpg", {0x010f: "Nikon", 0x0131: "Lightroom"})
+        self.save_image("plain.jpg", {})
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def save_image(self, name, tags):
+        exif = Image.Exif()
+        for tag, value in tags.items():
+            exif[tag] = value
+        Image.new("RGB", (8, 8)).save(os.path.join(self.root, name), exif=exif)
+
+    def test_exif_goes_to_side_table(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.metadata_store import load_metadata, metadata_path
+        FileManager(self.root, self.output_file, journal=False).run()
+
+        index = pd.read_csv(self.output_file)
+        self.assertEqual(len(index), 3)
+        self.assertFalse([column for column in index.columns if column.startswith("exif")])
+        self.assertTrue(os.path.exists(metadata_path(self.output_file)))
+
+        metadata = load_metadata(self.output_file, namespace="exif")
+        values = {(os.path.basename(row.file_path), row.key): row.value for row in metadata.itertuples()}
+        self.assertEqual(values[("canon.jpg", "Make")], "Canon")
+        self.assertEqual(values[("canon.jpg", "Model")], "EOS 5D")
+        self.assertEqual(values[("nikon.jpg", "Software")], "Lightroom")
+        self.assertNotIn(("nikon.jpg", "Model"), values)
+        self.assertFalse(metadata["file_path"].str.endswith("plain.jpg").any())
+
+    def test_update_index_keeps_metadata_in_sync(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.metadata_store import load_metadata
+        from SpacExp.watcher import update_index
+        self.output_file = os.path.join(self.temp_dir.name, "index.parquet")
+        manager = FileManager(self.root, self.output_file, journal=False)
+        manager.run()
+
+        canon = os.path.join(self.root, "canon.jpg")
+        nikon = os.path.join(self.root, "nikon.jpg")
+        self.save_image("canon.jpg", {0x010f: "Sony"})
+        rows = dict(manager.iter_processed([canon]))
+        update_index(self.output_file, rows, removed=[nikon])
+
+        metadata = load_metadata(self.output_file)
+        self.assertEqual(set(metadata["file_path"]), {canon})
+        self.assertEqual(list(metadata["value"]), ["Sony"])
@@ -0,0 +1,69 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+import tempfile
+import os
+from PIL import Image
+
+
+class ProcessorMetricsTests(TestCase):
+    def setUp(self):
+        # два изображения и одно повреждённое
+        from SpacExp import metrics
+        metrics.REGISTRY.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for i in range(2):
+            Image.new("RGB", (10, 10)).save(os.path.join(self.root, f"img_{i}.png"))
+        with open(os.path.join(self.root, "broken.png"), "wb") as file:
+            file.write(b"not an image")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def check_run(self, workers):
+        from SpacExp import metrics
+        from SpacExp.file_manager import FileManager
+        metrics_file = os.path.join(self.temp_dir.name, "spacexp.prom")
+        FileManager(self.root, os.path.join(self.temp_dir.name, "out.csv"), workers=workers, chunk_size=1,
+                    journal=False, metrics_file=metrics_file).run()
+
+        values = metrics.REGISTRY.snapshot()["ImageProcessor"]
+        self.assertEqual(values["total"], 3)
+        self.assertEqual(sum(values["counts"]), 3)
+        self.assertEqual(values["errors"], {"UnidentifiedImageError": 1})
+        self.assertEqual(values["bytes"], sum(entry.stat().st_size for entry in os.scandir(self.root)))
+
+        with open(metrics_file, encoding="utf-8") as file:
+            text = file.read()
+        self.assertIn('spacexp_processor_duration_seconds_count{processor="ImageProcessor"} 3', text)
+        self.assertIn('spacexp_processor_duration_seconds_bucket{processor="ImageProcessor",le="+Inf"} 3', text)
+        self.assertIn('spacexp_processor_errors_total{processor="ImageProcessor",'
+                      'exception="UnidentifiedImageError"} 1', text)
+
+    def test_serial_run(self):
+        self.check_run(1)
+
+    def test_pool_metrics_are_merged(self):
+        # метрики процессов пула сливаются в основной процесс без двойного учёта
+        self.check_run(2)
+
+    def test_file_size_is_taken_from_handler_stat(self):
+        from unittest import mock
+        from SpacExp import metrics
+        from SpacExp.file_manager import FileManager
+        manager = FileManager(self.root, os.path.join(self.temp_dir.name, "out.csv"), journal=False)
+        path = os.path.join(self.root, "img_0.png")
+        with mock.patch("os.stat", wraps=os.stat) as stat:
+            manager.process_file(path)
+        # stat выполняется один раз — обработчиком; метрики берут размер из той же записи
+        self.assertEqual([call.args[0] for call in stat.call_args_list].count(path), 1)
+        self.assertEqual(metrics.REGISTRY.snapshot()["ImageProcessor"]["bytes"], os.path.getsize(path))
+
+    def test_metrics_endpoint(self):
+        from SpacExp import metrics
+        metrics.REGISTRY.observe("PDFProcessor", 0.2, 1000)
+        response = Client().get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('spacexp_processor_bytes_total{processor="PDFProcessor"} 1000', response.content.decode())
@@ -0,0 +1,76 @@
+from django.test import TestCase
+import tempfile
+import zipfile
+import os
+
+APP_XML = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+           '<Application>Microsoft Office Word</Application>{counts}</Properties>')
+CORE_XML = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            '<dc:title>Годовой отчёт</dc:title><dc:creator>Мария</dc:creator>'
+            '<dcterms:created xsi:type="dcterms:W3CDTF">2024-03-01T10:15:00+03:00</dcterms:created>'
+            '<dcterms:modified xsi:type="dcterms:W3CDTF">2024-03-02T08:00:00Z</dcterms:modified>'
+            '</cp:coreProperties>')
+
+
+class OOXMLReaderTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_docx(self, name, app=None, core=None, text="word " * 600):
+        """DOCX из python-docx с заменёнными частями docProps (None — часть удаляется)."""
+        import docx
+        source = os.path.join(self.temp_dir.name, "source.docx")
+        document = docx.Document()
+        document.add_paragraph(text)
+        document.save(source)
+        path = os.path.join(self.temp_dir.name, name)
+        with zipfile.ZipFile(source) as original, zipfile.ZipFile(path, "w") as target:
+            for item in original.infolist():
+                if item.filename not in ("docProps/app.xml", "docProps/core.xml"):
+                    target.writestr(item, original.read(item))
+            if app is not None:
+                target.writestr("docProps/app.xml", APP_XML.format(counts=app))
+            if core is not None:
+                target.writestr("docProps/core.xml", core)
+        return path
+
+    def test_read_properties(self):
+        from SpacExp.ooxml_reader import read_properties
+        path = self.make_docx("report.docx", "<Pages>42</Pages><Words>9000</Words><Characters>51000</Characters>",
+                              CORE_XML)
+        properties = read_properties(path)
+        self.assertEqual(properties["pages"], 42)
+        self.assertEqual(properties["words"], 9000)
+        self.assertEqual(properties["creator"], "Мария")
+        self.assertEqual(properties["title"], "Годовой отчёт")
+        # даты приводятся к UTC
+        self.assertEqual(properties["created"], "2024-03-01 07:15:00")
+        self.assertEqual(properties["modified"], "2024-03-02 08:00:00")
+
+    def test_processor_uses_doc_props(self):
+        from SpacExp.docx_processor import DOCXProcessor
+        path = self.make_docx("report.docx", "<Pages>42</Pages><Characters>51000</Characters>", CORE_XML)
+        result = DOCXProcessor().process(path)
+        self.assertEqual(result["page_count"], 42)
+        self.assertEqual(result["author"], "Мария")
+        self.assertEqual(result["doc_title"], "Годовой отчёт")
+        self.assertEqual(result["doc_characters"], 51000)
+
+    def test_page_count_fallbacks(self):
+        from SpacExp.docx_processor import DOCXProcessor
+        processor = DOCXProcessor(default_author="Nobody")
+        # без числа страниц — оценка по числу символов из app.xml
+        result = processor.process(self.make_docx("chars.docx", "<Characters>13000</Characters>"))
+        self.assertEqual(result["page_count"], 10)
+        # без счётчиков в app.xml — оценка по тексту документа; без автора в core.xml — автор по умолчанию
+        core = CORE_XML.replace("<dc:creator>Мария</dc:creator>", "")
+        result = processor.process(self.make_docx("bare.docx", "", core, text="x" * 3900))
+        self.assertEqual(result["page_count"], 3)
+        self.assertEqual(result["author"], "Nobody")
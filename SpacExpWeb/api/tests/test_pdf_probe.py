@@ -0,0 +1,119 @@
+from django.test import TestCase
+import tempfile
+import zlib
+import os
+
+
+def png_up(rows, width):
+    """Кодирует строки фильтром PNG Up (Predictor 12), как это делают программы записи PDF."""
+    out = bytearray()
+    previous = bytes(width)
+    for row in rows:
+        out += b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous))
+        previous = row
+    return bytes(out)
+
+
+def compressed_pdf(title, pages):
+    """PDF 1.5 с потоком перекрёстных ссылок; каталог и корень страниц лежат в потоке объектов."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [] /Count %d >>" % pages]
+    header, body = b"", b""
+    for num, obj in enumerate(objects, start=1):
+        header += b"%d %d " % (num, len(body))
+        body += obj + b"\n"
+    stream = zlib.compress(header + body)
+    data = b"%PDF-1.5\n"
+    offsets = {}
+    offsets[3] = len(data)
+    data += b"3 0 obj\n<< /Title <" + ("﻿" + title).encode("utf-16-be").hex().encode() + b"> >>\nendobj\n"
+    offsets[4] = len(data)
+    data += (b"4 0 obj\n<< /Type /ObjStm /N 2 /First %d /Filter /FlateDecode /Length %d >>\nstream\n"
+             % (len(header), len(stream)) + stream + b"\nendstream\nendobj\n")
+    offsets[5] = len(data)
+    rows = [bytes([0, 0, 0, 255]), bytes([2, 0, 4, 0]), bytes([2, 0, 4, 1]),
+            bytes([1]) + offsets[3].to_bytes(2, "big") + b"\x00",
+            bytes([1]) + offsets[4].to_bytes(2, "big") + b"\x00",
+            bytes([1]) + offsets[5].to_bytes(2, "big") + b"\x00"]
+    xref = zlib.compress(png_up(rows, 4))
+    data += (b"5 0 obj\n<< /Type /XRef /Size 6 /W [1 2 1] /Root 1 0 R /Info 3 0 R /Filter /FlateDecode "
+             b"/DecodeParms << /Columns 4 /Predictor 12 >> /Length %d >>\nstream\n" % len(xref)
+             + xref + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % offsets[5])
+    return data
+
+
+class PDFProbeTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def write_pdf(self, name, pages, metadata):
+        from PyPDF2 import PdfWriter
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(100, 100)
+        writer.add_metadata(metadata)
+        writer.write(self.path(name))
+        return self.path(name)
+
+    def test_matches_pdf_reader(self):
+        from PyPDF2 import PdfReader
+        from SpacExp.pdf_probe import probe_pdf
+        path = self.write_pdf("report.pdf", 120, {"/Author": "Анна (отдел)", "/Title": "Quarterly\\report"})
+        summary = probe_pdf(path)
+        reader = PdfReader(path)
+        self.assertEqual(summary["num_pages"], len(reader.pages))
+        self.assertEqual(summary["info"], dict(reader.metadata))
+
+    def test_xref_stream_and_object_stream(self):
+        from SpacExp.pdf_probe import probe_pdf
+        path = self.path("compressed.pdf")
+        with open(path, "wb") as file:
+            file.write(compressed_pdf("Отчёт", 7))
+        self.assertEqual(probe_pdf(path), {"num_pages": 7, "info": {"/Title": "Отчёт"}})
+
+    def test_incremental_update_overrides_info(self):
+        from SpacExp.pdf_probe import probe_pdf
+        path = self.write_pdf("updated.pdf", 3, {"/Title": "Old"})
+        with open(path, "rb") as file:
+            data = file.read()
+        previous = int(data[data.rindex(b"startxref") + 9:].split()[0])
+        info = data[data.index(b"/Info") + 5:].split()[0]
+        root = data[data.index(b"/Root") + 5:].split()[0]
+        update = b"%d 0 obj\n<< /Title (New) >>\nendobj\n" % int(info)
+        offset = len(data)
+        xref = b"xref\n%d 1\n%010d 00000 n \ntrailer\n<< /Size 99 /Root %d 0 R /Info %d 0 R /Prev %d >>\n" % (
+            int(info), offset, int(root), int(info), previous)
+        data += update
+        xref_offset = len(data)
+        with open(path, "wb") as file:
+            file.write(data + xref + b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+        summary = probe_pdf(path)
+        self.assertEqual(summary["info"]["/Title"], "New")
+        self.assertEqual(summary["num_pages"], 3)
+
+    def test_damaged_file_falls_back(self):
+        from SpacExp.pdf_probe import probe_pdf, PDFProbeError
+        from SpacExp.pdf_processor import PDFProcessor
+        path = self.write_pdf("damaged.pdf", 4, {"/Author": "Bob"})
+        with open(path, "rb") as file:
+            data = file.read()
+        # неверное смещение таблицы ссылок: PyPDF2 восстанавливает её сканированием файла
+        with open(path, "wb") as file:
+            file.write(data[:data.rindex(b"startxref")] + b"startxref\n12\n%%EOF\n")
+        with self.assertRaises(PDFProbeError):
+            probe_pdf(path)
+        result = PDFProcessor().process(path)
+        self.assertNotIn("error", result)
+        self.assertEqual(result["num_pages"], 4)
+        self.assertEqual(result["pdf_author"], "Bob")
+
+        empty = self.path("empty.pdf")
+        open(empty, "wb").close()
+        with self.assertRaises(PDFProbeError):
+            probe_pdf(empty)
+        self.assertIn("error", PDFProcessor().process(empty))
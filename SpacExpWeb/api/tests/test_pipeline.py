@@ -0,0 +1,105 @@
+from django.test import TestCase
+import tempfile
+import threading
+import time
+import os
+import pandas as pd
+
+
+class BoundedPipelineTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(os.path.join(self.directory, "nested"))
+        for i in range(30):
+            sub = "nested" if i % 3 == 0 else ""
+            with open(os.path.join(self.directory, sub, f"file_{i}.txt"), "w") as file:
+                file.write("x" * i)
+        with open(os.path.join(self.directory, "skip.tmp"), "w") as file:
+            file.write("tmp")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_stage_backpressure(self):
+        from SpacExp.pipeline import BoundedStage
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        stage = BoundedStage(source(), 5, "test-stage").start()
+        # потребитель ещё не читал: источник не может уйти вперёд больше чем на глубину очереди
+        time.sleep(0.5)
+        self.assertLessEqual(len(produced), 7)
+        self.assertEqual(list(stage), list(range(100)))
+
+    def test_stage_error_and_stop(self):
+        from SpacExp.pipeline import BoundedStage
+        closed = threading.Event()
+
+        def failing():
+            yield 1
+            raise ValueError("broken source")
+
+        with self.assertRaises(ValueError):
+            list(BoundedStage(failing(), 2, "failing").start())
+
+        def endless():
+            try:
+                while True:
+                    yield 0
+            finally:
+                closed.set()
+
+        stage = BoundedStage(endless(), 2, "endless").start()
+        for _ in stage:
+            break
+        # остановленная стадия закрывает свой источник
+        stage.stop()
+        self.assertTrue(closed.wait(5))
+
+    def test_counter_respects_patterns(self):
+        from SpacExp.pipeline import FileCounter
+        counter = FileCounter(self.directory, exclude=["*.tmp"]).start()
+        self.assertEqual(counter.wait(10), 30)
+
+    def test_counter_skips_directory_symlinks_like_walker(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.pipeline import FileCounter
+        os.symlink(os.path.join(self.directory, "nested"), os.path.join(self.directory, "linked"))
+        manager = FileManager(self.directory, os.path.join(self.temp_dir.name, "index.csv"), exclude=["*.tmp"])
+        counter = FileCounter(self.directory, exclude=["*.tmp"]).start()
+        self.assertEqual(counter.wait(10), len(list(manager.get_entries())))
+        self.assertEqual(counter.total, 30)
+
+    def test_closing_multi_root_entries_stops_walkers(self):
+        from SpacExp.file_manager import FileManager
+        other = os.path.join(self.temp_dir.name, "other")
+        os.makedirs(other)
+        open(os.path.join(other, "a.txt"), "w").close()
+        manager = FileManager([self.directory, other], os.path.join(self.temp_dir.name, "index.csv"),
+                              exclude=["*.tmp"], walk_threads=2)
+        entries = manager.get_entries()
+        next(entries)
+        self.assertTrue(any(thread.name.startswith("tree-walker") for thread in threading.enumerate()))
+        # остановленный конвейер закрывает источник, и пул потоков обходчика завершается
+        entries.close()
+        self.assertFalse(any(thread.name.startswith("tree-walker") for thread in threading.enumerate()))
+
+    def test_small_queues_keep_output(self):
+        from SpacExp.file_manager import FileManager
+        outputs = []
+        for workers, depth in [(1, 1), (2, 2), (1, None)]:
+            output_file = os.path.join(self.temp_dir.name, f"index_{workers}_{depth}.csv")
+            options = {"walk_queue_depth": depth, "result_queue_depth": depth} if depth else {}
+            seen = []
+            FileManager(self.directory, output_file, workers=workers, chunk_size=3, journal=False,
+                        **options).run(on_result=seen.append)
+            df = pd.read_csv(output_file)
+            self.assertEqual(len(seen), 31)
+            outputs.append(list(df["file_path"]))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
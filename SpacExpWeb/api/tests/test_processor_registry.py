@@ -0,0 +1,98 @@
+from django.test import TestCase
+from unittest import mock
+import tempfile
+import os
+from PIL import Image
+
+
+class ProcessorRegistryTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def test_extension_table_matches_mime_rules(self):
+        from SpacExp.processor_registry import ProcessorRegistry
+        registry = ProcessorRegistry.desktop()
+        self.assertEqual(registry.extension_table[".png"], "image")
+        self.assertEqual(registry.extension_table[".pdf"], "pdf")
+        self.assertEqual(registry.extension_table[".docx"], "document")
+        self.assertEqual(registry.extension_table[".xlsx"], "excel")
+        self.assertIsNone(registry.extension_table[".txt"])
+
+    def test_known_extension_does_not_read_file(self):
+        from SpacExp.processor_registry import ProcessorRegistry
+        registry = ProcessorRegistry.desktop()
+        with mock.patch("builtins.open", side_effect=AssertionError("unexpected read")):
+            self.assertIsNone(registry.resolve_type("/nowhere/notes.txt"))
+            self.assertIs(registry.resolve("/nowhere/a.jpg"), registry.resolve("/nowhere/b.png"))
+
+    def test_signature_for_unknown_extensions(self):
+        from SpacExp.processor_registry import ProcessorRegistry
+        registry = ProcessorRegistry.desktop()
+        image_path = os.path.join(self.root, "scan_without_extension")
+        Image.new("RGB", (5, 5)).save(image_path, format="PNG")
+        self.assertEqual(registry.resolve_type(image_path), "image")
+        self.assertEqual(registry.resolve_type(self.write("report.unknownext", b"%PDF-1.7\n...")), "pdf")
+        self.assertEqual(registry.resolve_type(self.write("clip.dat", b"\x00\x00\x00\x18ftypisom")), "video")
+        self.assertIsNone(registry.resolve_type(self.write("notes", b"plain text")))
+
+    def test_extensionless_docx_gets_document_row(self):
+        from docx import Document
+        import pandas as pd
+        from SpacExp.file_manager import FileManager
+        document = Document()
+        document.core_properties.author = "Tester"
+        document.add_paragraph("text")
+        document.save(os.path.join(self.root, "report"))
+        output_file = os.path.join(self.temp_dir.name, "index.csv")
+        FileManager(self.root, output_file, journal=False).run()
+        row = pd.read_csv(output_file).set_index("file_name").loc["report"]
+        self.assertEqual(row["author"], "Tester")
+        self.assertEqual(row["page_count"], 1)
+
+    def test_unsupported_document_keeps_generic_row(self):
+        from SpacExp.docx_processor import DOCXProcessor
+        path = self.write("notes", b"PK\x03\x04 not a real archive")
+        row = DOCXProcessor().process(path)
+        self.assertEqual(row["file_name"], "notes")
+        self.assertNotIn("page_count", row)
+
+    def test_web_registry_does_not_read_file(self):
+        from SpacExp.file_manager import FileManagerWeb
+        from SpacExp.processor_registry import ProcessorRegistry
+        Image.new("RGB", (7, 3)).save(os.path.join(self.root, "upload"), format="PNG")
+        with mock.patch("SpacExp.processor_registry.sniff_file_type") as sniff:
+            self.assertIsNone(ProcessorRegistry.web().resolve_type(os.path.join(self.root, "upload")))
+            result = FileManagerWeb(self.root).process_files()[0]
+        sniff.assert_not_called()
+        self.assertEqual(result["type"], "unknown")
+
+    def test_sandbox_resolves_type_once_per_file(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.sandbox import SandboxPool, _Slot
+        path = self.write("report.unknownext", b"plain text")
+        manager = FileManager(self.root, os.path.join(self.root, "index.csv"))
+        pool = SandboxPool(manager, workers=1, timeouts={"pdf": 5, "default": 2})
+        slot = pool._spawn(_Slot())
+        ready = {}
+        with mock.patch("SpacExp.processor_registry.sniff_file_type", return_value=None) as sniff:
+            try:
+                pool._assign(slot, 0, path)
+                pool._receive(slot, ready)
+                # тип, переданный с задачей, повторно не определяется
+                self.assertEqual(manager.process_file(path, None)["file_name"], "report.unknownext")
+            finally:
+                pool._shutdown([slot])
+        self.assertEqual(sniff.call_count, 1)
+        self.assertEqual((slot.file_type, slot.budget), (None, 2))
+        self.assertEqual(ready[0][0], path)
+        self.assertIsNone(ready[0][2])
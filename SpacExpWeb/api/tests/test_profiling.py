@@ -0,0 +1,62 @@
+from django.test import TestCase
+import tempfile
+import pstats
+import os
+import pandas as pd
+from PIL import Image
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for i in range(4):
+            Image.new("RGB", (50 * (i + 1), 50)).save(os.path.join(self.root, f"img_{i}.png"))
+        for i in range(3):
+            with open(os.path.join(self.root, f"file_{i}.txt"), "w") as file:
+                file.write("x" * i)
+        self.profile_dir = os.path.join(self.temp_dir.name, "profile")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def check_report(self, workers):
+        from SpacExp.file_manager import FileManager
+        with self.assertLogs("process", level="INFO") as logs:
+            FileManager(self.root, os.path.join(self.temp_dir.name, "out.csv"), workers=workers, chunk_size=2,
+                        journal=False, profile_dir=self.profile_dir, profile_top=5).run()
+        # отчёт о медленных файлах пишется в каталог; в лог — одна итоговая строка без путей
+        report = [line for line in logs.output if "Profiling report" in line]
+        self.assertEqual(len(report), 1)
+        self.assertFalse(any(self.root in line for line in report))
+        self.assertFalse(any("Slow file" in line for line in logs.output))
+
+        slowest = pd.read_csv(os.path.join(self.profile_dir, "slowest_files.csv"))
+        self.assertEqual(list(slowest.columns), ["processor", "file_path", "file_size", "elapsed_seconds"])
+        self.assertEqual(len(slowest), 5)
+        self.assertTrue(slowest["elapsed_seconds"].is_monotonic_decreasing)
+        self.assertTrue(set(slowest["processor"]) <= {"ImageProcessor", "generic"})
+
+        # статистика cProfile по обработчику читается стандартным pstats
+        stats = pstats.Stats(os.path.join(self.profile_dir, "ImageProcessor.pstats"))
+        self.assertTrue(any(name == "process" and filename.endswith("image_processor.py")
+                            for filename, _, name in stats.stats))
+        with open(os.path.join(self.profile_dir, "ImageProcessor.collapsed"), encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertTrue(any("process (image_processor.py" in line for line in lines))
+
+    def test_serial_report(self):
+        self.check_report(1)
+
+    def test_pool_report(self):
+        self.check_report(2)
+
+    def test_disabled_by_default(self):
+        from SpacExp.file_manager import FileManager
+        manager = FileManager(self.root, os.path.join(self.temp_dir.name, "out.csv"), journal=False)
+        self.assertIsNone(manager.profiler)
+        manager.run()
+        self.assertFalse(os.path.exists(self.profile_dir))
@@ -0,0 +1,59 @@
+from django.test import TestCase
+from datetime import datetime
+import tracemalloc
+import os
+
+
+def generic_rows(count):
+    for i in range(count):
+        directory = f"/mnt/share/projects/p{i % 200}/sub{i % 7}"
+        yield {
+            "file_path": f"{directory}/file_{i}.pdf",
+            "file_name": f"file_{i}.pdf",
+            "file_size": i * 1000,
+            "creation_time": "2024-01-02 03:04:05",
+            "modification_time": "2024-01-02 03:04:%02d" % (i % 60),
+            "extension": "pdf",
+            "num_pages": i % 30,
+        }
+
+
+class RecordBatchTests(TestCase):
+    def test_rows_round_trip(self):
+        from SpacExp.records import RecordBatch
+        rows = list(generic_rows(5))
+        rows.append({"file_name": "photo.png", "type": "image", "width": 3, "file_size": 5,
+                     "creation_time": datetime(2024, 1, 1, 1, 1, 1, 123),
+                     "modification_time": datetime(2024, 1, 2, 1, 1, 1)})
+        rows.append({"file_path": "a/b.txt", "file_name": "other", "file_size": "12",
+                     "creation_time": "not a date", "extension": None})
+        batch = RecordBatch(rows)
+        self.assertEqual(len(batch), len(rows))
+        self.assertEqual(list(batch), rows)
+        self.assertEqual(batch[-1], rows[-1])
+        # в разреженной части только поля, не уложившиеся в колонки
+        self.assertEqual(batch.extra(0), {"num_pages": 0})
+
+    def test_batch_is_much_smaller_than_dicts(self):
+        from SpacExp.records import RecordBatch
+        tracemalloc.start()
+        try:
+            rows = list(generic_rows(20000))
+            dict_bytes = tracemalloc.get_traced_memory()[0]
+            del rows
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            batch = RecordBatch(generic_rows(20000))
+            batch_bytes = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(batch), 20000)
+        self.assertLess(batch_bytes * 4, dict_bytes)
+
+    def test_file_entry_keeps_compact_stat(self):
+        from SpacExp.base_processor import FileEntry
+        from SpacExp.records import CompactStat
+        entry = FileEntry(__file__, os.stat(__file__))
+        self.assertIsInstance(entry.stat, CompactStat)
+        self.assertEqual(entry.name, os.path.basename(__file__))
+        self.assertEqual(entry.get_stat().st_mtime, os.stat(__file__).st_mtime_ns / 1e9)
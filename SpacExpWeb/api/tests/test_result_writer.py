@@ -0,0 +1,128 @@
+from django.test import TestCase
+import tempfile
+import os
+import pandas as pd
+
+
+class CSVResultSinkTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.temp_dir.name, "out", "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_late_columns_are_merged(self):
+        from SpacExp.result_writer import CSVResultSink
+        rows = [{"file_name": f"f{i}", "file_size": i} for i in range(5)]
+        rows[3]["exif_Make"] = "Canon"  # колонка появляется после первого пакета
+        rows[4]["error"] = "broken"
+        with CSVResultSink(self.output_file, batch_size=2) as sink:
+            for row in rows:
+                sink.write(row)
+
+        self.assertFalse(os.path.exists(sink.extra_file))
+        self.assertFalse(os.path.exists(sink.part_file))
+        written = pd.read_csv(self.output_file)
+        expected = pd.DataFrame(rows)
+        self.assertEqual(list(written.columns), list(expected.columns))
+        self.assertEqual(written.loc[3, "exif_Make"], "Canon")
+        self.assertTrue(pd.isna(written.loc[2, "exif_Make"]))
+        self.assertEqual(written.loc[4, "error"], "broken")
+
+    def test_interrupted_run_keeps_previous_index(self):
+        from SpacExp.result_writer import CSVResultSink
+        os.makedirs(os.path.dirname(self.output_file))
+        with open(self.output_file, "w") as file:
+            file.write("file_name\nold\n")
+
+        with self.assertRaises(RuntimeError):
+            with CSVResultSink(self.output_file, batch_size=2) as sink:
+                for i in range(3):
+                    sink.write({"file_name": f"new{i}"})
+                raise RuntimeError("crash")
+
+        self.assertEqual(list(pd.read_csv(self.output_file)["file_name"]), ["old"])
+        self.assertEqual(list(pd.read_csv(sink.part_file)["file_name"]), ["new0", "new1", "new2"])
+
+
+class ParquetOutputTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for i in range(4):
+            with open(os.path.join(self.root, f"file_{i}.txt"), "w") as file:
+                file.write("x" * (i + 1))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_typed_parquet_index(self):
+        import pyarrow.parquet as pq
+        from SpacExp.file_manager import FileManager
+        from SpacExp.index_reader import load_index
+        output_file = os.path.join(self.temp_dir.name, "index.parquet")
+        FileManager(self.root, output_file).run()
+
+        schema = pq.read_schema(output_file)
+        self.assertEqual(str(schema.field("file_size").type), "int64")
+        self.assertEqual(str(schema.field("creation_time").type), "timestamp[ms]")
+        self.assertEqual(str(schema.field("extension").type), "dictionary<values=string, indices=int32, ordered=0>")
+
+        df = load_index(output_file, columns=["file_name", "file_size", "missing"])
+        self.assertEqual(list(df.columns), ["file_name", "file_size"])
+        self.assertEqual(sorted(df["file_size"]), [1, 2, 3, 4])
+
+    def test_late_columns_are_merged(self):
+        from SpacExp.result_writer import ParquetResultSink
+        from SpacExp.index_reader import load_index
+        output_file = os.path.join(self.temp_dir.name, "late.parquet")
+        with ParquetResultSink(output_file, batch_size=2) as sink:
+            for i in range(5):
+                row = {"file_name": f"f{i}", "file_size": i, "creation_time": "2024-12-01 10:00:00"}
+                if i == 3:
+                    row["image_width"] = 640
+                sink.write(row)
+        df = load_index(output_file)
+        self.assertEqual(df.loc[3, "image_width"], 640)
+        self.assertTrue(pd.isna(df.loc[4, "image_width"]))
+        self.assertEqual(str(df.loc[0, "creation_time"]), "2024-12-01 10:00:00")
+
+    def test_inexact_numbers_are_kept_as_text(self):
+        import pyarrow.parquet as pq
+        from SpacExp.result_writer import ParquetResultSink
+        output_file = os.path.join(self.temp_dir.name, "inexact.parquet")
+        sizes = [2 ** 60 + 1, None, 1.5, "7", "n/a", 2 ** 64]
+        with ParquetResultSink(output_file, batch_size=3) as sink:
+            for i, size in enumerate(sizes):
+                row = {"file_name": f"f{i}", "file_size": size}
+                if i == 4:
+                    row["audio_bitrate"] = 128.5
+                sink.write(row)
+        self.assertEqual(str(pq.read_schema(output_file).field("file_size").type), "int64")
+        table = pq.read_table(output_file).to_pydict()
+        # целые сохраняются точно; то, что в int64 без потерь не помещается, остаётся строкой
+        self.assertEqual(table["file_size"], [2 ** 60 + 1, None, None, 7, None, None])
+        self.assertEqual(table["file_size_text"], [None, None, "1.5", None, "n/a", str(2 ** 64)])
+        self.assertNotIn("audio_bitrate", table)
+        self.assertEqual(table["audio_bitrate_text"], [None, None, None, None, "128.5", None])
+
+    def test_unparsed_dates_are_kept_as_text(self):
+        import pyarrow.parquet as pq
+        from datetime import datetime
+        from SpacExp.result_writer import ParquetResultSink
+        output_file = os.path.join(self.temp_dir.name, "dates.parquet")
+        dates = ["2020-05-01 10:00:00", "D:20200501100000+03'00'", None, datetime(2021, 1, 2, 3, 4, 5), ""]
+        with ParquetResultSink(output_file, batch_size=2) as sink:
+            for i, date in enumerate(dates):
+                row = {"file_name": f"f{i}", "pdf_creation_date": date}
+                if i == 3:
+                    row["doc_creation_date"] = "01.02.2021"
+                sink.write(row)
+        self.assertEqual(str(pq.read_schema(output_file).field("pdf_creation_date").type), "timestamp[ms]")
+        table = pq.read_table(output_file).to_pydict()
+        self.assertEqual(table["pdf_creation_date"],
+                         [datetime(2020, 5, 1, 10), None, None, datetime(2021, 1, 2, 3, 4, 5), None])
+        self.assertEqual(table["pdf_creation_date_text"], [None, "D:20200501100000+03'00'", None, None, None])
+        self.assertEqual(table["doc_creation_date_text"], [None, None, None, "01.02.2021", None])
@@ -0,0 +1,88 @@
+from django.test import TestCase
+import functools
+import tempfile
+import time
+import os
+import pandas as pd
+
+
+def _hanging_process_file(manager, filepath, file_type=None):
+    # имитация зависшего обработчика и аварийного завершения процесса
+    name = os.path.basename(os.fspath(filepath))
+    if name.startswith("hang"):
+        time.sleep(60)
+    if name.startswith("crash"):
+        os._exit(3)
+    return manager.default_handler.get_generic_info(filepath)
+
+
+class SandboxTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(self.root)
+        for name in ["a.txt", "hang.txt", "b.txt", "crash.txt", "c.txt"]:
+            with open(os.path.join(self.root, name), "w") as file:
+                file.write(name)
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hung_and_crashed_files_are_recorded_and_skipped(self):
+        from SpacExp.file_manager import FileManager
+        manager = FileManager(self.root, self.output_file, workers=2, timeout=1, journal=False)
+        # процессы песочницы получают менеджер через pickle, поэтому подмена — функция уровня модуля
+        manager.process_file = functools.partial(_hanging_process_file, manager)
+
+        started = time.monotonic()
+        manager.run()
+        self.assertLess(time.monotonic() - started, 30)
+
+        frame = pd.read_csv(self.output_file)
+        self.assertEqual(sorted(frame["file_name"]), ["a.txt", "b.txt", "c.txt", "crash.txt", "hang.txt"])
+        errors = dict(zip(frame["file_name"], frame["error"]))
+        self.assertIn("Timeout", errors["hang.txt"])
+        self.assertIn("exit code 3", errors["crash.txt"])
+        self.assertTrue(pd.isna(errors["a.txt"]))
+
+    def test_resume_retries_file_that_timed_out(self):
+        from unittest import mock
+        from SpacExp.file_manager import FileManager
+        from SpacExp.journal import ScanJournal
+        original = ScanJournal.record
+        recorded = []
+
+        def interrupt_after_timeout(journal, filepath, row):
+            # основной процесс прерывается после того, как таймаут попал в журнал
+            if any(previous and "Timeout" in previous.get("error", "") for previous in recorded):
+                raise KeyboardInterrupt
+            original(journal, filepath, row)
+            recorded.append(row)
+
+        manager = FileManager(self.root, self.output_file, workers=1, timeout=1)
+        manager.process_file = functools.partial(_hanging_process_file, manager)
+        with mock.patch.object(ScanJournal, "record", autospec=True, side_effect=interrupt_after_timeout):
+            with self.assertRaises(KeyboardInterrupt):
+                manager.run()
+        self.assertTrue(any(row and "Timeout" in row.get("error", "") for row in recorded))
+
+        FileManager(self.root, self.output_file, workers=1, timeout=30, resume=True).run()
+        frame = pd.read_csv(self.output_file)
+        self.assertEqual(sorted(frame["file_name"]), ["a.txt", "b.txt", "c.txt", "crash.txt", "hang.txt"])
+        # файл с таймаутом не взят из журнала, а обработан заново
+        self.assertNotIn("error", frame.columns)
+
+    def test_per_type_budget_and_worker_recycling(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.sandbox import SandboxPool
+        manager = FileManager(self.root, self.output_file)
+        pool = SandboxPool(manager, workers=1, timeouts={"pdf": 5, "default": 2}, max_tasks_per_child=2)
+        self.assertEqual(pool.budget(os.path.join(self.root, "x.pdf")), 5)
+        self.assertEqual(pool.budget(os.path.join(self.root, "a.txt")), 2)
+
+        paths = [os.path.join(self.root, name) for name in ["a.txt", "b.txt", "c.txt"]]
+        results = list(pool.map(paths))
+        self.assertEqual([filepath for filepath, _, _ in results], paths)
+        self.assertTrue(all(error is None and data["file_path"] == path for path, (_, data, error)
+                            in zip(paths, results)))
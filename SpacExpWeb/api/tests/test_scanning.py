@@ -0,0 +1,61 @@
+from django.test import TestCase
+from unittest import mock
+import tempfile
+import os
+
+
+class ScanningTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        os.makedirs(os.path.join(self.root, "a", "b"))
+        for relative in ["root.txt", "a/one.txt", "a/b/two.txt", "a/b/three.txt"]:
+            with open(os.path.join(self.root, relative), "w") as file:
+                file.write(relative)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_entries_follow_os_walk_order(self):
+        from SpacExp.file_manager import BaseFileManager
+        expected = [os.path.join(root, name) for root, _, files in os.walk(self.root) for name in files]
+        self.assertEqual(list(BaseFileManager(self.root).get_files()), expected)
+
+    def test_entries_are_stat_once(self):
+        from SpacExp.file_manager import BaseFileManager, FileManagerWeb
+        from SpacExp.base_processor import FileProcessor
+        entries = list(BaseFileManager(self.root).get_entries())
+        self.assertTrue(all(entry.stat is not None for entry in entries))
+
+        # после обхода ни get_generic_info, ни веб-конвейер не обращаются к stat повторно
+        with mock.patch("os.stat", side_effect=AssertionError("unexpected stat")), \
+                mock.patch("os.path.getsize", side_effect=AssertionError("unexpected getsize")):
+            info = FileProcessor().get_generic_info(entries[0])
+            self.assertEqual(info["file_size"], entries[0].stat.st_size)
+            self.assertEqual(info["file_path"], entries[0].path)
+
+        with mock.patch.object(BaseFileManager, "get_entries", return_value=iter(entries)), \
+                mock.patch("os.stat", side_effect=AssertionError("unexpected stat")):
+            results = FileManagerWeb(self.root).process_files()
+        self.assertEqual(len(results), 4)
+
+    def test_parallel_walker_order_and_completeness(self):
+        from SpacExp.tree_walker import ParallelTreeWalker
+        # широкое и глубокое дерево, чтобы опережающее чтение упиралось в max_pending
+        for i in range(12):
+            deep = os.path.join(self.root, f"wide_{i}", "x", "y")
+            os.makedirs(deep)
+            for directory in (os.path.dirname(deep), deep):
+                with open(os.path.join(directory, f"f_{i}.txt"), "w") as file:
+                    file.write(str(i))
+        expected = [os.path.join(root, name) for root, _, files in os.walk(self.root) for name in files]
+
+        ordered = ParallelTreeWalker(threads=4, max_pending=3).walk(self.root)
+        self.assertEqual([entry.path for entry in ordered], expected)
+        unordered = ParallelTreeWalker(threads=4, max_pending=3, depth_first=False).walk(self.root)
+        self.assertEqual(sorted(entry.path for entry in unordered), sorted(expected))
+
+    def test_content_searcher_uses_walker(self):
+        from utils.content_search import ContentSearcher
+        found = ContentSearcher(self.root, walk_threads=2).search("B/TWO")
+        self.assertEqual(found, [os.path.join(self.root, "a", "b", "two.txt")])
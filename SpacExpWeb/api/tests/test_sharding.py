@@ -0,0 +1,92 @@
+from django.test import TestCase
+import subprocess
+import tempfile
+import sys
+import os
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+class ShardingTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        # поддеревья разного размера и файлы прямо в корне
+        for name, count in [("alpha", 9), ("beta", 5), ("gamma", 4), ("delta", 1), ("epsilon", 1)]:
+            os.makedirs(os.path.join(self.root, name, "nested"))
+            for i in range(count):
+                self.write(os.path.join(name, "nested" if i % 2 else "", f"{name}_{i}.txt"), name * (i + 1))
+        self.write("top.txt", "top")
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, relative, content):
+        with open(os.path.join(self.root, relative), "w") as file:
+            file.write(content)
+
+    def sharding(self, *args):
+        return subprocess.Popen([sys.executable, "-m", "SpacExp.sharding", *args], cwd=REPO_ROOT,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def test_plan_is_deterministic_and_balanced(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.sharding import ShardPlan
+        FileManager(self.root, self.output_file).run()
+
+        plan = ShardPlan.create(self.root, 2, previous_index=self.output_file)
+        again = ShardPlan.create(self.root, 2, previous_index=self.output_file)
+        self.assertEqual(plan.assignments, again.assignments)
+        self.assertEqual(sorted(plan.loads()), [10, 11])
+        # без истории разбиение определяется хешем имён и тоже воспроизводимо
+        self.assertEqual(ShardPlan.create(self.root, 3).assignments, ShardPlan.create(self.root, 3).assignments)
+
+    def test_shard_processes_merge_into_full_index(self):
+        from SpacExp.file_manager import FileManager
+        full_file = os.path.join(self.temp_dir.name, "full.csv")
+        FileManager(self.root, full_file).run()
+
+        plan_file = os.path.join(self.temp_dir.name, "plan.json")
+        self.assertEqual(self.sharding("plan", self.root, "-n", "3", "-o", plan_file,
+                                       "--previous", full_file).wait(), 0)
+        processes = [self.sharding("run", plan_file, str(shard), "-o", self.output_file) for shard in (1, 2, 3)]
+        for process in processes:
+            _, errors = process.communicate(timeout=120)
+            self.assertEqual(process.returncode, 0, errors)
+        self.assertEqual(self.sharding("merge", plan_file, "-o", self.output_file).wait(), 0)
+
+        full = pd.read_csv(full_file).sort_values("file_path").reset_index(drop=True)
+        merged = pd.read_csv(self.output_file)
+        self.assertEqual(list(merged.columns), list(full.columns))
+        merged = merged.sort_values("file_path").reset_index(drop=True)
+        pd.testing.assert_frame_equal(merged, full)
+
+    def test_manager_accepts_only_files_of_its_shard(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.sharding import ShardPlan
+        plan = ShardPlan.create(self.root, 2)
+        for shard_index in range(2):
+            manager = FileManager(self.root, self.output_file, shard_plan=plan, shard_index=shard_index,
+                                  exclude=["*_0.txt"])
+            walked = {entry.path for entry in manager.get_entries()}
+            candidates = [os.path.join(current, name) for current, _, names in os.walk(self.root) for name in names]
+            self.assertEqual({path for path in candidates if manager.accepts(path)}, walked)
+        self.assertFalse(manager.accepts(os.path.join(self.temp_dir.name, "outside.txt")))
+
+    def test_units_created_after_planning_are_not_lost(self):
+        from SpacExp.sharding import ShardPlan
+        os.remove(os.path.join(self.root, "top.txt"))
+        plan = ShardPlan.create(self.root, 3)
+        # после построения плана появились новые поддеревья и файлы в корне
+        for name in ("zeta", "eta", "theta"):
+            os.makedirs(os.path.join(self.root, name))
+            self.write(os.path.join(name, f"{name}.txt"), name)
+        self.write("late.txt", "late")
+
+        walked = [entry.path for shard in range(3) for entry in plan.iter_entries(shard)]
+        expected = [os.path.join(current, name) for current, _, names in os.walk(self.root) for name in names]
+        self.assertEqual(sorted(walked), sorted(expected))
+        for shard in range(3):
+            self.assertTrue(all(plan.owns(entry.path, shard) for entry in plan.iter_entries(shard)))
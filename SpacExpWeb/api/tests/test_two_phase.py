@@ -0,0 +1,85 @@
+from django.test import TestCase
+from unittest import mock
+import threading
+import tempfile
+import os
+import pandas as pd
+from PIL import Image
+
+
+class TwoPhaseScanTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(os.path.join(self.root, "urgent"))
+        for i in range(4):
+            Image.new("RGB", (10 + i, 20)).save(os.path.join(self.root, f"img_{i}.png"))
+        Image.new("RGB", (99, 20)).save(os.path.join(self.root, "urgent", "first.png"))
+        with open(os.path.join(self.root, "notes.txt"), "w") as file:
+            file.write("notes")
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_generic_index_first_then_metadata_in_priority_order(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.image_processor import ImageProcessor
+        manager = FileManager(self.root, self.output_file)
+
+        release = threading.Event()
+        order = []
+        original_process = ImageProcessor.process
+
+        def gated_process(processor, filepath):
+            release.wait(10)
+            order.append(os.path.basename(os.fspath(filepath)))
+            return original_process(processor, filepath)
+
+        with mock.patch.object(ImageProcessor, "process", autospec=True, side_effect=gated_process):
+            scan = manager.run_two_phase(priority="largest", batch_size=2)
+            # первая фаза уже записала все файлы без метаданных изображений
+            phase_one = pd.read_csv(self.output_file)
+            self.assertEqual(len(phase_one), 6)
+            self.assertNotIn("image_width", phase_one.columns)
+            self.assertEqual(scan.progress(), (0, 5))
+
+            scan.prioritize(os.path.join(self.root, "urgent"))
+            release.set()
+            self.assertTrue(scan.wait(30))
+
+        self.assertEqual(scan.progress(), (5, 5))
+        final = pd.read_csv(self.output_file)
+        self.assertEqual(list(final["file_name"]), list(phase_one["file_name"]))
+        widths = dict(zip(final["file_name"], final["image_width"]))
+        self.assertEqual(widths["first.png"], 99)
+        self.assertEqual(widths["img_3.png"], 13)
+        # первым обрабатывается каталог с повышенным приоритетом (первый файл мог быть уже взят из очереди)
+        self.assertIn("first.png", order[:2])
+
+    def test_deferred_queue_spills_to_disk_in_priority_order(self):
+        from SpacExp.base_processor import FileEntry
+        from SpacExp.two_phase import DeferredQueue
+        queue = DeferredQueue(max_memory=2)
+        sizes = {"a": 5, "b": 1, "urgent/c": 9, "d": 3, "urgent/e": 7, "f": 2}
+        for name, size in sizes.items():
+            queue.push(size, FileEntry(os.path.join(self.root, name)))
+        self.assertEqual(len(queue), 6)
+        queue.prioritize(os.path.join(self.root, "urgent", ""))
+        order = []
+        while (entry := queue.pop()) is not None:
+            order.append(os.path.relpath(entry.path, self.root))
+        self.assertEqual(order, ["urgent/e", "urgent/c", "b", "f", "d", "a"])
+        queue.close()
+
+    def test_phase_two_with_spilled_queue_merges_index_once(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.metadata_store import compact_index
+        manager = FileManager(self.root, self.output_file)
+        with mock.patch("SpacExp.two_phase.compact_index", side_effect=compact_index) as compact:
+            scan = manager.run_two_phase(priority="path", background=False, batch_size=1, max_deferred=1)
+        self.assertEqual(compact.call_count, 1)
+        self.assertEqual(scan.progress(), (5, 5))
+        final = pd.read_csv(self.output_file)
+        self.assertEqual(len(final), 6)
+        self.assertEqual(dict(zip(final["file_name"], final["image_width"]))["first.png"], 99)
@@ -0,0 +1,64 @@
+from django.test import TestCase
+import tempfile
+import os
+
+
+class VideoProbeTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_video(self, name, fourcc, frames=30, fps=12.5, size=(64, 48)):
+        import cv2
+        import numpy as np
+        path = os.path.join(self.temp_dir.name, name)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not writer.isOpened():
+            self.skipTest(f"OpenCV cannot write {name}")
+        for i in range(frames):
+            writer.write(np.full((size[1], size[0], 3), i, np.uint8))
+        writer.release()
+        return path
+
+    def test_containers_match_opencv(self):
+        import cv2
+        from SpacExp.video_probe import probe_video
+        for name, fourcc in [("clip.mp4", "mp4v"), ("clip.avi", "MJPG"), ("clip.mkv", "XVID")]:
+            path = self.write_video(name, fourcc)
+            info = probe_video(path)
+            capture = cv2.VideoCapture(path)
+            try:
+                self.assertEqual(info["frame_count"], int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), name)
+                self.assertAlmostEqual(info["fps"], capture.get(cv2.CAP_PROP_FPS), places=3, msg=name)
+                self.assertEqual((info["width"], info["height"]), (64, 48), name)
+                self.assertAlmostEqual(info["duration"], 2.4, places=2, msg=name)
+            finally:
+                capture.release()
+
+    def test_damaged_and_bounded(self):
+        from SpacExp.video_probe import probe_video, VideoProbeError
+        path = self.write_video("clip.mp4", "mp4v")
+        with self.assertRaises(VideoProbeError):
+            probe_video(path, budget=64)
+        with open(path, "rb") as file:
+            data = file.read()
+        truncated = os.path.join(self.temp_dir.name, "truncated.mp4")
+        with open(truncated, "wb") as file:
+            file.write(data[:data.index(b"moov") + 40])
+        with self.assertRaises(VideoProbeError):
+            probe_video(truncated)
+
+    def test_processor_fallback(self):
+        from SpacExp.video_processor import VideoProcessor, VideoProcessorWeb
+        path = self.write_video("clip.avi", "MJPG")
+        row = VideoProcessorWeb().process(path)
+        self.assertEqual(row["video_frame_count"], 30)
+        self.assertAlmostEqual(row["video_duration"], 2.4, places=2)
+        # неизвестный контейнер, который не открывает и OpenCV: строка с ошибкой, без деления на ноль
+        broken = os.path.join(self.temp_dir.name, "broken.flv")
+        with open(broken, "wb") as file:
+            file.write(b"FLV\x01" + b"\x00" * 64)
+        row = VideoProcessor().process(broken)
+        self.assertIn("Cannot open video", row["error"])
@@ -0,0 +1,159 @@
+from django.test import TestCase
+import threading
+import tempfile
+import shutil
+import time
+import os
+import pandas as pd
+
+
+class WatchModeTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "data")
+        os.makedirs(os.path.join(self.root, "old"))
+        for relative in ["keep.txt", "change.txt", "delete.txt", "old/inner.txt"]:
+            self.write(relative, relative)
+        self.output_file = os.path.join(self.temp_dir.name, "index.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, relative, content):
+        with open(os.path.join(self.root, relative), "w") as file:
+            file.write(content)
+
+    def wait_for(self, condition, timeout=15):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.1)
+        return False
+
+    def check_watch(self, watcher_factory):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.watcher import IndexWatcher
+        from SpacExp.index_reader import load_index
+        manager = FileManager(self.root, self.output_file, journal=False)
+        watcher = IndexWatcher(manager, debounce=0.3, watcher=watcher_factory())
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: os.path.exists(self.output_file)))
+            self.assertEqual(len(pd.read_csv(self.output_file)), 4)
+
+            self.write("change.txt", "changed content, longer than before")
+            os.remove(os.path.join(self.root, "delete.txt"))
+            os.makedirs(os.path.join(self.root, "new"))
+            self.write("new/added.txt", "added")
+            shutil.rmtree(os.path.join(self.root, "old"))
+
+            def index_is_current():
+                names = set(load_index(self.output_file)["file_name"])
+                return names == {"keep.txt", "change.txt", "added.txt"}
+            self.assertTrue(self.wait_for(index_is_current))
+        finally:
+            stop.set()
+            thread.join()
+
+        frame = pd.read_csv(self.output_file)
+        sizes = dict(zip(frame["file_name"], frame["file_size"]))
+        self.assertEqual(sizes["change.txt"], len("changed content, longer than before"))
+        # неизменённые строки остаются на своих местах
+        self.assertEqual(list(frame["file_name"])[:2], ["keep.txt", "change.txt"])
+
+    def test_inotify_watch_updates_index(self):
+        from SpacExp.watcher import InotifyWatcher
+        try:
+            InotifyWatcher().close()
+        except OSError:
+            self.skipTest("inotify is not available")
+        self.check_watch(InotifyWatcher)
+
+    def test_polling_fallback_updates_index(self):
+        from SpacExp.watcher import PollingWatcher
+        self.check_watch(lambda: PollingWatcher(interval=0.2))
+
+    def test_update_index_records_changes_without_rewriting_index(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.index_reader import load_index
+        from SpacExp.metadata_store import compact_index, patch_path
+        from SpacExp.watcher import update_index
+        manager = FileManager(self.root, self.output_file, journal=False)
+        manager.run()
+        before = os.stat(self.output_file)
+
+        change = os.path.join(self.root, "change.txt")
+        self.write("change.txt", "changed content")
+        rows = dict(manager.iter_processed([change]))
+        pending = update_index(self.output_file, rows, removed=[os.path.join(self.root, "delete.txt")],
+                               removed_dirs=[os.path.join(self.root, "old")])
+        self.assertEqual(pending, 3)
+        # индекс не переписан, изменения видны при чтении через таблицу изменений
+        after = os.stat(self.output_file)
+        self.assertEqual((after.st_ino, after.st_mtime_ns), (before.st_ino, before.st_mtime_ns))
+        frame = load_index(self.output_file, columns=["file_name", "file_size"])
+        self.assertEqual(list(frame.columns), ["file_name", "file_size"])
+        self.assertEqual(dict(zip(frame["file_name"], frame["file_size"])),
+                         {"keep.txt": len("keep.txt"), "change.txt": len("changed content")})
+
+        self.assertEqual(compact_index(self.output_file), 2)
+        self.assertFalse(os.path.exists(patch_path(self.output_file)))
+        self.assertEqual(list(pd.read_csv(self.output_file)["file_name"]), ["keep.txt", "change.txt"])
+
+    def test_update_index_compacts_at_threshold(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.metadata_store import patch_path
+        from SpacExp.watcher import update_index
+        FileManager(self.root, self.output_file, journal=False).run()
+        self.assertEqual(update_index(self.output_file, {}, removed=[os.path.join(self.root, "keep.txt")],
+                                      compact_threshold=2), 1)
+        self.assertEqual(update_index(self.output_file, {}, removed=[os.path.join(self.root, "delete.txt")],
+                                      compact_threshold=2), 0)
+        self.assertFalse(os.path.exists(patch_path(self.output_file)))
+        self.assertEqual(set(pd.read_csv(self.output_file)["file_name"]), {"change.txt", "inner.txt"})
+
+    def test_removing_all_rows_publishes_empty_index(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.metadata_store import compact_index
+        from SpacExp.watcher import update_index
+        for output_file in (self.output_file, os.path.join(self.temp_dir.name, "index.parquet")):
+            FileManager(self.root, output_file, journal=False).run()
+            columns = list(pd.read_csv(output_file).columns if output_file.endswith(".csv")
+                           else pd.read_parquet(output_file).columns)
+            update_index(output_file, {}, removed_dirs=[self.root])
+            self.assertEqual(compact_index(output_file), 0)
+            frame = pd.read_csv(output_file) if output_file.endswith(".csv") else pd.read_parquet(output_file)
+            self.assertEqual(len(frame), 0)
+            self.assertEqual(list(frame.columns), columns)
+
+    def test_watch_several_roots_with_filters(self):
+        from SpacExp.file_manager import FileManager
+        from SpacExp.index_reader import load_index
+        from SpacExp.watcher import IndexWatcher, PollingWatcher
+        other = os.path.join(self.temp_dir.name, "other")
+        os.makedirs(other)
+        manager = FileManager([self.root, other], self.output_file, journal=False, exclude=["*.log"])
+        watcher = IndexWatcher(manager, debounce=0.3, watcher=PollingWatcher(interval=0.2))
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: os.path.exists(self.output_file)))
+            for name in ("added.txt", "skipped.log"):
+                with open(os.path.join(other, name), "w") as file:
+                    file.write(name)
+            os.makedirs(os.path.join(other, "nested"))
+            with open(os.path.join(other, "nested", "deep.log"), "w") as file:
+                file.write("log")
+            self.assertTrue(self.wait_for(lambda: watcher.updates > 0))
+        finally:
+            stop.set()
+            thread.join()
+
+        names = set(load_index(self.output_file)["file_name"])
+        self.assertIn("added.txt", names)
+        self.assertNotIn("skipped.log", names)
+        self.assertNotIn("deep.log", names)
@@ -5,5 +5,6 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('process-files/', views.process_files_view, name='process_files'),
     path("statistics/", views.statistics_api_view, name="statistics_api"),
-    path('statistics-page/', views.statistics_page_view, name='statistics_page')
+    path('statistics-page/', views.statistics_page_view, name='statistics_page'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
@@ -3,7 +3,7 @@ from .models import FileRecord
 from django.conf import settings
 from django.shortcuts import render
 from django.db.models import Sum, Count, F
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponseRedirect, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
 import os
@@ -13,6 +13,7 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'SpacExp'))))
 from SpacExp.file_manager import FileManagerWeb
+from SpacExp import metrics
 from utils.gui_humanizer import humanize_file_size
 
 @csrf_exempt
@@ -169,3 +170,7 @@ def statistics_api_view(request):
     }
 
     return JsonResponse(response_data)
+
+def metrics_view(request):
+    # метрики обработчиков в текстовом формате Prometheus (для сбора scrape-запросами)
+    return HttpResponse(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
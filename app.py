@@ -34,7 +34,7 @@ class FileAnalyzerApp:
         MenuCreator(self)
 
     def open_csv(self):
-        filepath = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        filepath = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
         if filepath:
             self.output_file = filepath
             messagebox.showinfo("Файл открыт", f"Выбран файл индексации: {os.path.basename(filepath)}")
@@ -1,8 +1,8 @@
+import sys
 
-from SpacExp.file_manager import FileManager
+from SpacExp.cli import main
 
-#FileManager("/content/my_files", "output.csv").run()
+# пример: python spacexp.py /content/my_files -o output.csv -w 4
 
 if __name__ == "__main__":
-    manager = FileManager("C:\\Users\\snarski\\Desktop\\methodology_gelman", "output_gold_standard_data.csv")
-    manager.run()
+    sys.exit(main())
@@ -2,6 +2,7 @@ import os
 import docx
 import logging
 from PyPDF2 import PdfReader
+from SpacExp.tree_walker import ParallelTreeWalker, DEFAULT_WALK_THREADS
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -10,7 +11,7 @@ class ContentSearcher:
     Класс для поиска строки в текстовых файлах (.txt), документах Word (.docx)
     и PDF-файлах в указанной директории.
     """
-    def __init__(self, directory):
+    def __init__(self, directory, walk_threads=DEFAULT_WALK_THREADS):
         """
         Инициализирует объект ContentSearcher.
 
@@ -18,8 +19,11 @@ class ContentSearcher:
         -----------
         directory : str
             Путь к директории, в которой будет происходить поиск.
+        walk_threads : int
+            Количество потоков обхода каталогов.
         """
         self.directory = directory
+        self.walk_threads = walk_threads
 
     def search(self, search_string):
         """
@@ -36,18 +40,18 @@ class ContentSearcher:
             Список файлов, в которых была найдена строка.
         """
         results = []
-        for root, _, files in os.walk(self.directory):
-            for file in files:
-                filepath = os.path.join(root, file)
-                if file.endswith('.txt'):
-                    if self.search_in_txt(filepath, search_string):
-                        results.append(filepath)
-                elif file.endswith('.docx'):
-                    if self.search_in_docx(filepath, search_string):
-                        results.append(filepath)
-                elif file.endswith('.pdf'):
-                    if self.search_in_pdf(filepath, search_string):
-                        results.append(filepath)
+        for entry in ParallelTreeWalker(threads=self.walk_threads).walk(self.directory):
+            file = entry.name
+            filepath = entry.path
+            if file.endswith('.txt'):
+                if self.search_in_txt(filepath, search_string):
+                    results.append(filepath)
+            elif file.endswith('.docx'):
+                if self.search_in_docx(filepath, search_string):
+                    results.append(filepath)
+            elif file.endswith('.pdf'):
+                if self.search_in_pdf(filepath, search_string):
+                    results.append(filepath)
         return results
 
     def search_in_txt(self, filepath, search_string):
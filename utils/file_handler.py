@@ -20,7 +20,7 @@ class FileHandler:
     обработчиков, сохранения результатов индексации и отображения информации 
     о последней индексации.
     """
-    def __init__(self, directory, output_file, progress, status_label):
+    def __init__(self, directory, output_file, progress, status_label, incremental=False, workers=1):
         """
         Инициализация обработчика файлов.
 
@@ -34,12 +34,18 @@ class FileHandler:
             Виджет для отображения прогресса обработки.
         status_label : tkinter.Label
             Метка для отображения статуса индексации.
+        incremental : bool
+            Переиспользовать результаты неизменившихся файлов из манифеста предыдущей индексации.
+        workers : int
+            Количество процессов для параллельной обработки файлов.
         """
         self.directory = directory
         # setting the output file path to always save in the project root
         self.output_file = output_file
         self.progress = progress
         self.status_label = status_label
+        self.incremental = incremental
+        self.workers = workers
 
     def index_files(self):
         """
@@ -50,31 +56,28 @@ class FileHandler:
         в выходной файл. Также обновляет прогресс и статус обработки в интерфейсе.
         """
         self.progress["value"] = 0
-        manager = FileManager(self.directory, self.output_file)
-        data = []
-        files = list(manager.get_files())
-        total_files = len(files)
+        manager = FileManager(self.directory, self.output_file, workers=self.workers, incremental=self.incremental)
+        # общее число файлов считается в фоне параллельно с индексацией, без списка всех путей
+        counter = manager.start_count()
+        processed = 0
 
-        for i, filepath in enumerate(files, 1):
-            mime_type, _ = mimetypes.guess_type(filepath)
-            handler = manager.get_handler(mime_type)
-            if handler:
-                file_data = handler.process(filepath)
+        def update_progress(row):
+            nonlocal processed
+            processed += 1
+            total_files = counter.total
+            if total_files:
+                self.progress["value"] = min(processed / total_files, 1) * 100
+                self.status_label.config(text=f"Обработано {processed} из {total_files} файлов")
             else:
-                # Используем стандартный обработчик для получения общей информации
-                file_data = manager.default_handler.get_generic_info(filepath)
-                process_logger.warning(f"Unsupported file type. Processed with default handler: {filepath}")
-            
-            if file_data:
-                data.append(file_data)  # Добавляем данные в итоговый список
-
-
-            self.progress["value"] = (i / total_files) * 100
-            self.status_label.config(text=f"Обработано {i} из {total_files} файлов")
+                self.status_label.config(text=f"Обработано {processed} из {max(counter.counted, processed)}+ файлов")
             self.status_label.update_idletasks()  # адпейт интерфейса после изменения текста
             self.progress.update_idletasks()      # адпейт интерфейса после изменения прогресса
 
-        manager.save_results(data)
+        # обход, обработка и запись идут стадиями с ограниченными очередями; прогресс обновляется в этом потоке
+        try:
+            manager.run(on_result=update_progress)
+        finally:
+            counter.stop()
         self.status_label.config(text=f"Индексация завершена. Результаты сохранены в {self.output_file}")
 
     def show_last_index_info(self):
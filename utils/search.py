@@ -5,6 +5,7 @@ from tkinter import messagebox
 import os
 import sys
 from utils.gui_humanizer import humanize_file_size
+from SpacExp.index_reader import load_index
 
 class FileSearch:
     """
@@ -94,7 +95,7 @@ class FileSearch:
             messagebox.showwarning("Внимание", "Нет данных для поиска. Сначала выполните индексацию.")
             return
         
-        df = pd.read_csv(self.output_file)
+        df = load_index(self.output_file, columns=["file_name", "file_size", "creation_time", "modification_time"])
 
         # Фильтрация по названию
         if name:
@@ -6,6 +6,7 @@ from tkinter import messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from utils.gui_humanizer import humanize_file_size
+from SpacExp.index_reader import load_index
 
 class StatisticsView:
     """
@@ -40,8 +41,8 @@ class StatisticsView:
             messagebox.showwarning("Внимание", "Файл данных пуст или не существует.")
             return
         try:
-            # Чтение CSV файла
-            df = pd.read_csv(self.output_file)
+            # Чтение только нужной колонки индекса
+            df = load_index(self.output_file, columns=["extension"])
             extension_counts = df['extension'].value_counts()
 
             top = tk.Toplevel(self.root)
@@ -67,7 +68,7 @@ class StatisticsView:
             return
         try:
         # Read and process CSV
-            df = pd.read_csv(self.output_file).sort_values(by="file_size", ascending=False).head(10)
+            df = load_index(self.output_file, columns=["file_name", "file_size"]).sort_values(by="file_size", ascending=False).head(10)
 
             top = tk.Toplevel(self.root)
             text = tk.Text(top)
@@ -94,7 +95,7 @@ class StatisticsView:
             return
         try:
             # Чтение и обработка CSV
-            df = pd.read_csv(self.output_file).sort_values(by="file_size", ascending=False).head(10)
+            df = load_index(self.output_file, columns=["file_name", "file_size"]).sort_values(by="file_size", ascending=False).head(10)
             # Преобразование размера файла в мегабайты
             df['file_size_mb'] = df['file_size'] / (1024 * 1024)
 